@@ -0,0 +1,70 @@
+""" Measures time that it takes to import NeuPy's algorithms. Each
+measurement runs in a separate Python process, so modules imported
+in the previous run don't affect results.
+
+Usage::
+
+    $ python benchmarks/import_time.py
+    $ python benchmarks/import_time.py --repeat 20 PNN Momentum
+"""
+import sys
+import argparse
+import subprocess
+
+import numpy as np
+
+
+IMPORT_CODE = (
+    "import time; start_time = time.time(); {statement}; "
+    "print(time.time() - start_time)"
+)
+
+
+def import_time(statement, repeat):
+    """ Runs import statement in new Python process few times.
+
+    Parameters
+    ----------
+    statement : str
+        Python code that imports module.
+    repeat : int
+        Number of runs.
+
+    Returns
+    -------
+    array-like
+        Time in seconds that each import took.
+    """
+    code = IMPORT_CODE.format(statement=statement)
+    timings = []
+
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         stderr=subprocess.STDOUT)
+        # Theano can print warnings before the timing
+        last_line = output.decode('utf-8').strip().splitlines()[-1]
+        timings.append(float(last_line))
+
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('algorithms', nargs='*',
+                        help="Algorithms that need to be imported.")
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    statements = ["import neupy.algorithms"]
+    statements.extend("from neupy.algorithms import {}".format(name)
+                      for name in args.algorithms)
+
+    for statement in statements:
+        timings = import_time(statement, args.repeat)
+        print("{:<48} median {:.3f} sec, min {:.3f} sec, max {:.3f} sec"
+              "".format(statement, np.median(timings), timings.min(),
+                        timings.max()))
+
+
+if __name__ == '__main__':
+    main()
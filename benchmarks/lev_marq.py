@@ -0,0 +1,93 @@
+""" Compares epoch time of the Levenberg-Marquardt algorithm for
+different methods that compute Jacobian. Each network has one hidden
+layer which size depends on the specified number of parameters.
+
+Usage::
+
+    $ python benchmarks/lev_marq.py
+    $ python benchmarks/lev_marq.py --samples 500 --parameters 1000 5000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from neupy import algorithms
+
+
+N_FEATURES = 10
+
+
+def hidden_layer_size(n_parameters):
+    """ Finds hidden layer size for the network with ``N_FEATURES``
+    inputs and one output that has approximately specified
+    number of parameters.
+
+    Parameters
+    ----------
+    n_parameters : int
+
+    Returns
+    -------
+    int
+    """
+    # Network has (N_FEATURES + 2) * size + 1 parameters
+    return max(1, (n_parameters - 1) // (N_FEATURES + 2))
+
+
+def epoch_time(jacobian, n_parameters, n_samples, repeat):
+    """ Measures time of the training epochs.
+
+    Parameters
+    ----------
+    jacobian : {'backprop', 'scan'}
+    n_parameters : int
+    n_samples : int
+    repeat : int
+        Number of epochs.
+
+    Returns
+    -------
+    array-like
+        Time in seconds that each epoch took.
+    """
+    input_data = np.random.random((n_samples, N_FEATURES))
+    target_data = np.random.random((n_samples, 1))
+
+    network = algorithms.LevenbergMarquardt(
+        (N_FEATURES, hidden_layer_size(n_parameters), 1),
+        jacobian=jacobian,
+        verbose=False,
+    )
+    network.compile()
+
+    timings = []
+    for _ in range(repeat):
+        start_time = time.time()
+        network.train_epoch(input_data, target_data)
+        timings.append(time.time() - start_time)
+
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--parameters', type=int, nargs='*',
+                        default=[1000, 2500, 5000, 10000],
+                        help="Approximate number of network's parameters.")
+    parser.add_argument('--samples', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n_parameters in args.parameters:
+        for jacobian in ('scan', 'backprop'):
+            timings = epoch_time(jacobian, n_parameters, args.samples,
+                                 args.repeat)
+            print("{:>6} parameters, {:<8} median {:.3f} sec, min {:.3f} "
+                  "sec, max {:.3f} sec".format(n_parameters, jacobian,
+                                               np.median(timings),
+                                               timings.min(), timings.max()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,107 @@
-from .gd.base import *
-from .gd.lev_marq import *
-from .gd.quasi_newton import *
-from .gd.conjgrad import *
-from .gd.hessian import *
-from .gd.hessdiag import *
-from .gd.rprop import *
-from .gd.quickprop import *
-from .gd.momentum import *
-from .gd.adadelta import *
-from .gd.adagrad import *
-from .gd.rmsprop import *
-from .gd.adam import *
-from .gd.adamax import *
-
-from .ensemble.dan import *
-from .ensemble.mixture_of_experts import *
-
-from .weights.weight_decay import *
-from .weights.weight_elimination import *
-
-from .steps.simple_step_minimization import *
-from .steps.search_then_converge import *
-from .steps.errdiff import *
-from .steps.leak_step import *
-from .steps.linear_search import *
-
-from .memory.discrete_hopfield_network import *
-from .memory.bam import *
-from .memory.cmac import *
-
-from .associative.oja import *
-from .associative.hebb import *
-from .associative.instar import *
-from .associative.kohonen import *
-
-from .competitive.sofm import *
-from .competitive.art import *
-
-from .rbfn.pnn import *
-from .rbfn.rbf_kmeans import *
-from .rbfn.grnn import *
-
-from .linear.lms import *
-from .linear.modify_relaxation import *
-from .linear.perceptron import *
+""" All algorithms get imported only at the first access, which
+means that ``import neupy.algorithms`` doesn't load any algorithm's
+module. Attribute access and ``from neupy.algorithms import PNN``
+import only the module that defines specified algorithm.
+"""
+import sys
+import pkgutil
+import importlib
+from types import ModuleType
+
+
+# Algorithm name -> module that defines it
+ALGORITHMS = {
+    'GradientDescent': 'gd.base',
+    'MinibatchGradientDescent': 'gd.base',
+    'ReplicatedGradientDescent': 'gd.replicas',
+    'LevenbergMarquardt': 'gd.lev_marq',
+    'QuasiNewton': 'gd.quasi_newton',
+    'ConjugateGradient': 'gd.conjgrad',
+    'Hessian': 'gd.hessian',
+    'HessianDiagonal': 'gd.hessdiag',
+    'HessianFree': 'gd.hessian_free',
+    'HessianBlockDiagonal': 'gd.hessblockdiag',
+    'RPROP': 'gd.rprop',
+    'IRPROPPlus': 'gd.rprop',
+    'Quickprop': 'gd.quickprop',
+    'Momentum': 'gd.momentum',
+    'Adadelta': 'gd.adadelta',
+    'Adagrad': 'gd.adagrad',
+    'RMSProp': 'gd.rmsprop',
+    'Adam': 'gd.adam',
+    'Adamax': 'gd.adamax',
+
+    'DynamicallyAveragedNetwork': 'ensemble.dan',
+    'MixtureOfExperts': 'ensemble.mixture_of_experts',
+
+    'WeightDecay': 'weights.weight_decay',
+    'WeightElimination': 'weights.weight_elimination',
+
+    'SimpleStepMinimization': 'steps.simple_step_minimization',
+    'SearchThenConverge': 'steps.search_then_converge',
+    'ErrDiffStepUpdate': 'steps.errdiff',
+    'LeakStepAdaptation': 'steps.leak_step',
+    'LinearSearch': 'steps.linear_search',
+
+    'DiscreteHopfieldNetwork': 'memory.discrete_hopfield_network',
+    'DiscreteBAM': 'memory.bam',
+    'CMAC': 'memory.cmac',
+
+    'Oja': 'associative.oja',
+    'HebbRule': 'associative.hebb',
+    'Instar': 'associative.instar',
+    'Kohonen': 'associative.kohonen',
+
+    'SOFM': 'competitive.sofm',
+    'ART1': 'competitive.art',
+
+    'PNN': 'rbfn.pnn',
+    'RBFKMeans': 'rbfn.rbf_kmeans',
+    'GRNN': 'rbfn.grnn',
+
+    'LMS': 'linear.lms',
+    'ModifiedRelaxation': 'linear.modify_relaxation',
+    'Perceptron': 'linear.perceptron',
+}
+
+__all__ = tuple(sorted(ALGORITHMS))
+
+
+class LazyModule(ModuleType):
+    """ Module that imports algorithms at the first access.
+    """
+    def __getattr__(self, name):
+        if name not in ALGORITHMS:
+            if name not in self.submodules():
+                raise AttributeError("Module {!r} has no attribute {!r}"
+                                     "".format(self.__name__, name))
+
+            # Subpackages, like ``algorithms.gd``, that haven't
+            # been imported yet.
+            return importlib.import_module('.' + name, self.__name__)
+
+        module = importlib.import_module('.' + ALGORITHMS[name],
+                                         self.__name__)
+        algorithm = getattr(module, name)
+        # Next time attribute will be found without this method
+        setattr(self, name, algorithm)
+
+        return algorithm
+
+    def submodules(self):
+        """ Names of the modules and subpackages that
+        this package contains.
+        """
+        return [name for _, name, _ in pkgutil.iter_modules(self.__path__)]
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(ALGORITHMS) |
+                      set(self.submodules()))
+
+
+lazy_module = LazyModule(__name__, __doc__)
+lazy_module.__dict__.update(sys.modules[__name__].__dict__)
+# Functions defined in this file refer to the original module's
+# namespace, which gets cleared in case if module would be deleted.
+lazy_module.original_module = sys.modules[__name__]
+sys.modules[__name__] = lazy_module
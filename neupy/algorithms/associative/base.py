@@ -26,6 +26,7 @@ class BaseAssociative(UnsupervisedLearning, BaseNetwork):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -83,6 +84,7 @@ class BaseStepAssociative(BaseAssociative):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
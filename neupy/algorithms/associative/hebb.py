@@ -34,6 +34,7 @@ class HebbRule(BaseStepAssociative):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -23,6 +23,7 @@ class Instar(BaseStepAssociative):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
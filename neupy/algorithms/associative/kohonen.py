@@ -29,6 +29,7 @@ class Kohonen(BaseAssociative):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -35,6 +35,7 @@ class Oja(UnsupervisedLearning, BaseNetwork):
     {BaseNetwork.show_epoch}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
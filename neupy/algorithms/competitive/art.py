@@ -31,6 +31,7 @@ class ART1(BaseNetwork):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
 
     Methods
     -------
@@ -1,8 +1,5 @@
-import theano
 import theano.tensor as T
-import numpy as np
 
-from neupy.utils import asfloat
 from neupy.core.properties import NumberProperty
 from .base import MinibatchGradientDescent
 
@@ -18,14 +15,23 @@ class Adagrad(MinibatchGradientDescent):
     epsilon : float
         Value need to be greater than ``0``. Defaults to ``1e-5``.
     {MinibatchGradientDescent.batch_size}
+    {MinibatchGradientDescent.prefetch}
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -34,17 +40,9 @@ class Adagrad(MinibatchGradientDescent):
     {SupervisedLearning.train}
     {BaseSkeleton.fit}
     """
-    epsilon = NumberProperty(default=1e-5, minval=0)
+    parameter_states = ('prev_mean_squred_grad',)
 
-    def init_layers(self):
-        super(Adagrad, self).init_layers()
-        for layer in self.layers:
-            for parameter in layer.parameters:
-                parameter_shape = T.shape(parameter).eval()
-                parameter.prev_mean_squred_grad = theano.shared(
-                    name="prev_mean_squred_grad_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
+    epsilon = NumberProperty(default=1e-5, minval=0)
 
     def init_param_updates(self, layer, parameter):
         prev_mean_squred_grad = parameter.prev_mean_squred_grad
@@ -1,8 +1,5 @@
-import theano
 import theano.tensor as T
-import numpy as np
 
-from neupy.utils import asfloat
 from neupy.core.properties import ProperFractionProperty, NumberProperty
 from .base import MinibatchGradientDescent
 
@@ -26,13 +23,22 @@ class Adamax(MinibatchGradientDescent):
     step : float
         Learning rate, defaults to ``0.001``.
     {MinibatchGradientDescent.batch_size}
+    {MinibatchGradientDescent.prefetch}
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -41,25 +47,16 @@ class Adamax(MinibatchGradientDescent):
     {SupervisedLearning.train}
     {BaseSkeleton.fit}
     """
+    parameter_states = (
+        'prev_first_moment',
+        'prev_weighted_inf_norm',
+    )
+
     step = NumberProperty(default=0.001, minval=0)
     beta1 = ProperFractionProperty(default=0.9)
     beta2 = ProperFractionProperty(default=0.999)
     epsilon = NumberProperty(default=1e-8, minval=0)
 
-    def init_layers(self):
-        super(Adamax, self).init_layers()
-        for layer in self.layers:
-            for parameter in layer.parameters:
-                parameter_shape = T.shape(parameter).eval()
-                parameter.prev_first_moment = theano.shared(
-                    name="prev_first_moment_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
-                parameter.prev_weighted_inf_norm = theano.shared(
-                    name="prev_weighted_inf_norm_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
-
     def init_param_updates(self, layer, parameter):
         epoch = self.variables.epoch
         prev_first_moment = parameter.prev_first_moment
@@ -1,14 +1,21 @@
 from __future__ import division
 
+import sys
 import math
+import threading
+from functools import partial
 
 import six
+from six.moves import queue
 import theano
 import theano.tensor as T
 import numpy as np
 
-from neupy.core.properties import Property, BoundedProperty
+from neupy.utils import (IndexedArray, asfloat,
+                         does_layer_accept_1d_feature)
+from neupy.core.properties import Property, BoundedProperty, IntProperty
 from neupy.network import ConstructableNetwork
+from neupy.network.utils import is_data_stream
 from . import addon_types
 
 
@@ -27,11 +34,19 @@ class GradientDescent(ConstructableNetwork):
         addon algorithms: weight update and step update.
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Attributes
@@ -60,6 +75,10 @@ class GradientDescent(ConstructableNetwork):
     """
     supported_addon_types = addon_types.keys()
 
+    # Names of the variables that algorithm stores for
+    # each layer's parameter, like previous gradient
+    parameter_states = ()
+
     addons = Property(default=None, expected_type=list)
 
     # TODO: The None parameters that get useful only in
@@ -120,6 +139,61 @@ class GradientDescent(ConstructableNetwork):
             options = kwargs
         super(GradientDescent, self).__init__(connection, **options)
 
+    def init_layers(self):
+        super(GradientDescent, self).init_layers()
+        self.init_parameter_states()
+
+    def init_parameter_states(self):
+        """ Allocates all variables listed in the ``parameter_states``
+        attribute for each layer's parameter. Each variable is
+        available as parameter's attribute with the same name.
+        Shapes are taken from the parameters' values, which doesn't
+        require any computations in Theano.
+        """
+        if not self.parameter_states:
+            return
+
+        for parameter in self.parameter_variables():
+            parameter_shape = parameter.get_value(borrow=True).shape
+
+            for state_name in self.parameter_states:
+                value = self.init_parameter_state(state_name,
+                                                  parameter_shape)
+                state = theano.shared(
+                    name='{}_{}'.format(state_name, parameter.name),
+                    value=asfloat(value),
+                )
+                setattr(parameter, state_name, state)
+
+    def init_flat_parameters(self):
+        parameters = self.parameter_variables()
+        super(GradientDescent, self).init_flat_parameters()
+
+        # Layers' parameters have been replaced with views
+        # and views should have the same states
+        views = [param for layer in self.layers
+                 for param in layer.parameters]
+        for parameter, view in zip(parameters, views):
+            for state_name in self.parameter_states:
+                setattr(view, state_name, getattr(parameter, state_name))
+
+    def init_parameter_state(self, state_name, parameter_shape):
+        """ Creates initial value for the parameter's variable.
+
+        Parameters
+        ----------
+        state_name : str
+            Name from the ``parameter_states`` attribute.
+        parameter_shape : tuple
+            Shape of the parameter.
+
+        Returns
+        -------
+        array-like
+            Array with zeros.
+        """
+        return np.zeros(parameter_shape)
+
     def init_param_updates(self, layer, parameter):
         step = self.variables.step
         gradient = T.grad(self.variables.error_func, wrt=parameter)
@@ -211,8 +285,75 @@ def cannot_divide_into_batches(data, batch_size):
     return batch_size is None or n_samples <= batch_size
 
 
+def iter_prefetched_batches(arguments, batches, prefetch):
+    """ Prepares batches in the background thread. Each batch is
+    sliced from the arguments, converted to the float type and
+    stored in contiguous memory block. Queue that holds prepared
+    batches is bounded, so at most ``prefetch`` batches are stored
+    in memory at the same time.
+
+    Parameters
+    ----------
+    arguments : tuple, list
+        Array-like variables that have exactly the same number
+        of rows.
+    batches : list
+        Batch slices.
+    prefetch : int
+        Number of batches that can be prepared in advance.
+
+    Yields
+    ------
+    list
+        Sliced arguments for each batch in the same order as
+        in the ``batches`` list.
+    """
+    batch_queue = queue.Queue(maxsize=prefetch)
+    stop_event = threading.Event()
+
+    def put(item):
+        while not stop_event.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def prepare_batches():
+        try:
+            for batch in batches:
+                sliced_arguments = [
+                    np.ascontiguousarray(asfloat(argument[batch]))
+                    for argument in arguments
+                ]
+                if not put((sliced_arguments, None)):
+                    return
+
+        except Exception:
+            put((None, sys.exc_info()))
+
+    thread = threading.Thread(target=prepare_batches)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        for _ in batches:
+            sliced_arguments, exc_info = batch_queue.get()
+
+            if exc_info is not None:
+                six.reraise(*exc_info)
+
+            yield sliced_arguments
+
+    finally:
+        stop_event.set()
+        thread.join()
+
+
 def apply_batches(function, arguments, batch_size, logger, description='',
-                  show_progressbar=False, use_error_output=True):
+                  show_progressbar=False, use_error_output=True,
+                  prefetch=0):
     """ Apply batches to a specified function.
 
     Parameters
@@ -233,6 +374,10 @@ def apply_batches(function, arguments, batch_size, logger, description='',
     show_progressbar : bool
         ``True`` mean that function will show progressbar in the
         terminal. Defaults to ``False``.
+    prefetch : int
+        Number of batches that will be prepared in the background
+        thread while function processes the current batch. Value
+        equal to ``0`` disables prefetching. Defaults to ``0``.
 
     Returns
     -------
@@ -245,29 +390,188 @@ def apply_batches(function, arguments, batch_size, logger, description='',
 
     samples = arguments[0]
     n_samples = len(samples)
-    batch_iterator = iter_batches(n_samples, batch_size)
+    batches = list(iter_batches(n_samples, batch_size))
+    batch_iterator = batches
 
     if show_progressbar:
         batch_iterator = logger.progressbar(
-            list(batch_iterator),
+            batches,
             desc=description,
             file=logger.stdout
         )
 
+    prefetched_batches = None
+    if prefetch:
+        prefetched_batches = iter_prefetched_batches(arguments, batches,
+                                                     prefetch)
+
     output = None
     outputs = []
-    for batch in batch_iterator:
-        if show_progressbar and logger.enable:
-            batch = batch_iterator.send(output if use_error_output else None)
 
-        sliced_arguments = [argument[batch] for argument in arguments]
-        output = function(*sliced_arguments)
+    try:
+        for batch in batch_iterator:
+            if show_progressbar and logger.enable:
+                batch = batch_iterator.send(
+                    output if use_error_output else None
+                )
+
+            if prefetched_batches is not None:
+                sliced_arguments = next(prefetched_batches)
+            else:
+                sliced_arguments = [argument[batch] for argument in arguments]
+
+            output = function(*sliced_arguments)
+            outputs.append(output)
+
+    finally:
+        if prefetched_batches is not None:
+            prefetched_batches.close()
+
+    return outputs
+
+
+def apply_batch_indices(function, n_samples, batch_size, logger,
+                        description='', show_progressbar=False,
+                        use_error_output=True):
+    """ Apply batch indices to a specified function. Function
+    should be able to get batch from the data by its index.
+
+    Parameters
+    ----------
+    function : func
+        Function that accepts batch index.
+    n_samples : int
+        Number of samples.
+    batch_size : int
+        Batch size.
+    logger : TerminalLogger instance
+    description : str
+        Short description that will be displayed near the progressbar
+        in verbose mode. Defaults to ``''`` (empty string).
+    show_progressbar : bool
+        ``True`` mean that function will show progressbar in the
+        terminal. Defaults to ``False``.
+
+    Returns
+    -------
+    list
+        List of function outputs.
+    """
+    n_batches = int(math.ceil(n_samples / batch_size))
+    batch_iterator = list(range(n_batches))
+
+    if show_progressbar:
+        batch_iterator = logger.progressbar(
+            batch_iterator,
+            desc=description,
+            file=logger.stdout
+        )
 
+    output = None
+    outputs = []
+    for batch_index in batch_iterator:
+        if show_progressbar and logger.enable:
+            batch_index = batch_iterator.send(
+                output if use_error_output else None
+            )
+
+        output = function(batch_index)
         outputs.append(output)
 
     return outputs
 
 
+class SharedArray(IndexedArray):
+    """ ``IndexedArray`` which data has been already stored in
+    the network's Theano shared variables. Network process this
+    data by batch indices and never transfers it to the compiled
+    functions.
+
+    Parameters
+    ----------
+    array : array-like
+        Data array that has been stored in the shared variable.
+    indices : array-like or None
+        Order in which rows should be processed. Defaults to ``None``.
+    """
+
+
+def create_shared_data(variable, name):
+    """ Creates empty shared variable that can store data for
+    the specified Theano variable.
+
+    Parameters
+    ----------
+    variable : Theano variable
+    name : str
+        Shared variable name.
+
+    Returns
+    -------
+    Theano shared variable
+    """
+    value = np.zeros((0,) * variable.ndim, dtype=variable.dtype)
+    return theano.shared(name=name, value=value, borrow=True)
+
+
+def is_memmap_data(data):
+    """ Checks whether data is a memory-mapped array or path
+    to the ``.npy`` file.
+
+    Parameters
+    ----------
+    data : object
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(data, (np.memmap, six.string_types))
+
+
+def format_memmap_data(data, is_feature1d=True):
+    """ Wraps memory-mapped data into the ``IndexedArray`` that reads
+    from the disk only rows that belong to the current batch.
+
+    Parameters
+    ----------
+    data : memmap or str
+        Memory-mapped array or path to the ``.npy`` file.
+    is_feature1d : bool
+        Defaults to ``True``.
+
+    Returns
+    -------
+    IndexedArray
+    """
+    if isinstance(data, six.string_types):
+        data = np.load(data, mmap_mode='r')
+
+    if data.ndim == 1:
+        n_features = data.shape[-1]
+        data_shape = (n_features, 1) if is_feature1d else (1, n_features)
+        data = data.reshape(data_shape)
+
+    return IndexedArray(data)
+
+
+def read_all_rows(data):
+    """ Reads all rows from the ``IndexedArray``. Other data
+    types stay unchanged.
+
+    Parameters
+    ----------
+    data : array-like or IndexedArray
+
+    Returns
+    -------
+    array-like
+    """
+    if isinstance(data, IndexedArray):
+        return data[:]
+    return data
+
+
 def average_batch_errors(errors, n_samples, batch_size):
     """ Computes average error per sample.
 
@@ -283,13 +587,14 @@ def average_batch_errors(errors, n_samples, batch_size):
 
     Returns
     -------
-    float
-        Average error per sample.
+    float or array-like
+        Average error per sample. Vector errors are averaged
+        element-wise.
     """
     n_samples_in_final_batch = n_samples % batch_size
 
     if n_samples_in_final_batch == 0:
-        return np.mean(errors)
+        return np.mean(errors, axis=0)
 
     all_errors_without_last = errors[:-1]
     last_error = errors[-1]
@@ -311,14 +616,34 @@ class MinibatchGradientDescent(GradientDescent):
         Set up batch size for learning process. To set up batch size equal to
         sample size value should be equal to one of the values listed above.
         Defaults to ``100``.
+    prefetch : int
+        Number of batches that will be prepared in the background
+        thread while network trains on the current batch. Value
+        equal to ``0`` disables prefetching. Defaults to ``0``.
+    shared_data : bool
+        If it's ``True`` network stores training and validation data
+        in Theano shared variables at the beginning of the training.
+        Compiled functions get batches from these variables by the
+        batch index, which removes overhead related to the data
+        transfer for each batch. Requires additional compilation
+        for the training and validation functions.
+        Defaults to ``False``.
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Attributes
@@ -347,11 +672,202 @@ class MinibatchGradientDescent(GradientDescent):
     ... )
     >>> mgdnet.train(x_train, y_train)
 
+    Datasets that don't fit in memory can be specified as
+    ``numpy.memmap`` arrays or paths to the ``.npy`` files.
+    Network reads from them only rows that belong to the current
+    batch and shuffles only row indices, without copying the data.
+
+    >>> x_train = np.load('x_train.npy', mmap_mode='r')
+    >>> mgdnet = algorithms.MinibatchGradientDescent(
+    ...     (2, 3, 1), batch_size=128, shuffle_data=True,
+    ... )
+    >>> mgdnet.train(x_train, 'y_train.npy')
+
     See Also
     --------
     :network:`GradientDescent` : GradientDescent algorithm.
     """
     batch_size = BatchSizeProperty(default=100)
+    prefetch = IntProperty(default=0, minval=0)
+    shared_data = Property(default=False, expected_type=bool)
+
+    def init_variables(self):
+        super(MinibatchGradientDescent, self).init_variables()
+
+        if not self.shared_data:
+            return
+
+        network_input = self.variables.network_input
+        network_output = self.variables.network_output
+
+        self.variables.update(
+            input_train_data=create_shared_data(network_input,
+                                                'input_train_data'),
+            target_train_data=create_shared_data(network_output,
+                                                 'target_train_data'),
+            input_test_data=create_shared_data(network_input,
+                                               'input_test_data'),
+            target_test_data=create_shared_data(network_output,
+                                                'target_test_data'),
+            train_indices=theano.shared(
+                name='train_indices',
+                value=np.zeros(0, dtype='int64'),
+            ),
+            batch_size=theano.shared(
+                name='batch_size',
+                value=np.int64(self.batch_size or 1),
+            ),
+        )
+
+    def init_methods(self):
+        super(MinibatchGradientDescent, self).init_methods()
+
+        if not self.shared_data:
+            return
+
+        network_input = self.variables.network_input
+        network_output = self.variables.network_output
+        batch_size = self.variables.batch_size
+
+        batch_index = T.iscalar('batch_index')
+        batch = slice(batch_index * batch_size,
+                      (batch_index + 1) * batch_size)
+        train_indices = self.variables.train_indices[batch]
+
+        def compile_train_batch():
+            return self.compile_function(
+                'train_batch',
+                inputs=[batch_index],
+                outputs=self.variables.error_func,
+                updates=self.init_train_updates(),
+                givens={
+                    network_input: self.variables.input_train_data[
+                        train_indices],
+                    network_output: self.variables.target_train_data[
+                        train_indices],
+                },
+            )
+
+        self.methods.add('train_batch', compile_train_batch)
+        self.methods.add('prediction_error_batch', partial(
+            self.compile_function, 'prediction_error_batch',
+            inputs=[batch_index],
+            outputs=self.variables.validation_error_func,
+            givens={
+                network_input: self.variables.input_test_data[batch],
+                network_output: self.variables.target_test_data[batch],
+            },
+        ))
+
+    def store_shared_data(self, input_data, target_data, input_variable,
+                          target_variable):
+        """ Stores data in the shared variables.
+
+        Parameters
+        ----------
+        input_data : array-like
+        target_data : array-like
+        input_variable : Theano shared variable
+        target_variable : Theano shared variable
+
+        Returns
+        -------
+        tuple
+            Two ``SharedArray`` instances that refer to the
+            stored input and target data.
+        """
+        input_data = read_all_rows(self.format_input_data(input_data))
+        target_data = read_all_rows(self.format_target_data(target_data))
+
+        input_variable.set_value(input_data, borrow=True)
+        target_variable.set_value(target_data, borrow=True)
+
+        return SharedArray(input_data), SharedArray(target_data)
+
+    def train(self, input_train, target_train=None, input_test=None,
+              target_test=None, *args, **kwargs):
+        """ Trains neural network.
+        """
+        if self.shared_data and not is_data_stream(input_train):
+            variables = self.variables
+            input_train, target_train = self.store_shared_data(
+                input_train, target_train,
+                variables.input_train_data, variables.target_train_data,
+            )
+
+            if input_test is not None and target_test is not None:
+                input_test, target_test = self.store_shared_data(
+                    input_test, target_test,
+                    variables.input_test_data, variables.target_test_data,
+                )
+
+        try:
+            return super(MinibatchGradientDescent, self).train(
+                input_train, target_train, input_test, target_test,
+                *args, **kwargs
+            )
+
+        finally:
+            if self.shared_data:
+                # Release memory that has been allocated for the data
+                for name in ('input_train_data', 'target_train_data',
+                             'input_test_data', 'target_test_data'):
+                    variable = self.variables[name]
+                    empty_value = np.zeros((0,) * variable.ndim,
+                                           dtype=variable.dtype)
+                    variable.set_value(empty_value)
+
+    def apply_shared_batches(self, function, n_samples, description):
+        """ Applies function that gets batches from the shared
+        variables and returns average error per sample.
+
+        Parameters
+        ----------
+        function : func
+            Compiled function that accepts batch index.
+        n_samples : int
+            Number of samples stored in the shared variables.
+        description : str
+            Progressbar description.
+
+        Returns
+        -------
+        float
+            Average error per sample.
+        """
+        batch_size = self.batch_size or n_samples
+        self.variables.batch_size.set_value(batch_size)
+
+        show_progressbar = (self.training and self.training.show_epoch == 1)
+        errors = apply_batch_indices(
+            function=function,
+            n_samples=n_samples,
+            batch_size=batch_size,
+
+            description=description,
+            show_progressbar=show_progressbar,
+            logger=self.logs,
+            use_error_output=True,
+        )
+        return average_batch_errors(errors, n_samples, batch_size)
+
+    def format_input_data(self, input_data):
+        if is_memmap_data(input_data):
+            is_feature1d = does_layer_accept_1d_feature(self.input_layer)
+            return format_memmap_data(input_data, is_feature1d)
+
+        return super(MinibatchGradientDescent, self).format_input_data(
+            input_data
+        )
+
+    def format_target_data(self, target_data):
+        if is_memmap_data(target_data):
+            is_feature1d = does_layer_accept_1d_feature(self.output_layer)
+            return format_memmap_data(target_data, is_feature1d)
+
+        return super(MinibatchGradientDescent, self).format_target_data(
+            target_data
+        )
 
     def train_epoch(self, input_train, target_train):
         """ Train one epoch.
@@ -368,13 +884,41 @@ class MinibatchGradientDescent(GradientDescent):
         float
             Training error.
         """
+        profile = self.training.get('profile')
+
+        if isinstance(input_train, SharedArray):
+            indices = input_train.indices
+            n_samples = len(input_train)
+            train_batch = self.methods.train_batch
+
+            if indices is None:
+                indices = np.arange(n_samples)
+
+            if profile is not None:
+                train_batch = profile.timed('train call', train_batch)
+
+            self.variables.train_indices.set_value(
+                np.asarray(indices, dtype='int64')
+            )
+            return self.apply_shared_batches(train_batch, n_samples,
+                                             'Training batches')
+
         train_epoch = self.methods.train_epoch
+        apply_train_batches = apply_batches
+
+        if profile is not None:
+            # Time spent outside of the compiled function
+            # goes to the batch slicing
+            train_epoch = profile.timed('train call', train_epoch)
+            apply_train_batches = profile.timed('batch slicing',
+                                                apply_batches)
 
         if cannot_divide_into_batches(input_train, self.batch_size):
-            return train_epoch(input_train, target_train)
+            return train_epoch(read_all_rows(input_train),
+                               read_all_rows(target_train))
 
         show_progressbar = (self.training and self.training.show_epoch == 1)
-        errors = apply_batches(
+        errors = apply_train_batches(
             function=train_epoch,
             arguments=(input_train, target_train),
             batch_size=self.batch_size,
@@ -383,6 +927,7 @@ class MinibatchGradientDescent(GradientDescent):
             show_progressbar=show_progressbar,
             logger=self.logs,
             use_error_output=True,
+            prefetch=self.prefetch,
         )
         return average_batch_errors(
             errors,
@@ -399,6 +944,41 @@ class MinibatchGradientDescent(GradientDescent):
         input_data : array-like
         target_data : array-like
 
+        Returns
+        -------
+        float
+            Prediction error.
+        """
+        # Subset of the shared samples can't be selected by the batch
+        # index, that's why it has to be passed to the function directly
+        is_shared = (isinstance(input_data, SharedArray) and
+                     input_data.indices is None)
+
+        if is_shared:
+            return self.apply_shared_batches(
+                self.methods.prediction_error_batch,
+                len(input_data), 'Validation batches'
+            )
+
+        show_progressbar = (self.training and self.training.show_epoch == 1)
+        return self.apply_prediction_error(self.methods.prediction_error,
+                                           input_data, target_data,
+                                           show_progressbar)
+
+    def apply_prediction_error(self, prediction_error, input_data,
+                               target_data, show_progressbar=False):
+        """ Applies function that computes prediction error to
+        each batch and returns average error per sample.
+
+        Parameters
+        ----------
+        prediction_error : function
+            Function that accepts input and target data.
+        input_data : array-like
+        target_data : array-like
+        show_progressbar : bool
+            Defaults to ``False``.
+
         Returns
         -------
         float
@@ -407,12 +987,10 @@ class MinibatchGradientDescent(GradientDescent):
         input_data = self.format_input_data(input_data)
         target_data = self.format_target_data(target_data)
 
-        prediction_error = self.methods.prediction_error
-
         if cannot_divide_into_batches(input_data, self.batch_size):
-            return prediction_error(input_data, target_data)
+            return prediction_error(read_all_rows(input_data),
+                                    read_all_rows(target_data))
 
-        show_progressbar = (self.training and self.training.show_epoch == 1)
         errors = apply_batches(
             function=prediction_error,
             arguments=(input_data, target_data),
@@ -422,6 +1000,7 @@ class MinibatchGradientDescent(GradientDescent):
             show_progressbar=show_progressbar,
             logger=self.logs,
             use_error_output=True,
+            prefetch=self.prefetch,
         )
         return average_batch_errors(
             errors,
@@ -429,6 +1008,23 @@ class MinibatchGradientDescent(GradientDescent):
             batch_size=self.batch_size,
         )
 
+    def snapshot_prediction_error(self):
+        """ Makes a copy of the network's parameters and returns function
+        that computes prediction error in mini-batches using them.
+
+        Returns
+        -------
+        function
+        """
+        prediction_error = super(MinibatchGradientDescent,
+                                 self).snapshot_prediction_error()
+
+        def batched_prediction_error(input_data, target_data):
+            return self.apply_prediction_error(prediction_error,
+                                               input_data, target_data)
+
+        return batched_prediction_error
+
     def predict_raw(self, input_data):
         """ Makes a raw prediction.
 
@@ -444,7 +1040,7 @@ class MinibatchGradientDescent(GradientDescent):
         predict_raw = self.methods.predict_raw
 
         if cannot_divide_into_batches(input_data, self.batch_size):
-            return predict_raw(input_data)
+            return predict_raw(read_all_rows(input_data))
 
         outputs = apply_batches(
             function=predict_raw,
@@ -455,6 +1051,7 @@ class MinibatchGradientDescent(GradientDescent):
             show_progressbar=True,
             logger=self.logs,
             use_error_output=False,
+            prefetch=self.prefetch,
         )
 
         return np.concatenate(outputs, axis=0)
@@ -7,7 +7,7 @@ from neupy.utils import asfloat
 from neupy.core.properties import ChoiceProperty
 from neupy.algorithms.gd import NoMultipleStepSelection
 from neupy.algorithms.utils import (parameters2vector, count_parameters,
-                                    iter_parameters, setup_parameter_updates)
+                                    setup_network_updates)
 from .base import GradientDescent
 
 
@@ -68,11 +68,19 @@ class ConjugateGradient(NoMultipleStepSelection, GradientDescent):
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
 
     Methods
     -------
@@ -161,7 +169,7 @@ class ConjugateGradient(NoMultipleStepSelection, GradientDescent):
         previous_gradient = self.variables.prev_gradient
 
         n_parameters = count_parameters(self)
-        parameters = list(iter_parameters(self))
+        parameters = self.parameter_variables()
         param_vector = parameters2vector(self)
 
         gradients = T.grad(self.variables.error_func, wrt=parameters)
@@ -180,8 +188,7 @@ class ConjugateGradient(NoMultipleStepSelection, GradientDescent):
             (previous_gradient, full_gradient),
             (previous_delta, parameter_delta),
         ]
-        parameter_updates = setup_parameter_updates(parameters,
-                                                    updated_parameters)
+        parameter_updates = setup_network_updates(self, updated_parameters)
         updates.extend(parameter_updates)
 
         return updates
@@ -0,0 +1,154 @@
+import theano
+import theano.tensor as T
+from theano.ifelse import ifelse
+import numpy as np
+
+from neupy.core.properties import (BoundedProperty, IntProperty,
+                                   TypedListProperty)
+from neupy.utils import asfloat
+from neupy.algorithms.gd import NoStepSelection
+from neupy.algorithms.utils import setup_parameter_updates
+from .base import GradientDescent
+from .hessian import find_hessian_and_gradient
+
+
+__all__ = ('HessianBlockDiagonal',)
+
+
+class HessianBlockDiagonal(NoStepSelection, GradientDescent):
+    """ Hessian block-diagonal approximation. Algorithm ignores
+    second derivatives between parameters from different layers
+    and inverts Hessian separately for each layer. Each block
+    contains all parameters of the layer, which makes blocks much
+    smaller than the full Hessian matrix in :network:`Hessian`
+    algorithm.
+
+    Parameters
+    ----------
+    penalty_const : float
+        Inverse hessian block could be singular matrix. For this
+        reason algorithm include penalty that add to each block
+        identity multiplied by defined constant. Defaults to ``1``.
+    layer_penalty_consts : list of float or None
+        Penalty constant for each layer that has parameters.
+        ``None`` means that all layers have penalty constant
+        equal to ``penalty_const``. Defaults to ``None``.
+    refresh_every : int
+        Number of epochs between Hessian updates. Between updates
+        algorithm uses the latest inverse Hessian blocks.
+        Defaults to ``1``.
+    {GradientDescent.addons}
+    {ConstructableNetwork.connection}
+    {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
+    {BaseNetwork.show_epoch}
+    {BaseNetwork.shuffle_data}
+    {BaseNetwork.epoch_end_signal}
+    {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
+    {Verbose.verbose}
+
+    Methods
+    -------
+    {BaseSkeleton.predict}
+    {SupervisedLearning.train}
+    {BaseSkeleton.fit}
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from neupy import algorithms
+    >>>
+    >>> x_train = np.array([[1, 2], [3, 4]])
+    >>> y_train = np.array([[1], [0]])
+    >>>
+    >>> hbdnet = algorithms.HessianBlockDiagonal(
+    ...     (2, 3, 1),
+    ...     layer_penalty_consts=[1, 0.1],
+    ...     refresh_every=5,
+    ...     verbose=False
+    ... )
+    >>> hbdnet.train(x_train, y_train, epochs=10)
+
+    See Also
+    --------
+    :network:`Hessian` : Newton's method.
+    :network:`HessianDiagonal` : Hessian diagonal approximation.
+    """
+    penalty_const = BoundedProperty(default=1, minval=0)
+    layer_penalty_consts = TypedListProperty(default=None,
+                                             element_type=(int, float))
+    refresh_every = IntProperty(default=1, minval=1)
+
+    def init_variables(self):
+        layers = [layer for layer in self.layers if layer.parameters]
+        block_sizes = [
+            sum(param.get_value(borrow=True).size
+                for param in layer.parameters)
+            for layer in layers
+        ]
+
+        super(HessianBlockDiagonal, self).init_variables()
+        penalty_consts = self.layer_penalty_consts
+
+        if penalty_consts is None:
+            penalty_consts = [self.penalty_const] * len(layers)
+
+        if len(penalty_consts) != len(layers):
+            raise ValueError("Expected {} layer penalty constants, got {}"
+                             "".format(len(layers), len(penalty_consts)))
+
+        if any(penalty_const < 0 for penalty_const in penalty_consts):
+            raise ValueError("Layer penalty constants should be "
+                             "non-negative")
+
+        inv_hessian_blocks = []
+        for i, block_size in enumerate(block_sizes, start=1):
+            inv_hessian_blocks.append(theano.shared(
+                name='inv_hessian_block_{}'.format(i),
+                value=asfloat(np.eye(block_size)),
+            ))
+
+        self.variables.update(
+            penalty_consts=penalty_consts,
+            inv_hessian_blocks=inv_hessian_blocks,
+        )
+
+    def init_train_updates(self):
+        epoch = self.variables.epoch
+        layers = [layer for layer in self.layers if layer.parameters]
+        should_refresh = T.eq((epoch - 1) % self.refresh_every, 0)
+
+        updates = []
+        blocks = zip(layers, self.variables.penalty_consts,
+                     self.variables.inv_hessian_blocks)
+
+        for layer, penalty_const, inv_hessian in blocks:
+            parameters = layer.parameters
+            param_vector = T.concatenate([param.flatten()
+                                          for param in parameters])
+
+            hessian, gradient = find_hessian_and_gradient(
+                self.variables.error_func, parameters)
+            n_parameters = hessian.shape[0]
+
+            new_inv_hessian = ifelse(
+                should_refresh,
+                T.nlinalg.matrix_inverse(
+                    hessian + asfloat(penalty_const) * T.eye(n_parameters)
+                ),
+                inv_hessian
+            )
+
+            updated_parameters = param_vector - new_inv_hessian.dot(gradient)
+            updates.extend(setup_parameter_updates(parameters,
+                                                   updated_parameters))
+            updates.append((inv_hessian, new_inv_hessian))
+
+        return self.merge_parameter_updates(updates)
@@ -3,7 +3,7 @@ from __future__ import division
 import theano.tensor as T
 
 from neupy.core.properties import ProperFractionProperty
-from neupy.algorithms.utils import (parameters2vector, setup_parameter_updates,
+from neupy.algorithms.utils import (parameters2vector, setup_network_updates,
                                     iter_parameters)
 from neupy.algorithms.gd import NoMultipleStepSelection
 from .base import GradientDescent
@@ -27,11 +27,19 @@ class HessianDiagonal(NoMultipleStepSelection, GradientDescent):
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -137,6 +145,4 @@ class HessianDiagonal(NoMultipleStepSelection, GradientDescent):
             param_vector -
             step * full_gradient / hessian_diag
         )
-        updates = setup_parameter_updates(parameters, updated_parameters)
-
-        return updates
+        return setup_network_updates(self, updated_parameters)
@@ -6,7 +6,7 @@ from neupy.core.properties import BoundedProperty
 from neupy.utils import asfloat
 from neupy.algorithms.gd import NoStepSelection
 from neupy.algorithms.utils import (parameters2vector, count_parameters,
-                                    iter_parameters, setup_parameter_updates)
+                                    setup_network_updates)
 from .base import GradientDescent
 
 
@@ -64,10 +64,18 @@ class Hessian(NoStepSelection, GradientDescent):
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -84,7 +92,7 @@ class Hessian(NoStepSelection, GradientDescent):
 
     def init_train_updates(self):
         n_parameters = count_parameters(self)
-        parameters = list(iter_parameters(self))
+        parameters = self.parameter_variables()
         param_vector = parameters2vector(self)
         penalty_const = asfloat(self.penalty_const)
 
@@ -96,6 +104,4 @@ class Hessian(NoStepSelection, GradientDescent):
         )
 
         updated_parameters = param_vector - hessian_inverse.dot(full_gradient)
-        updates = setup_parameter_updates(parameters, updated_parameters)
-
-        return updates
+        return setup_network_updates(self, updated_parameters)
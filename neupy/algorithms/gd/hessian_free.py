@@ -0,0 +1,269 @@
+import theano
+import theano.tensor as T
+
+from neupy.core.properties import (BoundedProperty, IntProperty,
+                                   ChoiceProperty)
+from neupy.utils import asfloat
+from neupy.algorithms.gd import NoStepSelection
+from neupy.algorithms.utils import (parameters2vector, setup_network_updates,
+                                    setup_parameter_updates)
+from .base import GradientDescent
+
+
+__all__ = ('HessianFree',)
+
+
+def vector2parameters(vector, parameters):
+    """ Splits vector into the parts that have the same shapes
+    as parameters.
+
+    Parameters
+    ----------
+    vector : Theano variable
+    parameters : list
+
+    Returns
+    -------
+    list
+    """
+    updates = setup_parameter_updates(parameters, vector)
+    return [value for _, value in updates]
+
+
+def hessian_vector_product(error_function, parameters, vector):
+    """ Finds product between the Hessian matrix and vector
+    without computing the Hessian.
+
+    Parameters
+    ----------
+    error_function : Theano variable
+    parameters : list
+    vector : Theano variable
+        Vector with the same number of elements as in
+        all parameters.
+
+    Returns
+    -------
+    Theano variable
+    """
+    gradients = T.grad(error_function, wrt=parameters)
+    vectors = vector2parameters(vector, parameters)
+
+    # Derivative of the gradient in the direction of the vector
+    directional_derivative = T.sum([
+        T.sum(gradient * value)
+        for gradient, value in zip(gradients, vectors)])
+
+    products = T.grad(directional_derivative, wrt=parameters,
+                      consider_constant=[vector])
+    return T.concatenate([product.flatten() for product in products])
+
+
+def gauss_newton_vector_product(error_function, output, parameters, vector):
+    """ Finds product between the Gauss-Newton matrix ``J' * H * J``
+    and vector, where ``J`` is a Jacobian of the network's output and
+    ``H`` is a Hessian of the error function with respect to the
+    network's output.
+
+    Parameters
+    ----------
+    error_function : Theano variable
+    output : Theano variable
+        Network's output.
+    parameters : list
+    vector : Theano variable
+        Vector with the same number of elements as in
+        all parameters.
+
+    Returns
+    -------
+    Theano variable
+    """
+    vectors = vector2parameters(vector, parameters)
+    # R-operator finds product between Jacobian and vector
+    jacobian_product = T.Rop(output, parameters, vectors)
+
+    output_gradient = T.grad(error_function, wrt=output)
+    hessian_product = T.grad(T.sum(output_gradient * jacobian_product),
+                             wrt=output, consider_constant=[jacobian_product])
+
+    products = T.Lop(output, parameters, hessian_product)
+    return T.concatenate([product.flatten() for product in products])
+
+
+def conjugate_gradient(matrix_vector_product, vector, n_iterations,
+                       tolerance):
+    """ Approximately solves linear system ``A * x = b`` with
+    conjugate gradient method. Method stops when residual becomes
+    small, when it finds direction with non-positive curvature
+    or after specified number of iterations. In case if the first
+    direction has non-positive curvature method returns vector ``b``.
+
+    Parameters
+    ----------
+    matrix_vector_product : callable
+        Function that accepts vector ``v`` and returns ``A * v``.
+    vector : Theano variable
+        Vector ``b``.
+    n_iterations : int
+        Maximum number of iterations.
+    tolerance : float
+        Method stops when norm of the residual becomes smaller
+        than norm of the ``b`` multiplied by this value.
+
+    Returns
+    -------
+    Theano variable
+        Solution ``x``.
+    """
+    initial_norm = T.sum(vector ** 2)
+    min_norm = asfloat(tolerance ** 2) * initial_norm
+
+    def iteration(i, solution, residual, direction, residual_norm):
+        product = matrix_vector_product(direction)
+        curvature = T.sum(direction * product)
+        is_positive = T.gt(curvature, 0)
+
+        # Non-positive curvature means that matrix isn't positive
+        # definite and in this case step doesn't change solution.
+        # The only exception is the first iteration, since it
+        # is better to return ``b`` than zeros.
+        alpha = T.switch(is_positive, residual_norm / curvature,
+                         T.eq(i, 0))
+        solution = solution + alpha * direction
+        residual = residual - alpha * product
+
+        new_residual_norm = T.sum(residual ** 2)
+        beta = T.switch(is_positive, new_residual_norm / residual_norm, 0)
+        direction = residual + beta * direction
+
+        stop = T.or_(T.invert(is_positive),
+                     T.le(new_residual_norm, min_norm))
+        return (
+            [solution, residual, direction, new_residual_norm],
+            theano.scan_module.until(stop)
+        )
+
+    (solutions, _, _, _), _ = theano.scan(
+        iteration,
+        sequences=T.arange(n_iterations),
+        outputs_info=[T.zeros_like(vector), vector, vector, initial_norm],
+    )
+    return solutions[-1]
+
+
+class HessianFree(NoStepSelection, GradientDescent):
+    """ Hessian-free (truncated Newton) optimization. Algorithm
+    finds Newton's direction with conjugate gradient method which
+    requires only products between curvature matrix and vectors.
+    Products can be computed without building curvature matrix,
+    which makes algorithm suitable for the networks where
+    :network:`Hessian` algorithm can't store full matrix.
+
+    Parameters
+    ----------
+    penalty_const : float
+        Curvature matrix could be singular or indefinite. For this
+        reason algorithm include penalty that add to curvature matrix
+        identity multiplied by defined constant. Defaults to ``1``.
+    curvature : {{'gauss-newton', 'hessian'}}
+        Curvature matrix. ``gauss-newton`` matrix is positive
+        semi-definite for the convex error functions, like mse or
+        cross entropy. ``hessian`` uses exact Hessian, which might
+        be indefinite and in this case conjugate gradient stops
+        earlier. Defaults to ``gauss-newton``.
+    max_cg_iterations : int
+        Maximum number of the conjugate gradient iterations per
+        epoch. Defaults to ``20``.
+    cg_tolerance : float
+        Conjugate gradient stops when norm of the residual becomes
+        smaller than norm of the gradient multiplied by this value.
+        Defaults to ``1e-5``.
+    {GradientDescent.addons}
+    {ConstructableNetwork.connection}
+    {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
+    {BaseNetwork.show_epoch}
+    {BaseNetwork.shuffle_data}
+    {BaseNetwork.epoch_end_signal}
+    {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
+    {Verbose.verbose}
+
+    Methods
+    -------
+    {BaseSkeleton.predict}
+    {SupervisedLearning.train}
+    {BaseSkeleton.fit}
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from neupy import algorithms
+    >>>
+    >>> x_train = np.array([[1, 2], [3, 4]])
+    >>> y_train = np.array([[1], [0]])
+    >>>
+    >>> hfnet = algorithms.HessianFree(
+    ...     (2, 3, 1),
+    ...     max_cg_iterations=10,
+    ...     verbose=False
+    ... )
+    >>> hfnet.train(x_train, y_train)
+
+    See Also
+    --------
+    :network:`Hessian` : Hessian optimization.
+    :network:`HessianDiagonal` : Hessian diagonal approximation.
+    """
+    penalty_const = BoundedProperty(default=1, minval=0)
+    curvature = ChoiceProperty(default='gauss-newton',
+                               choices=['gauss-newton', 'hessian'])
+    max_cg_iterations = IntProperty(default=20, minval=1)
+    cg_tolerance = BoundedProperty(default=1e-5, minval=0)
+
+    def curvature_product(self, parameters, vector):
+        """ Finds product between damped curvature matrix and vector.
+
+        Parameters
+        ----------
+        parameters : list
+        vector : Theano variable
+
+        Returns
+        -------
+        Theano variable
+        """
+        error_func = self.variables.error_func
+
+        if self.curvature == 'hessian':
+            product = hessian_vector_product(error_func, parameters, vector)
+        else:
+            product = gauss_newton_vector_product(
+                error_func, self.variables.train_prediction_func,
+                parameters, vector)
+
+        return product + asfloat(self.penalty_const) * vector
+
+    def init_train_updates(self):
+        parameters = self.parameter_variables()
+        param_vector = parameters2vector(self)
+
+        gradients = T.grad(self.variables.error_func, wrt=parameters)
+        full_gradient = T.concatenate([grad.flatten() for grad in gradients])
+
+        newton_direction = conjugate_gradient(
+            lambda vector: self.curvature_product(parameters, vector),
+            -full_gradient,
+            n_iterations=self.max_cg_iterations,
+            tolerance=self.cg_tolerance,
+        )
+
+        updated_parameters = param_vector + newton_direction
+        return setup_network_updates(self, updated_parameters)
@@ -1,15 +1,20 @@
+from functools import partial
+
 import theano
 import theano.tensor as T
 from theano.ifelse import ifelse
+from theano.tensor import slinalg
 import numpy as np
 
 from neupy.utils import asfloat
+from neupy.layers import ActivationLayer, Dropout
 from neupy.network import errors
-from neupy.core.properties import BoundedProperty, ChoiceProperty
+from neupy.core.properties import (BoundedProperty, ChoiceProperty,
+                                   IntProperty)
 from neupy.algorithms import GradientDescent
 from neupy.algorithms.gd import NoStepSelection
-from neupy.algorithms.utils import (parameters2vector, iter_parameters,
-                                    setup_parameter_updates)
+from neupy.algorithms.gd.base import iter_batches
+from neupy.algorithms.utils import parameters2vector, setup_network_updates
 
 
 __all__ = ('LevenbergMarquardt',)
@@ -48,6 +53,101 @@ def compute_jaccobian(errors, parameters):
     return T.concatenate(jaccobians, axis=1)
 
 
+def propagate_dense_layers(layers, input_value):
+    """ Propagates input through the layers and collects input
+    and summated input for each layer that has parameters.
+
+    Parameters
+    ----------
+    layers : list of BaseLayer instances
+    input_value : Theano variable
+
+    Returns
+    -------
+    tuple or None
+        Network's output and list of ``(input, summated_input)``
+        pairs. ``None`` in case if network has layers that are
+        different from ``Dropout`` and ``ActivationLayer``.
+    """
+    layer_inputs = []
+
+    for layer in layers:
+        if isinstance(layer, Dropout):
+            input_value = layer.output(input_value)
+            continue
+
+        if not isinstance(layer, ActivationLayer):
+            return None
+
+        if layer.size is not None:
+            summated_input = T.dot(input_value, layer.weight) + layer.bias
+            layer_inputs.append((input_value, summated_input))
+            input_value = summated_input
+
+        input_value = layer.activation_function(input_value)
+
+    return input_value, layer_inputs
+
+
+def compute_batch_jaccobian(errors, layer_inputs):
+    """ Compute Jacobbian for all samples at once. Each error
+    depends only on one sample, which means that gradient of the
+    errors' sum with respect to the summated inputs contains
+    derivatives for each sample separately. Jacobbian for the
+    weight is an outer product of the layer's input and this
+    derivative.
+
+    Parameters
+    ----------
+    errors : Theano variable
+        Computed MSE for each sample separetly.
+    layer_inputs : list of tuples
+        Input and summated input for each layer that has parameters.
+
+    Returns
+    -------
+    Theano variable
+    """
+    n_samples = errors.shape[0]
+    summated_inputs = [summated for _, summated in layer_inputs]
+    deltas = T.grad(T.sum(errors), wrt=summated_inputs)
+
+    jaccobians = []
+    for (input_value, _), delta in zip(layer_inputs, deltas):
+        weight_jaccobian = (input_value.dimshuffle(0, 1, 'x') *
+                            delta.dimshuffle(0, 'x', 1))
+        jaccobians.append(weight_jaccobian.reshape((n_samples, -1)))
+        jaccobians.append(delta)
+
+    return T.concatenate(jaccobians, axis=1)
+
+
+def solve_positive_definite(matrix, vector):
+    """ Solves linear system with positive definite matrix using
+    Cholesky decomposition. In case if decomposition fails, for
+    instance because of the rounding errors, system gets solved
+    with LU decomposition.
+
+    Parameters
+    ----------
+    matrix : Theano variable
+    vector : Theano variable
+
+    Returns
+    -------
+    Theano variable
+    """
+    cholesky = slinalg.Cholesky(lower=True, on_error='nan')(matrix)
+    cholesky_solution = slinalg.solve_upper_triangular(
+        cholesky.T, slinalg.solve_lower_triangular(cholesky, vector))
+
+    return ifelse(
+        T.any(T.isnan(cholesky)),
+        slinalg.solve(matrix, vector),
+        cholesky_solution,
+    )
+
+
 class LevenbergMarquardt(NoStepSelection, GradientDescent):
     """ Levenberg-Marquardt algorithm.
 
@@ -65,6 +165,32 @@ class LevenbergMarquardt(NoStepSelection, GradientDescent):
     error: {{'mse'}}
         Levenberg-Marquardt works only for quadratic functions.
         Defaults to ``mse``.
+    jacobian : {{'backprop', 'scan'}}
+        Method that computes Jacobian. ``backprop`` computes it for
+        all samples at once using derivatives with respect to the
+        layers' summated inputs. ``scan`` computes gradient for each
+        sample separately. Network uses ``scan`` in case if it has
+        layers different from activation and dropout layers.
+        Defaults to ``backprop``.
+    jacobian_batch_size : int or None
+        Number of samples for which network computes Jacobian at
+        once. Network accumulates ``J.T * J`` matrix and ``J.T * e``
+        vector over the batches, which means that memory usage
+        doesn't depend on the number of samples. ``None`` means that
+        network computes Jacobian for all samples at once.
+        Defaults to ``None``.
+    subsample : float or None
+        Fraction of the training samples that network randomly
+        selects for each epoch. ``None`` means that network uses
+        all samples. Defaults to ``None``.
+    mu_retries : int
+        Maximum number of times network increases ``mu`` and solves
+        damped system again during one epoch in case if step doesn't
+        reduce the error. Jacobian is computed only once per epoch.
+        Rejected steps don't change parameters. Value equal to ``0``
+        means that network updates ``mu`` once per epoch, based on
+        the error from the previous epoch, and always applies the
+        step. Defaults to ``0``.
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {BaseNetwork.step}
@@ -72,6 +198,7 @@ class LevenbergMarquardt(NoStepSelection, GradientDescent):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -146,6 +273,10 @@ class LevenbergMarquardt(NoStepSelection, GradientDescent):
     mu = BoundedProperty(default=0.01, minval=0)
     mu_update_factor = BoundedProperty(default=5, minval=1)
     error = ChoiceProperty(default='mse', choices={'mse': errors.mse})
+    jacobian = ChoiceProperty(default='backprop', choices=['backprop', 'scan'])
+    jacobian_batch_size = IntProperty(minval=1)
+    subsample = BoundedProperty(minval=0, maxval=1)
+    mu_retries = IntProperty(default=0, minval=0)
 
     def init_variables(self):
         super(LevenbergMarquardt, self).init_variables()
@@ -154,39 +285,245 @@ class LevenbergMarquardt(NoStepSelection, GradientDescent):
             last_error=theano.shared(name='last_error', value=np.nan),
         )
 
-    def init_train_updates(self):
+    def init_methods(self):
+        super(LevenbergMarquardt, self).init_methods()
+
+        network_input = self.variables.network_input
+        network_output = self.variables.network_output
+
+        def compile_jaccobian_products():
+            J, mse_for_each_sample = self.init_jaccobian()
+            return self.compile_function(
+                'jaccobian_products',
+                inputs=[network_input, network_output],
+                outputs=[
+                    J.T.dot(J),
+                    J.T.dot(mse_for_each_sample),
+                    T.sum(mse_for_each_sample),
+                ],
+            )
+
+        def compile_apply_updates():
+            hessian = T.matrix('hessian')
+            gradient = T.vector('gradient')
+            error = T.scalar('error')
+
+            return self.compile_function(
+                'apply_updates',
+                inputs=[hessian, gradient, error],
+                outputs=[],
+                updates=self.init_lm_updates(hessian, gradient, error),
+            )
+
+        def compile_apply_step():
+            hessian = T.matrix('hessian')
+            gradient = T.vector('gradient')
+            mu = T.scalar('mu')
+
+            return self.compile_function(
+                'apply_step',
+                inputs=[hessian, gradient, mu],
+                outputs=[],
+                updates=self.init_step_updates(hessian, gradient, mu),
+            )
+
+        prediction_func = self.variables.prediction_func
+        mse_for_each_sample = T.mean(
+            (network_output - prediction_func) ** 2,
+            axis=1
+        )
+
+        self.methods.add('jaccobian_products', compile_jaccobian_products)
+        self.methods.add('apply_updates', compile_apply_updates)
+        self.methods.add('apply_step', compile_apply_step)
+        self.methods.add('error_sum', partial(
+            self.compile_function, 'error_sum',
+            inputs=[network_input, network_output],
+            outputs=T.sum(mse_for_each_sample),
+        ))
+
+    def init_jaccobian(self):
+        """ Builds Jacobian and errors for each sample.
+
+        Returns
+        -------
+        tuple
+            Jacobian and MSE for each sample.
+        """
+        network_input = self.variables.network_input
         network_output = self.variables.network_output
         prediction_func = self.variables.train_prediction_func
+
+        propagated = None
+        if self.jacobian == 'backprop':
+            propagated = propagate_dense_layers(self.layers, network_input)
+
+        if propagated is not None:
+            prediction_func, layer_inputs = propagated
+
+        mse_for_each_sample = T.mean(
+            (network_output - prediction_func) ** 2,
+            axis=1
+        )
+
+        if propagated is not None:
+            J = compute_batch_jaccobian(mse_for_each_sample, layer_inputs)
+        else:
+            params = self.parameter_variables()
+            J = compute_jaccobian(mse_for_each_sample, params)
+
+        return J, mse_for_each_sample
+
+    def init_lm_updates(self, hessian, gradient, error):
+        """ Builds updates that solve damped normal equations.
+
+        Parameters
+        ----------
+        hessian : Theano variable
+            Approximation of the Hessian, ``J.T * J`` matrix.
+        gradient : Theano variable
+            Gradient vector, ``J.T * e``.
+        error : Theano variable
+            Error before the update.
+
+        Returns
+        -------
+        list
+        """
         last_error = self.variables.last_error
-        error_func = self.variables.error_func
         mu = self.variables.mu
 
         new_mu = ifelse(
-            T.lt(last_error, error_func),
+            T.lt(last_error, error),
             mu * self.mu_update_factor,
             mu / self.mu_update_factor,
         )
 
-        mse_for_each_sample = T.mean(
-            (network_output - prediction_func) ** 2,
-            axis=1
-        )
+        updates = [(mu, new_mu)]
+        updates.extend(self.init_step_updates(hessian, gradient, new_mu))
+        return updates
+
+    def init_step_updates(self, hessian, gradient, mu):
+        """ Builds parameter updates for the specified damping.
 
-        params = list(iter_parameters(self))
+        Parameters
+        ----------
+        hessian : Theano variable
+        gradient : Theano variable
+        mu : Theano variable
+
+        Returns
+        -------
+        list
+        """
         param_vector = parameters2vector(self)
 
-        J = compute_jaccobian(mse_for_each_sample, params)
-        n_params = J.shape[1]
+        n_params = hessian.shape[0]
+        updated_params = param_vector - solve_positive_definite(
+            hessian + mu * T.eye(n_params),
+            gradient,
+        )
 
-        updated_params = param_vector - T.nlinalg.matrix_inverse(
-            J.T.dot(J) + new_mu * T.eye(n_params)
-        ).dot(J.T).dot(mse_for_each_sample)
+        return setup_network_updates(self, updated_params)
 
-        updates = [(mu, new_mu)]
-        parameter_updates = setup_parameter_updates(params, updated_params)
-        updates.extend(parameter_updates)
+    def init_train_updates(self):
+        J, mse_for_each_sample = self.init_jaccobian()
+        return self.init_lm_updates(
+            hessian=J.T.dot(J),
+            gradient=J.T.dot(mse_for_each_sample),
+            error=self.variables.error_func,
+        )
 
-        return updates
+    def train_epoch(self, input_train, target_train):
+        if self.subsample is not None:
+            n_samples = len(input_train)
+            subsample_size = max(1, int(round(self.subsample * n_samples)))
+            indices = np.random.choice(n_samples, subsample_size,
+                                       replace=False)
+
+            input_train = input_train[indices]
+            target_train = target_train[indices]
+
+        if self.jacobian_batch_size is None and not self.mu_retries:
+            return super(LevenbergMarquardt, self).train_epoch(input_train,
+                                                               target_train)
+
+        hessian, gradient, error = self.sum_over_batches(
+            self.methods.jaccobian_products, input_train, target_train)
+
+        # Per-sample errors are averaged only over the outputs
+        n_samples = len(input_train)
+        error = error / n_samples
+
+        if not self.mu_retries:
+            self.methods.apply_updates(asfloat(hessian), asfloat(gradient),
+                                       asfloat(error))
+            return error
+
+        previous_error = error
+        if any(isinstance(layer, Dropout) for layer in self.layers):
+            # Training error depends on dropout and can't be compared
+            # with the error after the step
+            previous_error, = self.sum_over_batches(
+                self.methods.error_sum, input_train, target_train)
+            previous_error = previous_error / n_samples
+
+        parameters = self.parameter_variables()
+        parameter_values = [param.get_value() for param in parameters]
+        mu = self.variables.mu.get_value()
+
+        for _ in range(self.mu_retries + 1):
+            self.methods.apply_step(asfloat(hessian), asfloat(gradient),
+                                    asfloat(mu))
+            new_error, = self.sum_over_batches(self.methods.error_sum,
+                                               input_train, target_train)
+
+            if new_error / n_samples < previous_error:
+                mu /= self.mu_update_factor
+                break
+
+            # Rejected step doesn't change parameters
+            for parameter, value in zip(parameters, parameter_values):
+                parameter.set_value(value)
+
+            mu *= self.mu_update_factor
+
+        self.variables.mu.set_value(asfloat(mu))
+        return error
+
+    def sum_over_batches(self, function, input_data, target_data):
+        """ Applies function to the batches of samples and sums
+        up its outputs.
+
+        Parameters
+        ----------
+        function : function
+            Function that accepts input and target data.
+        input_data : array-like
+        target_data : array-like
+
+        Returns
+        -------
+        list
+            Sum of the each function's output.
+        """
+        n_samples = len(input_data)
+        batch_size = self.jacobian_batch_size or n_samples
+        outputs = None
+
+        for batch in iter_batches(n_samples, batch_size):
+            batch_outputs = function(input_data[batch], target_data[batch])
+
+            if not isinstance(batch_outputs, list):
+                batch_outputs = [batch_outputs]
+
+            if outputs is None:
+                outputs = batch_outputs
+            else:
+                outputs = [output + batch_output for output, batch_output
+                           in zip(outputs, batch_outputs)]
+
+        return outputs
 
     def on_epoch_start_update(self, epoch):
         super(LevenbergMarquardt, self).on_epoch_start_update(epoch)
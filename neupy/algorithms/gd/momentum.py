@@ -1,8 +1,5 @@
-import theano
 import theano.tensor as T
-import numpy as np
 
-from neupy.utils import asfloat
 from neupy.core.properties import ProperFractionProperty, Property
 from .base import MinibatchGradientDescent
 
@@ -21,14 +18,23 @@ class Momentum(MinibatchGradientDescent):
         Instead of classic momentum computes Nesterov momentum.
         Defaults to ``False``.
     {MinibatchGradientDescent.batch_size}
+    {MinibatchGradientDescent.prefetch}
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -57,19 +63,11 @@ class Momentum(MinibatchGradientDescent):
     --------
     :network:`GradientDescent` : GradientDescent algorithm.
     """
+    parameter_states = ('prev_param_delta',)
+
     momentum = ProperFractionProperty(default=0.9)
     nesterov = Property(default=False, expected_type=bool)
 
-    def init_layers(self):
-        super(Momentum, self).init_layers()
-        for layer in self.layers:
-            for parameter in layer.parameters:
-                parameter_shape = T.shape(parameter).eval()
-                parameter.prev_param_delta = theano.shared(
-                    name="prev_param_delta_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
-
     def init_param_updates(self, layer, parameter):
         step = self.variables.step
         gradient = T.grad(self.variables.error_func, wrt=parameter)
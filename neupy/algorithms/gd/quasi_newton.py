@@ -4,10 +4,10 @@ from theano.ifelse import ifelse
 import numpy as np
 
 from neupy.core.properties import (ChoiceProperty, ProperFractionProperty,
-                                   NumberProperty)
+                                   NumberProperty, IntProperty)
 from neupy.algorithms.gd import NoStepSelection
-from neupy.algorithms.utils import (parameters2vector, iter_parameters,
-                                    setup_parameter_updates)
+from neupy.algorithms.utils import (parameters2vector, count_parameters,
+                                    setup_network_updates)
 from neupy.optimizations.wolfe import line_search
 from neupy.utils import asfloat
 from .base import GradientDescent
@@ -83,18 +83,108 @@ def sr1(inverse_hessian, weight_delta, gradient_delta, epsilon=1e-8):
     )
 
 
+def lbfgs(weight_deltas, gradient_deltas, gradient, last_index,
+          memory_size, h0_scale=1., epsilon=1e-10):
+    """ Finds product between approximation of the inverse Hessian
+    and gradient using L-BFGS two-loop recursion. Method doesn't
+    store inverse Hessian and uses only a few latest weight and
+    gradient changes.
+
+    Parameters
+    ----------
+    weight_deltas : Theano variable
+        Matrix with shape ``(memory_size, n_parameters)`` that works
+        as a ring buffer for the weight changes.
+    gradient_deltas : Theano variable
+        Matrix with the same shape as ``weight_deltas`` that stores
+        corresponding gradient changes.
+    gradient : Theano variable
+    last_index : Theano variable
+        Index of the latest pair of changes in the ring buffers.
+    memory_size : int
+        Number of rows in the ring buffers.
+    h0_scale : float
+        Scale of the initial inverse Hessian approximation in case
+        if there are no valid pairs. Defaults to ``1``.
+    epsilon : float
+        Pairs that have curvature ``y' * s`` smaller than this
+        value are ignored. Empty rows in buffers are ignored as well.
+        Defaults to ``1e-10``.
+
+    Returns
+    -------
+    Theano variable
+    """
+    epsilon = asfloat(epsilon)
+
+    # Pairs ordered from the latest one to the oldest one
+    pairs = []
+    for i in range(memory_size):
+        index = (last_index - i) % memory_size
+        weight_delta = weight_deltas[index]
+        gradient_delta = gradient_deltas[index]
+
+        curvature = T.dot(gradient_delta, weight_delta)
+        is_valid = T.gt(curvature, epsilon)
+        rho = T.switch(is_valid, asfloat(1.) / curvature, 0)
+
+        pairs.append((weight_delta, gradient_delta, rho, is_valid))
+
+    alphas = []
+    direction = gradient
+    for weight_delta, gradient_delta, rho, _ in pairs:
+        alpha = rho * T.dot(weight_delta, direction)
+        direction = direction - alpha * gradient_delta
+        alphas.append(alpha)
+
+    last_weight_delta, last_gradient_delta, _, is_valid = pairs[0]
+    scale = T.switch(
+        is_valid,
+        T.dot(last_weight_delta, last_gradient_delta) /
+        T.dot(last_gradient_delta, last_gradient_delta),
+        asfloat(h0_scale)
+    )
+    direction = scale * direction
+
+    for (weight_delta, gradient_delta, rho, _), alpha in reversed(
+            list(zip(pairs, alphas))):
+        beta = rho * T.dot(gradient_delta, direction)
+        direction = direction + (alpha - beta) * weight_delta
+
+    return direction
+
+
 class QuasiNewton(NoStepSelection, GradientDescent):
     """ Quasi-Newton algorithm optimization.
 
     Parameters
     ----------
+    update_function : {{'bfgs', 'dfp', 'psb', 'sr1', 'lbfgs'}}
+        Function that updates inverse Hessian approximation.
+        Function ``lbfgs`` doesn't store inverse Hessian, instead
+        it stores a few latest weight and gradient changes.
+        Defaults to ``bfgs``.
+    memory_size : int
+        Number of the latest weight and gradient changes that
+        ``lbfgs`` update function stores. Defaults to ``10``.
+    h0_scale : float
+        Scale of the initial inverse Hessian approximation.
+        Defaults to ``1``.
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -131,19 +221,36 @@ class QuasiNewton(NoStepSelection, GradientDescent):
             'dfp': dfp,
             'psb': psb,
             'sr1': sr1,
+            'lbfgs': lbfgs,
         }
     )
+    memory_size = IntProperty(default=10, minval=1)
     h0_scale = NumberProperty(default=1, minval=0)
     gradient_tol = ProperFractionProperty(default=1e-5)
 
     def init_variables(self):
         super(QuasiNewton, self).init_variables()
-        n_params = sum(p.get_value().size for p in iter_parameters(self))
-        self.variables.update(
-            inv_hessian=theano.shared(
+        n_params = count_parameters(self)
+
+        if self.update_function is lbfgs:
+            buffer_shape = (self.memory_size, n_params)
+            self.variables.update(
+                weight_deltas=theano.shared(
+                    name='weight_deltas',
+                    value=asfloat(np.zeros(buffer_shape)),
+                ),
+                gradient_deltas=theano.shared(
+                    name='gradient_deltas',
+                    value=asfloat(np.zeros(buffer_shape)),
+                ),
+            )
+        else:
+            self.variables.inv_hessian = theano.shared(
                 name='inv_hessian',
                 value=asfloat(self.h0_scale * np.eye(int(n_params))),
-            ),
+            )
+
+        self.variables.update(
             prev_params=theano.shared(
                 name='prev_params',
                 value=asfloat(np.zeros(n_params)),
@@ -157,24 +264,55 @@ class QuasiNewton(NoStepSelection, GradientDescent):
     def init_train_updates(self):
         network_input = self.variables.network_input
         network_output = self.variables.network_output
-        inv_hessian = self.variables.inv_hessian
         prev_params = self.variables.prev_params
         prev_full_gradient = self.variables.prev_full_gradient
 
-        params = list(iter_parameters(self))
+        params = self.parameter_variables()
         param_vector = parameters2vector(self)
 
         gradients = T.grad(self.variables.error_func, wrt=params)
         full_gradient = T.concatenate([grad.flatten() for grad in gradients])
 
-        new_inv_hessian = ifelse(
-            T.eq(self.variables.epoch, 1),
-            inv_hessian,
-            self.update_function(inv_hessian,
-                                 param_vector - prev_params,
-                                 full_gradient - prev_full_gradient)
-        )
-        param_delta = -new_inv_hessian.dot(full_gradient)
+        is_first_epoch = T.eq(self.variables.epoch, 1)
+        weight_delta = param_vector - prev_params
+        gradient_delta = full_gradient - prev_full_gradient
+
+        if self.update_function is lbfgs:
+            weight_deltas = self.variables.weight_deltas
+            gradient_deltas = self.variables.gradient_deltas
+
+            epoch = T.cast(self.variables.epoch, 'int32')
+            last_index = (epoch - 2) % self.memory_size
+
+            new_weight_deltas = ifelse(
+                is_first_epoch,
+                weight_deltas,
+                T.set_subtensor(weight_deltas[last_index], weight_delta)
+            )
+            new_gradient_deltas = ifelse(
+                is_first_epoch,
+                gradient_deltas,
+                T.set_subtensor(gradient_deltas[last_index], gradient_delta)
+            )
+            param_delta = -lbfgs(new_weight_deltas, new_gradient_deltas,
+                                 full_gradient, last_index,
+                                 memory_size=self.memory_size,
+                                 h0_scale=self.h0_scale)
+            history_updates = [
+                (weight_deltas, new_weight_deltas),
+                (gradient_deltas, new_gradient_deltas),
+            ]
+
+        else:
+            inv_hessian = self.variables.inv_hessian
+            new_inv_hessian = ifelse(
+                is_first_epoch,
+                inv_hessian,
+                self.update_function(inv_hessian, weight_delta,
+                                     gradient_delta)
+            )
+            param_delta = -new_inv_hessian.dot(full_gradient)
+            history_updates = [(inv_hessian, new_inv_hessian)]
 
         def prediction(step):
             # TODO: I need to update this ugly solution later
@@ -203,10 +341,10 @@ class QuasiNewton(NoStepSelection, GradientDescent):
 
         step = asfloat(line_search(phi, derphi))
         updated_params = param_vector + step * param_delta
-        updates = setup_parameter_updates(params, updated_params)
+        updates = setup_network_updates(self, updated_params)
 
+        updates.extend(history_updates)
         updates.extend([
-            (inv_hessian, new_inv_hessian),
             (prev_params, param_vector),
             (prev_full_gradient, full_gradient),
         ])
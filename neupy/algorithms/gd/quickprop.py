@@ -1,12 +1,9 @@
 from __future__ import division
 
-import theano
 import theano.tensor as T
 from theano.ifelse import ifelse
-import numpy as np
 
 from neupy.core.properties import BoundedProperty
-from neupy.utils import asfloat
 from .base import GradientDescent
 
 
@@ -23,11 +20,19 @@ class Quickprop(GradientDescent):
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -56,21 +61,12 @@ class Quickprop(GradientDescent):
     --------
     :network:`GradientDescent` : GradientDescent algorithm.
     """
-    upper_bound = BoundedProperty(default=1, minval=0)
+    parameter_states = (
+        'prev_delta',
+        'prev_gradient',
+    )
 
-    def init_layers(self):
-        super(Quickprop, self).init_layers()
-        for layer in self.layers:
-            for parameter in layer.parameters:
-                parameter_shape = T.shape(parameter).eval()
-                parameter.prev_delta = theano.shared(
-                    name="prev_delta_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
-                parameter.prev_gradient = theano.shared(
-                    name="prev_grad_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
+    upper_bound = BoundedProperty(default=1, minval=0)
 
     def init_param_updates(self, layer, parameter):
         step = self.variables.step
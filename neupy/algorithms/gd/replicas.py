@@ -0,0 +1,342 @@
+import theano
+import theano.tensor as T
+import numpy as np
+
+from neupy.utils import asfloat
+from neupy.core.properties import IntProperty, TypedListProperty
+from neupy.layers import ActivationLayer, Dropout
+from neupy.layers.utils import generate_weight
+from neupy.network.base import ErrorHistoryList, is_valid_error_value
+from .base import (MinibatchGradientDescent, apply_batches,
+                   cannot_divide_into_batches, read_all_rows)
+
+
+__all__ = ('ReplicatedGradientDescent',)
+
+
+class ReplicaErrorHistoryList(ErrorHistoryList):
+    """ Error history that in addition to the average error
+    stores errors for each replica.
+
+    Parameters
+    ----------
+    n_replicas : int
+        Number of replicas.
+    errors : iterable
+        Initial errors. Defaults to empty tuple.
+    max_size : int or None
+        Maximum number of the latest errors that list stores.
+        Defaults to ``None``.
+    """
+    def __init__(self, n_replicas, errors=(), max_size=None):
+        self.n_replicas = n_replicas
+        super(ReplicaErrorHistoryList, self).__init__(errors, max_size)
+
+    def reset(self):
+        super(ReplicaErrorHistoryList, self).reset()
+        self.replica_values = np.empty((self.values.size, self.n_replicas))
+
+    def stored_errors(self):
+        return list(self.replicas())
+
+    def to_float(self, error):
+        if is_valid_error_value(error) and np.ndim(error) > 0:
+            return float(np.mean(error))
+        return super(ReplicaErrorHistoryList, self).to_float(error)
+
+    def to_replica_values(self, error):
+        if not is_valid_error_value(error):
+            return np.nan
+        return np.asarray(error, dtype=float)
+
+    def append(self, error):
+        super(ReplicaErrorHistoryList, self).append(error)
+
+        replica_values = self.replica_values
+        if len(replica_values) != self.values.size:
+            # Values array has grown, indices in both arrays
+            # should stay the same
+            self.replica_values = np.concatenate([replica_values,
+                                                  replica_values])
+
+        self.replica_values[self.array_index(-1)] = self.to_replica_values(
+            error)
+
+    def replicas(self):
+        """ Returns errors for each replica.
+
+        Returns
+        -------
+        array
+            Array with shape ``(n_errors, n_replicas)`` in order
+            in which errors were added.
+        """
+        indices = np.arange(self.start, self.start + self.length)
+        return self.replica_values[indices % self.values.size]
+
+    def __setitem__(self, index, error):
+        super(ReplicaErrorHistoryList, self).__setitem__(index, error)
+
+        if not isinstance(index, slice):
+            position = self.array_index(index)
+            self.replica_values[position] = self.to_replica_values(error)
+
+
+def replicate_parameter(parameter, n_replicas, bounds, init_method):
+    """ Stacks parameter with its randomly initialized copies
+    along the new leading axis.
+
+    Parameters
+    ----------
+    parameter : Theano shared variable
+        Parameter's value is used for the first replica.
+    n_replicas : int
+    bounds : tuple
+    init_method : str
+
+    Returns
+    -------
+    Theano shared variable
+    """
+    value = parameter.get_value()
+    replicas = [value] + [
+        generate_weight(value.shape, bounds, init_method)
+        for _ in range(n_replicas - 1)
+    ]
+    return theano.shared(value=asfloat(np.stack(replicas)),
+                         name=parameter.name)
+
+
+class ReplicatedGradientDescent(MinibatchGradientDescent):
+    """ Trains a few replicas of the same network at the same time.
+    Each layer's parameter stores all replicas along the first
+    axis and network trains them with one compiled function, which
+    makes it faster than training the same networks one after
+    another. Replicas can be used for the ``step`` or random weight
+    initialization search. Network supports only layers with
+    activation functions and dropout.
+
+    Parameters
+    ----------
+    n_replicas : int
+        Number of the network replicas. First replica gets weights
+        from the layers and other replicas get initialized randomly.
+    replica_steps : list of float or None
+        Learning rate for each replica. ``None`` means that all
+        replicas have the same learning rate equal to ``step``.
+        Defaults to ``None``.
+    {MinibatchGradientDescent.batch_size}
+    {MinibatchGradientDescent.prefetch}
+    {MinibatchGradientDescent.shared_data}
+    {ConstructableNetwork.connection}
+    {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
+    {BaseNetwork.step}
+    {BaseNetwork.show_epoch}
+    {BaseNetwork.shuffle_data}
+    {BaseNetwork.epoch_end_signal}
+    {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
+    {Verbose.verbose}
+
+    Attributes
+    ----------
+    errors : ReplicaErrorHistoryList
+        Contains average training error among all replicas.
+        Method ``errors.replicas()`` returns array with
+        training errors for each replica.
+    {BaseNetwork.train_errors}
+    validation_errors : ReplicaErrorHistoryList
+        The same as `errors` attribute, but it contains only
+        validation errors.
+    {BaseNetwork.last_epoch}
+
+    Methods
+    -------
+    {BaseSkeleton.predict}
+    {SupervisedLearning.train}
+    {BaseSkeleton.fit}
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from neupy import algorithms
+    >>>
+    >>> x_train = np.array([[1, 2], [3, 4]])
+    >>> y_train = np.array([[1], [0]])
+    >>>
+    >>> rgdnet = algorithms.ReplicatedGradientDescent(
+    ...     (2, 3, 1),
+    ...     n_replicas=3,
+    ...     replica_steps=[0.01, 0.1, 1],
+    ...     verbose=False
+    ... )
+    >>> rgdnet.train(x_train, y_train, epochs=10)
+    >>> rgdnet.errors.replicas().shape
+    (10, 3)
+
+    See Also
+    --------
+    :network:`MinibatchGradientDescent` : Mini-batch Gradient Descent \
+    algorithm.
+    """
+    supported_addon_types = ()
+
+    n_replicas = IntProperty(required=True, minval=1)
+    replica_steps = TypedListProperty(default=None,
+                                      element_type=(int, float))
+
+    def __init__(self, connection, options=None, floatX=None, **kwargs):
+        super(ReplicatedGradientDescent, self).__init__(
+            connection, options, floatX, **kwargs)
+
+        error_history_size = self.error_history_size
+        self.errors = self.train_errors = ReplicaErrorHistoryList(
+            self.n_replicas, max_size=error_history_size)
+        self.validation_errors = ReplicaErrorHistoryList(
+            self.n_replicas, max_size=error_history_size)
+
+    def init_variables(self):
+        n_replicas = self.n_replicas
+        steps = self.replica_steps
+
+        if steps is None:
+            steps = [self.step] * n_replicas
+
+        if len(steps) != n_replicas:
+            raise ValueError("Expected {} replica steps, got {}"
+                             "".format(n_replicas, len(steps)))
+
+        for layer in self.layers:
+            if isinstance(layer, Dropout):
+                continue
+
+            if not isinstance(layer, ActivationLayer):
+                raise ValueError("Layer {!r} can't be replicated"
+                                 "".format(layer))
+
+            if layer.size is None:
+                continue
+
+            parameter_shapes = [('weight', layer.weight_shape()),
+                                ('bias', layer.bias_shape())]
+
+            for attrname, shape in parameter_shapes:
+                parameter = getattr(layer, attrname)
+                parameter_shape = parameter.get_value(borrow=True).shape
+
+                # Layers from the unpickled network already
+                # contain parameters for all replicas
+                if parameter_shape == (n_replicas,) + shape:
+                    continue
+
+                if parameter_shape != shape:
+                    raise ValueError("Parameter {} has shape {}, expected "
+                                     "{} or {}".format(
+                                         parameter.name, parameter_shape,
+                                         shape, (n_replicas,) + shape))
+
+                setattr(layer, attrname, replicate_parameter(
+                    parameter, n_replicas, layer.bounds, layer.init_method))
+
+            layer.parameters = [layer.weight, layer.bias]
+
+        # Input variable's type depends on the number of weight's
+        # dimensions, which is different for replicated parameters
+        self.variables.network_input = T.matrix('x')
+
+        super(ReplicatedGradientDescent, self).init_variables()
+        self.variables.step = theano.shared(name='step',
+                                            value=asfloat(np.array(steps)))
+
+    def layer_output(self, layer, input_value):
+        if isinstance(layer, Dropout):
+            return layer.output(input_value)
+
+        if layer.size is not None:
+            weight, bias = layer.weight, layer.bias
+
+            if input_value.ndim == 2:
+                # The same input for all replicas
+                input_value = T.tensordot(input_value, weight, axes=[1, 1])
+                input_value = input_value.dimshuffle(1, 0, 2)
+            else:
+                input_value = T.batched_dot(input_value, weight)
+
+            input_value = input_value + bias.dimshuffle(0, 'x', 1)
+
+        # Some activation functions, like softmax,
+        # accept only matrices
+        output_shape = input_value.shape
+        output = layer.activation_function(
+            input_value.reshape((-1, output_shape[-1])))
+
+        return output.reshape(output_shape)
+
+    def error_output(self, expected, predicted):
+        return T.stack([self.error(expected, predicted[i])
+                        for i in range(self.n_replicas)])
+
+    def init_param_updates(self, layer, parameter):
+        step = self.variables.step
+        step = step.dimshuffle(0, *(['x'] * (parameter.ndim - 1)))
+
+        # Replicas don't depend on each other and gradient
+        # of the sum is a gradient for each replica
+        gradient = T.grad(self.variables.error_func.sum(), wrt=parameter)
+        return [(parameter, parameter - step * gradient)]
+
+    def predict_raw(self, input_data):
+        """ Makes a raw prediction for each replica.
+
+        Parameters
+        ----------
+        input_data : array-like
+
+        Returns
+        -------
+        array-like
+            Array with shape ``(n_replicas, n_samples, n_outputs)``.
+        """
+        input_data = self.format_input_data(input_data)
+        predict_raw = self.methods.predict_raw
+
+        if cannot_divide_into_batches(input_data, self.batch_size):
+            return predict_raw(read_all_rows(input_data))
+
+        outputs = apply_batches(
+            function=predict_raw,
+            arguments=(input_data,),
+            batch_size=self.batch_size,
+
+            description='Prediction batches',
+            show_progressbar=True,
+            logger=self.logs,
+            use_error_output=False,
+            prefetch=self.prefetch,
+        )
+
+        return np.concatenate(outputs, axis=1)
+
+    def predict(self, input_data):
+        """ Makes prediction for each replica.
+
+        Parameters
+        ----------
+        input_data : array-like
+
+        Returns
+        -------
+        array-like
+            Array with predictions from each replica
+            stacked along the first axis.
+        """
+        raw_prediction = self.predict_raw(input_data)
+        return np.array([self.output_layer.output(prediction)
+                         for prediction in raw_prediction])
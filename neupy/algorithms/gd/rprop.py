@@ -2,7 +2,6 @@ import theano
 import theano.tensor as T
 import numpy as np
 
-from neupy.utils import asfloat
 from neupy.algorithms.gd import StepSelectionBuiltIn
 from neupy.core.properties import BoundedProperty, ProperFractionProperty
 from .base import GradientDescent
@@ -29,10 +28,18 @@ class RPROP(StepSelectionBuiltIn, GradientDescent):
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
@@ -62,6 +69,11 @@ class RPROP(StepSelectionBuiltIn, GradientDescent):
     :network:`IRPROPPlus` : iRPROP+ algorithm.
     :network:`GradientDescent` : GradientDescent algorithm.
     """
+    parameter_states = (
+        'prev_delta',
+        'prev_gradient',
+        'steps',
+    )
 
     # This properties correct upper and lower bounds for steps.
     minstep = BoundedProperty(default=0.1, minval=0)
@@ -72,23 +84,12 @@ class RPROP(StepSelectionBuiltIn, GradientDescent):
     increase_factor = BoundedProperty(minval=1, default=1.2)
     decrease_factor = ProperFractionProperty(default=0.5)
 
-    def init_layers(self):
-        super(RPROP, self).init_layers()
-        for layer in self.layers:
-            for parameter in layer.parameters:
-                parameter_shape = T.shape(parameter).eval()
-                parameter.prev_delta = theano.shared(
-                    name="prev_delta_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
-                parameter.prev_gradient = theano.shared(
-                    name="prev_grad_" + parameter.name,
-                    value=asfloat(np.zeros(parameter_shape)),
-                )
-                parameter.steps = theano.shared(
-                    name="steps_{}" + parameter.name,
-                    value=asfloat(np.ones(parameter_shape) * self.step),
-                )
+    def init_parameter_state(self, state_name, parameter_shape):
+        if state_name == 'steps':
+            return np.ones(parameter_shape) * self.step
+
+        return super(RPROP, self).init_parameter_state(state_name,
+                                                       parameter_shape)
 
     def init_prev_delta(self, parameter):
         return parameter.prev_delta
@@ -144,10 +145,18 @@ class IRPROPPlus(RPROP):
     {GradientDescent.addons}
     {ConstructableNetwork.connection}
     {ConstructableNetwork.error}
+    {ConstructableNetwork.profile}
+    {ConstructableNetwork.function_cache_dir}
+    {ConstructableNetwork.share_functions}
+    {ConstructableNetwork.compile_mode}
+    {ConstructableNetwork.optimizer}
+    {ConstructableNetwork.function_modes}
+    {ConstructableNetwork.flat_parameters}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Methods
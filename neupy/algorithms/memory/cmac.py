@@ -30,6 +30,7 @@ class CMAC(SupervisedLearning, BaseNetwork):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
 
     Attributes
     ----------
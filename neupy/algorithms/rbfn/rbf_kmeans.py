@@ -25,6 +25,7 @@ class RBFKMeans(NoStepSelection, UnsupervisedLearning, BaseNetwork):
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Attributes
@@ -5,7 +5,7 @@ import theano.tensor as T
 
 
 __all__ = ('count_parameters', 'parameters2vector', 'iter_parameters',
-           'setup_parameter_updates')
+           'setup_parameter_updates', 'setup_network_updates')
 
 
 def iter_parameters(network):
@@ -37,8 +37,12 @@ def parameters2vector(network):
     Returns
     -------
     object
-        Returns concatenated parameters in one big vector.
+        Returns concatenated parameters in one big vector. Network
+        with flat parameters returns its parameter vector.
     """
+    if network.flat_parameters:
+        return network.variables.parameter_vector
+
     params = iter_parameters(network)
     return T.concatenate([param.flatten() for param in params])
 
@@ -55,7 +59,7 @@ def count_parameters(network):
     int
         Number of parameters.
     """
-    params = iter_parameters(network)
+    params = network.parameter_variables()
     return np.sum([param.get_value().size for param in params])
 
 
@@ -89,3 +93,25 @@ def setup_parameter_updates(parameters, parameter_update_vector):
         start_position = end_position
 
     return updates
+
+
+def setup_network_updates(network, parameter_update_vector):
+    """ Creates update rules for all network parameters from one
+    vector. Network with flat parameters updates its parameter
+    vector without splitting it into separate parameters.
+
+    Parameters
+    ----------
+    network : ConstructableNetwork instance
+    parameter_update_vector : Theano varible
+
+    Returns
+    -------
+    list
+    """
+    if network.flat_parameters:
+        parameter_vector = network.variables.parameter_vector
+        return [(parameter_vector, parameter_update_vector)]
+
+    parameters = list(iter_parameters(network))
+    return setup_parameter_updates(parameters, parameter_update_vector)
@@ -8,6 +8,11 @@ __all__ = ('sandbox', 'reproducible')
 
 
 def sandbox():
+    """ Speeds up compilation of the Theano functions for all networks
+    in the current process. Mode can be specified for the specific
+    network with the ``compile_mode`` and ``optimizer`` options,
+    which don't modify global Theano configuration.
+    """
     theano.config.linker = 'py'
     theano.config.mode = 'FAST_COMPILE'
     theano.config.optimizer = 'fast_compile'
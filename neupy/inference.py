@@ -0,0 +1,575 @@
+""" Forward pass of the trained networks implemented only with NumPy.
+Module doesn't import Theano, which means that it can be used in
+processes that only make predictions and don't need to compile
+anything. Networks can be exported with the ``export_inference``
+method that available in all constructable networks.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+
+__all__ = ('InferenceNetwork', 'Dense', 'Activation', 'Convolution',
+           'Pooling', 'Reshape', 'Output', 'CompetitiveOutput',
+           'StepOutput', 'RoundedOutput', 'ArgmaxOutput')
+
+
+def linear(value):
+    pass
+
+
+def sigmoid(value):
+    # Equivalent to the 1 / (1 + exp(-x)), but doesn't
+    # overflow for the big negative values.
+    value *= 0.5
+    np.tanh(value, out=value)
+    value *= 0.5
+    value += 0.5
+
+
+def hard_sigmoid(value):
+    value *= 0.2
+    value += 0.5
+    np.clip(value, 0, 1, out=value)
+
+
+def step(value):
+    np.greater(value, 0, out=value)
+
+
+def tanh(value):
+    np.tanh(value, out=value)
+
+
+def relu(value):
+    np.maximum(value, 0, out=value)
+
+
+def softplus(value):
+    np.logaddexp(value, 0, out=value)
+
+
+def softmax(value):
+    value -= value.max(axis=1, keepdims=True)
+    np.exp(value, out=value)
+    value /= value.sum(axis=1, keepdims=True)
+
+
+# All activation functions modify the input array
+ACTIVATIONS = {
+    'linear': linear,
+    'sigmoid': sigmoid,
+    'hard_sigmoid': hard_sigmoid,
+    'step': step,
+    'tanh': tanh,
+    'relu': relu,
+    'softplus': softplus,
+    'softmax': softmax,
+}
+
+
+def sliding_windows(value, window_shape, stride):
+    """ Creates view that contains all windows with the specified
+    shape that slide over the last two dimensions. Function doesn't
+    copy data.
+
+    Parameters
+    ----------
+    value : array-like
+    window_shape : tuple with 2 integers
+    stride : tuple with 2 integers
+
+    Returns
+    -------
+    array-like
+        Array with 4 more dimensions than in the input.
+        Last 4 dimensions are window's positions and window's values.
+    """
+    height, width = value.shape[-2:]
+    window_height, window_width = window_shape
+    stride_height, stride_width = stride
+    row_stride, column_stride = value.strides[-2:]
+
+    output_height = (height - window_height) // stride_height + 1
+    output_width = (width - window_width) // stride_width + 1
+
+    return as_strided(
+        value,
+        shape=value.shape[:-2] + (output_height, output_width,
+                                  window_height, window_width),
+        strides=value.strides[:-2] + (row_stride * stride_height,
+                                      column_stride * stride_width,
+                                      row_stride, column_stride),
+        writeable=False,
+    )
+
+
+def pad_last_dimensions(value, padding, fill_value=0):
+    """ Adds constant values around last two dimensions.
+    """
+    pad_height, pad_width = padding
+
+    if not pad_height and not pad_width:
+        return value
+
+    pad_widths = [(0, 0)] * (value.ndim - 2)
+    pad_widths.extend([(pad_height, pad_height), (pad_width, pad_width)])
+
+    return np.pad(value, pad_widths, mode='constant',
+                  constant_values=fill_value)
+
+
+def windows_output_shape(input_shape, window_shape, stride, padding):
+    height, width = input_shape[-2:]
+    output_height = (height + 2 * padding[0] - window_shape[0])
+    output_width = (width + 2 * padding[1] - window_shape[1])
+
+    return input_shape[:-2] + (output_height // stride[0] + 1,
+                               output_width // stride[1] + 1)
+
+
+class Operation(object):
+    """ Base class for the operations in the inference network.
+
+    Attributes
+    ----------
+    has_buffer : bool
+        ``True`` means that operation writes its output in the
+        preallocated array.
+    """
+    has_buffer = True
+
+    def output_shape(self, input_shape):
+        """ Shape of the operation's output for one sample.
+
+        Parameters
+        ----------
+        input_shape : tuple
+
+        Returns
+        -------
+        tuple
+        """
+        return input_shape
+
+    def output(self, input_value, output_buffer):
+        """ Computes operation's output.
+
+        Parameters
+        ----------
+        input_value : array-like
+        output_buffer : array-like or None
+            Preallocated array for the output. ``None`` in case if
+            operation doesn't need it.
+
+        Returns
+        -------
+        array-like
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return '{}()'.format(self.__class__.__name__)
+
+
+class Dense(Operation):
+    """ Fully connected layer with activation function.
+
+    Parameters
+    ----------
+    weight : 2D array
+    bias : 1D array
+    activation : str
+        Activation function name.
+    """
+    def __init__(self, weight, bias, activation):
+        self.weight = weight
+        self.bias = bias
+        self.activation = activation
+
+    def output_shape(self, input_shape):
+        return self.weight.shape[1:]
+
+    def output(self, input_value, output_buffer):
+        np.dot(input_value, self.weight, out=output_buffer)
+        output_buffer += self.bias
+        ACTIVATIONS[self.activation](output_buffer)
+        return output_buffer
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__,
+                                   self.weight.shape, self.activation)
+
+
+class Activation(Operation):
+    """ Activation function without parameters.
+
+    Parameters
+    ----------
+    activation : str
+        Activation function name.
+    """
+    def __init__(self, activation):
+        self.activation = activation
+
+    def output(self, input_value, output_buffer):
+        # Input can be an array that has been specified by the user,
+        # so activation has to modify its copy.
+        np.copyto(output_buffer, input_value)
+        ACTIVATIONS[self.activation](output_buffer)
+        return output_buffer
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.activation)
+
+
+class Convolution(Operation):
+    """ Convolution with the same behaviour as in the Theano's
+    ``conv2d`` function. Filters are flipped before convolution.
+
+    Parameters
+    ----------
+    weight : 4D array
+        Filters with shape ``(n_filters, n_channels, height, width)``.
+    bias : 1D array
+    border_mode : {'valid', 'full', 'half'}, int or tuple with 2 int
+    stride : tuple with 2 integers
+    """
+    def __init__(self, weight, bias, border_mode='valid', stride=(1, 1)):
+        filter_height, filter_width = weight.shape[-2:]
+
+        if border_mode == 'valid':
+            padding = (0, 0)
+        elif border_mode == 'full':
+            padding = (filter_height - 1, filter_width - 1)
+        elif border_mode == 'half':
+            padding = (filter_height // 2, filter_width // 2)
+        elif isinstance(border_mode, int):
+            padding = (border_mode, border_mode)
+        else:
+            padding = tuple(border_mode)
+
+        # Convolution multiplies input by the flipped filters
+        self.weight = np.ascontiguousarray(weight[:, :, ::-1, ::-1])
+        self.bias = bias.reshape((1, -1, 1, 1))
+        self.padding = padding
+        self.stride = tuple(stride)
+
+    def output_shape(self, input_shape):
+        n_filters = self.weight.shape[0]
+        output_shape = windows_output_shape(input_shape,
+                                            self.weight.shape[-2:],
+                                            self.stride, self.padding)
+        return (n_filters,) + output_shape[1:]
+
+    def output(self, input_value, output_buffer):
+        input_value = pad_last_dimensions(input_value, self.padding)
+        windows = sliding_windows(input_value, self.weight.shape[-2:],
+                                  self.stride)
+
+        np.einsum('nchwij,fcij->nfhw', windows, self.weight,
+                  out=output_buffer, optimize=True)
+        output_buffer += self.bias
+        return output_buffer
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.weight.shape)
+
+
+class Pooling(Operation):
+    """ Pooling over last two dimensions with the same behaviour as
+    in the Theano's ``pool_2d`` function with ``ignore_border=True``.
+
+    Parameters
+    ----------
+    size : tuple with 2 integers
+    stride : tuple with 2 integers or None
+        ``None`` means that stride is equal to the ``size``.
+    padding : tuple with 2 integers
+    mode : {'max', 'average_inc_pad', 'average_exc_pad'}
+    """
+    def __init__(self, size, stride=None, padding=(0, 0), mode='max'):
+        self.size = tuple(size)
+        self.stride = self.size if stride is None else tuple(stride)
+        self.padding = tuple(padding)
+        self.mode = mode
+        self.window_sizes = None
+
+    def output_shape(self, input_shape):
+        return windows_output_shape(input_shape, self.size, self.stride,
+                                    self.padding)
+
+    def count_window_values(self, input_shape):
+        """ Counts number of the input values in each window,
+        excluding padding.
+
+        Parameters
+        ----------
+        input_shape : tuple with 2 integers
+            Shape of the last two input's dimensions.
+        """
+        ones = np.ones(input_shape)
+        windows = sliding_windows(pad_last_dimensions(ones, self.padding),
+                                  self.size, self.stride)
+        return windows.sum(axis=(-2, -1))
+
+    def output(self, input_value, output_buffer):
+        # Padding doesn't affect maximum value
+        fill_value = -np.inf if self.mode == 'max' else 0
+        windows = sliding_windows(
+            pad_last_dimensions(input_value, self.padding, fill_value),
+            self.size, self.stride)
+
+        if self.mode == 'max':
+            return np.max(windows, axis=(-2, -1), out=output_buffer)
+
+        np.sum(windows, axis=(-2, -1), out=output_buffer)
+
+        if self.mode == 'average_inc_pad':
+            output_buffer /= self.size[0] * self.size[1]
+
+        else:
+            window_sizes = self.window_sizes
+            input_shape = input_value.shape[-2:]
+
+            if window_sizes is None or window_sizes[0] != input_shape:
+                self.window_sizes = window_sizes = (
+                    input_shape, self.count_window_values(input_shape))
+
+            output_buffer /= window_sizes[1]
+
+        return output_buffer
+
+    def __repr__(self):
+        return '{}({}, {})'.format(self.__class__.__name__, self.size,
+                                   self.mode)
+
+
+class Reshape(Operation):
+    """ Changes shape of each sample without copying data.
+
+    Parameters
+    ----------
+    shape : tuple or None
+        ``None`` means that each sample will be flatten in 1D vector.
+    """
+    has_buffer = False
+
+    def __init__(self, shape=None):
+        self.shape = shape
+
+    def output_shape(self, input_shape):
+        if self.shape is None:
+            return (int(np.prod(input_shape)),)
+        return tuple(self.shape)
+
+    def output(self, input_value, output_buffer):
+        output_shape = self.output_shape(input_value.shape[1:])
+        return input_value.reshape(input_value.shape[:1] + output_shape)
+
+
+class Output(object):
+    """ Network's output without postprocessing.
+    """
+    def __call__(self, value):
+        return value
+
+    def __repr__(self):
+        return '{}()'.format(self.__class__.__name__)
+
+
+class CompetitiveOutput(Output):
+    """ Sets up one for the maximum value in each row and zeros for
+    all other values.
+    """
+    def __call__(self, value):
+        output = np.zeros(value.shape, dtype=np.intp)
+        output[np.arange(value.shape[0]), value.argmax(axis=1)] = 1
+        return output
+
+
+class StepOutput(Output):
+    """ Step function.
+
+    Parameters
+    ----------
+    output_bounds : tuple
+        Lower and upper output values.
+    critical_point : float
+    """
+    def __init__(self, output_bounds=(0, 1), critical_point=0):
+        self.output_bounds = output_bounds
+        self.critical_point = critical_point
+
+    def __call__(self, value):
+        lower_bound, upper_bound = self.output_bounds
+        return np.where(value <= self.critical_point,
+                        lower_bound, upper_bound)
+
+
+class RoundedOutput(Output):
+    """ Rounds output values.
+
+    Parameters
+    ----------
+    decimals : int
+    """
+    def __init__(self, decimals=0):
+        self.decimals = decimals
+
+    def __call__(self, value):
+        return np.round(value, self.decimals)
+
+
+class ArgmaxOutput(Output):
+    """ Index of the maximum value for each sample.
+    """
+    def __call__(self, value):
+        return value.argmax(axis=1)
+
+
+class InferenceNetwork(object):
+    """ Network that makes predictions using only NumPy. Each
+    operation writes its output in the array that was allocated
+    for the ``max_batch_size`` samples. Bigger inputs are split into
+    batches.
+
+    Parameters
+    ----------
+    operations : list of Operation instances
+    output : Output instance
+        Postprocessing for the network's output.
+    dtype : str or dtype
+        Data type for all computations. Defaults to ``float32``.
+    max_batch_size : int
+        Maximum number of samples that network propagates at once.
+        Defaults to ``128``.
+    is_feature1d : bool
+        ``True`` in case if network expects one feature per sample.
+        Defines how network treats 1D input. Defaults to ``False``.
+    input_shape : tuple or None
+        Shape of the one input sample. Network allocates memory for
+        the outputs before the first prediction in case if value is
+        specified. Defaults to ``None``.
+
+    Examples
+    --------
+    >>> from neupy import algorithms
+    >>>
+    >>> network = algorithms.GradientDescent((2, 3, 1))
+    >>> network.train(x_train, y_train)
+    >>>
+    >>> inference_network = network.export_inference()
+    >>> inference_network.predict(x_test)
+    """
+    def __init__(self, operations, output=None, dtype='float32',
+                 max_batch_size=128, is_feature1d=False, input_shape=None):
+        if max_batch_size < 1:
+            raise ValueError("Maximum batch size should be a positive "
+                             "integer, got {}".format(max_batch_size))
+
+        self.operations = operations
+        self.output = output or Output()
+        self.dtype = np.dtype(dtype)
+        self.max_batch_size = max_batch_size
+        self.is_feature1d = is_feature1d
+
+        self.input_shape = None
+        self.buffers = None
+
+        if input_shape is not None:
+            self.allocate(tuple(input_shape))
+
+    def allocate(self, input_shape):
+        """ Allocates memory for the output from each operation.
+
+        Parameters
+        ----------
+        input_shape : tuple
+            Shape of the one input sample.
+        """
+        buffers = []
+        shape = input_shape
+
+        for operation in self.operations:
+            shape = tuple(operation.output_shape(shape))
+            buffer_ = None
+
+            if operation.has_buffer:
+                buffer_ = np.empty((self.max_batch_size,) + shape,
+                                   dtype=self.dtype)
+
+            buffers.append(buffer_)
+
+        self.input_shape = input_shape
+        self.output_shape = shape
+        self.buffers = buffers
+
+    def format_input_data(self, input_data):
+        input_data = np.asarray(input_data, dtype=self.dtype)
+
+        if input_data.ndim == 1:
+            n_features = input_data.shape[0]
+            data_shape = (n_features, 1) if self.is_feature1d else (
+                1, n_features)
+            input_data = input_data.reshape(data_shape)
+
+        return input_data
+
+    def propagate(self, input_batch):
+        n_samples = input_batch.shape[0]
+        value = np.ascontiguousarray(input_batch)
+
+        for operation, buffer_ in zip(self.operations, self.buffers):
+            if buffer_ is not None:
+                buffer_ = buffer_[:n_samples]
+            value = operation.output(value, buffer_)
+
+        return value
+
+    def predict_raw(self, input_data):
+        """ Makes prediction without final postprocessing step.
+
+        Parameters
+        ----------
+        input_data : array-like
+
+        Returns
+        -------
+        array-like
+        """
+        input_data = self.format_input_data(input_data)
+
+        if input_data.shape[1:] != self.input_shape:
+            self.allocate(input_data.shape[1:])
+
+        n_samples = input_data.shape[0]
+        prediction = np.empty((n_samples,) + self.output_shape,
+                              dtype=self.dtype)
+
+        for start in range(0, n_samples, self.max_batch_size):
+            batch = slice(start, start + self.max_batch_size)
+            prediction[batch] = self.propagate(input_data[batch])
+
+        return prediction
+
+    def predict(self, input_data):
+        """ Makes prediction with the final postprocessing step.
+
+        Parameters
+        ----------
+        input_data : array-like
+
+        Returns
+        -------
+        array-like
+        """
+        return self.output(self.predict_raw(input_data))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # There is no need to store allocated memory
+        state.update(input_shape=None, buffers=None)
+        return state
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, self.operations)
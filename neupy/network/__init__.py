@@ -1,5 +1,6 @@
 from .base import BaseNetwork
 from .utils import StopNetworkTraining
 from .constructor import ConstructableNetwork, ConstructableNetwork
+from .compilation import clear_shared_functions
 from .learning import (SupervisedLearning, UnsupervisedLearning,
                        LazyLearning)
@@ -1,20 +1,25 @@
 from __future__ import division, absolute_import
 
+import copy
 import time
 import types
 from itertools import groupby
 
 import six
+from six.moves import collections_abc
 import numpy as np
 
 from neupy.utils import preformat_value, AttributeKeyDict
 from neupy.helpers import table
 from neupy.core.base import BaseSkeleton
 from neupy.core.properties import (BoundedProperty, NumberProperty,
-                                   Property)
+                                   IntProperty, Property)
 from .summary_info import SummaryTable, InlineSummary
 from .utils import (iter_until_converge, shuffle, normalize_error,
-                    StopNetworkTraining)
+                    StopNetworkTraining, DataStream, is_data_stream,
+                    AsyncValidation, ValidationSchedule,
+                    subsample_validation_data, EarlyStopping,
+                    TrainingProfile)
 
 
 __all__ = ('BaseNetwork',)
@@ -73,13 +78,18 @@ def show_network_options(network, highlight_options=None):
 
 def logging_info_about_the_data(network, input_train, input_test):
     logs = network.logs
-    n_train_samples = input_train.shape[0]
-    train_feature_shape = input_train.shape[1:]
-
     logs.title("Start training")
-    logs.message("TRAIN DATA",
-                 "{} samples, feature shape: {}"
-                 "".format(n_train_samples, train_feature_shape))
+
+    if isinstance(input_train, DataStream):
+        logs.message("TRAIN DATA", "Streamed in chunks")
+        train_feature_shape = None
+    else:
+        n_train_samples = input_train.shape[0]
+        train_feature_shape = input_train.shape[1:]
+
+        logs.message("TRAIN DATA",
+                     "{} samples, feature shape: {}"
+                     "".format(n_train_samples, train_feature_shape))
 
     if input_test is not None:
         n_test_samples = input_test.shape[0]
@@ -89,7 +99,9 @@ def logging_info_about_the_data(network, input_train, input_test):
                      "{} samples, feature shape: {}"
                      "".format(n_test_samples, test_feature_shape))
 
-        if train_feature_shape != test_feature_shape:
+        is_shape_known = train_feature_shape is not None
+
+        if is_shape_known and train_feature_shape != test_feature_shape:
             raise ValueError("Train and test samples should have the "
                              "same feature shape.")
 
@@ -133,6 +145,43 @@ def create_training_epochs_iterator(network, epochs, epsilon=None):
     return range(next_epoch, next_epoch + epochs)
 
 
+def train_epoch_on_stream(train_epoch, data_stream):
+    """ Trains network over one pass through the data stream.
+
+    Parameters
+    ----------
+    train_epoch : function
+        Function that trains network over one chunk of data.
+    data_stream : DataStream
+
+    Returns
+    -------
+    float or None
+        Training error averaged per sample. ``None`` in case if
+        training function doesn't return any error.
+    """
+    total_error = 0
+    n_samples = 0
+
+    for input_batch, target_batch in data_stream:
+        n_batch_samples = len(input_batch)
+        batch_error = train_epoch(input_batch, target_batch)
+
+        if batch_error is None:
+            total_error = None
+
+        if total_error is not None:
+            total_error += batch_error * n_batch_samples
+
+        n_samples += n_batch_samples
+
+    if n_samples == 0:
+        raise ValueError("Data stream doesn't contain any samples.")
+
+    if total_error is not None:
+        return total_error / n_samples
+
+
 class ShowEpochProperty(BoundedProperty):
     """ Class helps validate specific syntax for `show_epoch`
     property from ``BaseNetwork`` class.
@@ -191,38 +240,221 @@ def is_valid_error_value(value):
     return value is not None and not np.all(np.isnan(value))
 
 
-class ErrorHistoryList(list):
-    """ Wrapper around the built-in list class that adds a few
-    additional methods.
+class ErrorHistoryList(collections_abc.MutableSequence):
+    """ Stores errors in the growable ``float64`` array. Array grows
+    twice each time when it runs out of space, which makes append
+    operation fast on average. Non-scalar errors are normalized
+    before they get stored. Invalid errors, like ``None``, are
+    stored as ``NaN``.
+
+    List supports all methods of the mutable sequence, like
+    ``extend``, ``pop`` or ``insert``, and it's equal to the list
+    or tuple with the same errors. Slice returns list, the same
+    as for the python's list. Operations that modify errors in
+    the middle of the list, like ``insert`` or ``del``, copy all
+    errors. Each append operation, in contrast, takes constant time.
+
+    Parameters
+    ----------
+    errors : iterable
+        Initial errors. Defaults to empty tuple.
+    max_size : int or None
+        Maximum number of the latest errors that list stores. After
+        reaching this limit each new error replaces the oldest one.
+        ``None`` means that list stores all errors.
+        Defaults to ``None``.
+
+    Attributes
+    ----------
+    n_discarded : int
+        Number of the oldest errors that have been discarded
+        from the list.
     """
+    initial_capacity = 16
+
+    def __init__(self, errors=(), max_size=None):
+        if max_size is not None and max_size < 2:
+            raise ValueError("List should be able to store at least "
+                             "two errors, got max_size={}".format(max_size))
+
+        self.max_size = max_size
+        self.n_discarded = 0
+        self.reset()
+
+        for error in errors:
+            self.append(error)
+
+    def reset(self):
+        """ Allocates empty storage for errors.
+        """
+        self.values = np.empty(self.max_size or self.initial_capacity)
+        self.start = 0
+        self.length = 0
+
+    def stored_errors(self):
+        """ Returns list of errors in format that can be added
+        back to the list with the ``append`` method.
+        """
+        return np.array(self).tolist()
+
+    def replace_errors(self, errors):
+        """ Replaces all errors in the list.
+
+        Parameters
+        ----------
+        errors : list
+        """
+        n_discarded = self.n_discarded
+        self.n_discarded = 0
+        self.reset()
+
+        for error in errors:
+            self.append(error)
+
+        self.n_discarded += n_discarded
+
+    def to_float(self, error):
+        if not is_valid_error_value(error):
+            return np.nan
+
+        if np.ndim(error) > 0:
+            return normalize_error(error)
+
+        return float(error)
+
+    def array_index(self, index):
+        """ Converts list index to the index in the array that
+        stores values.
+        """
+        if index < 0:
+            index += self.length
+
+        if not 0 <= index < self.length:
+            raise IndexError("Error history index out of range")
+
+        return (self.start + index) % self.values.size
+
+    def append(self, error):
+        """ Adds error to the end of the list.
+
+        Parameters
+        ----------
+        error : float, array-like or None
+        """
+        values = self.values
+        capacity = values.size
+
+        if self.length == capacity:
+            if self.max_size is not None:
+                # Replace the oldest error
+                values[self.start] = self.to_float(error)
+                self.start = (self.start + 1) % capacity
+                self.n_discarded += 1
+                return
+
+            self.values = values = np.concatenate([values, values])
+
+        values[self.start + self.length] = self.to_float(error)
+        self.length += 1
+
     def last(self):
         """ Returns last element if list is not empty,
         ``None`` otherwise.
         """
-        if self and is_valid_error_value(self[-1]):
-            return normalize_error(self[-1])
+        if self.length >= 1:
+            value = self.values[self.array_index(-1)]
+
+            if not np.isnan(value):
+                return value
 
     def previous(self):
         """ Returns last element if list is not empty,
         ``None`` otherwise.
         """
-        if len(self) >= 2 and is_valid_error_value(self[-2]):
-            return normalize_error(self[-2])
+        if self.length >= 2:
+            value = self.values[self.array_index(-2)]
+
+            if not np.isnan(value):
+                return value
 
     def normalized(self):
-        """ Normalize list that contains error outputs.
+        """ Returns all errors as an array.
 
         Returns
         -------
-        list
-            Return the same list with normalized values if there
-            where some problems.
+        array
+            Copy of the stored errors in order in which they
+            were added.
         """
-        if not self or isinstance(self[0], float):
-            return self
+        return np.array(self)
+
+    def __array__(self, dtype=None):
+        values = self.values
+        end = self.start + self.length
+
+        if end <= values.size:
+            array = values[self.start:end].copy()
+        else:
+            array = np.concatenate([values[self.start:],
+                                    values[:end - values.size]])
+
+        if dtype is not None:
+            array = array.astype(dtype)
+
+        return array
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(np.array(self))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return np.array(self)[index].tolist()
+        return self.values[self.array_index(index)]
+
+    def __setitem__(self, index, error):
+        if isinstance(index, slice):
+            errors = self.stored_errors()
+            errors[index] = error
+            self.replace_errors(errors)
+        else:
+            self.values[self.array_index(index)] = self.to_float(error)
+
+    def __delitem__(self, index):
+        errors = self.stored_errors()
+        del errors[index]
+        self.replace_errors(errors)
+
+    def insert(self, index, error):
+        errors = self.stored_errors()
+        errors.insert(index, error)
+        self.replace_errors(errors)
 
-        normalized_errors = map(normalize_error, self)
-        return list(normalized_errors)
+    def __eq__(self, other):
+        if isinstance(other, (ErrorHistoryList, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        is_equal = self.__eq__(other)
+
+        if is_equal is NotImplemented:
+            return is_equal
+
+        return not is_equal
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(np.array(self).tolist())
 
 
 class BaseNetwork(BaseSkeleton):
@@ -253,14 +485,19 @@ class BaseNetwork(BaseSkeleton):
         Calls this function when train epoch finishes.
     train_end_signal : function
         Calls this function when train process finishes.
+    error_history_size : int or None
+        Maximum number of the latest errors that network stores in
+        the ``errors`` and ``validation_errors`` attributes. Older
+        errors will be discarded. ``None`` means that network stores
+        all errors. Defaults to ``None``.
     {Verbose.verbose}
 
     Attributes
     ----------
     errors : ErrorHistoryList
-        Contains list of training errors. This object has the same
-        properties as list and in addition there are three additional
-        useful methods: `last`, `previous` and `normalized`.
+        Contains list of training errors. This object behaves like
+        a list and in addition there are three additional useful
+        methods: `last`, `previous` and `normalized`.
     train_errors : ErrorHistoryList
         Alias to `errors` attribute.
     validation_errors : ErrorHistoryList
@@ -277,16 +514,21 @@ class BaseNetwork(BaseSkeleton):
 
     epoch_end_signal = Property(expected_type=types.FunctionType)
     train_end_signal = Property(expected_type=types.FunctionType)
+    error_history_size = IntProperty(minval=2)
 
     def __init__(self, *args, **options):
-        self.errors = self.train_errors = ErrorHistoryList()
-        self.validation_errors = ErrorHistoryList()
         self.training = AttributeKeyDict()
         self.last_epoch = 0
 
         super(BaseNetwork, self).__init__(*args, **options)
         self.init_properties()
 
+        error_history_size = self.error_history_size
+        self.errors = self.train_errors = ErrorHistoryList(
+            max_size=error_history_size)
+        self.validation_errors = ErrorHistoryList(
+            max_size=error_history_size)
+
         if self.verbose:
             show_network_options(self, highlight_options=options)
 
@@ -325,21 +567,97 @@ class BaseNetwork(BaseSkeleton):
     def prediction_error(self, input_test, target_test):
         raise NotImplementedError()
 
+    def parameter_variables(self):
+        """ Returns network's parameters.
+
+        Returns
+        -------
+        list
+            List of Theano shared variables. Empty list in case
+            if network doesn't store its parameters in them.
+        """
+        return []
+
+    def snapshot_prediction_error(self):
+        """ Makes a snapshot of the network's current state.
+
+        Returns
+        -------
+        function
+            Function that accepts input and target data and computes
+            prediction error for the network's state from the
+            snapshot. Function should be safe to call from the other
+            thread while network continues training.
+        """
+        raise NotImplementedError("Network `{}` doesn't support "
+                                  "asynchronous validation."
+                                  "".format(self.class_name()))
+
     def train(self, input_train, target_train=None, input_test=None,
               target_test=None, epochs=100, epsilon=None,
-              summary_type='table'):
+              summary_type='table', async_validation=False,
+              validate_every=1, validation_time_interval=None,
+              validation_subsample=None, patience=None,
+              restore_best_parameters=False, profile_phases=False):
         """ Method train neural network.
 
         Parameters
         ----------
-        input_train : array-like
-        target_train : array-like or Npne
+        input_train : array-like, iterator or function
+            Training data. Instead of array it's possible to specify
+            iterator that yields ``(input_batch, target_batch)`` chunks
+            or function that returns new iterator for each epoch.
+            In this case ``target_train`` should be equal to ``None``.
+        target_train : array-like or None
         input_test : array-like or None
         target_test : array-like or None
         epochs : int
             Defaults to `100`.
         epsilon : float or None
             Defaults to ``None``.
+        summary_type : {{'table', 'inline'}}
+            Defaults to ``'table'``.
+        async_validation : bool
+            If it's ``True`` network computes validation error in the
+            background thread using snapshot of the parameters from
+            the end of the epoch. Training continues without waiting
+            for the result. Validation error for the epoch is equal
+            to ``NaN`` until its computation finishes. All errors are
+            available after the training. Defaults to ``False``.
+        validate_every : int
+            Network computes validation error only after each
+            ``validate_every``-th epoch. Validation error for the
+            other epochs is equal to ``NaN``. Defaults to ``1``.
+        validation_time_interval : float or None
+            Minimum number of seconds between two validations. Epochs
+            that finish earlier skip validation and store ``NaN``.
+            ``None`` means that time doesn't limit validation.
+            Defaults to ``None``.
+        validation_subsample : int, float or None
+            Computes validation error during the training only for
+            the fixed random subset of the validation samples.
+            Integer value specifies number of samples and float
+            value specifies fraction of them. Validation error
+            after the final epoch always computes over all
+            samples. ``None`` means that network uses all samples.
+            Defaults to ``None``.
+        patience : int or None
+            Stops training after ``patience`` epochs without improvement
+            of the validation error. Network monitors training error
+            in case if there is no validation data. Epochs skipped by
+            ``validate_every`` or ``validation_time_interval`` options
+            aren't counted. ``None`` disables early stopping.
+            Defaults to ``None``.
+        restore_best_parameters : bool
+            Sets up parameters from the epoch with the lowest error
+            after the training. Option works only with early stopping.
+            Defaults to ``False``.
+        profile_phases : bool
+            Measures time spent in each phase of the training epoch,
+            like data shuffling, batch slicing, compiled function calls
+            and validation. Results accumulate in the
+            ``network.training.profile`` attribute and can be displayed
+            with its ``show`` method. Defaults to ``False``.
         """
 
         show_epoch = self.show_epoch
@@ -353,6 +671,28 @@ class BaseNetwork(BaseSkeleton):
             raise ValueError("Network should train at teast 3 epochs before "
                              "check the difference between errors")
 
+        is_stream = is_data_stream(input_train)
+
+        if is_stream:
+            if target_train is not None:
+                raise ValueError("Target data should be a part of the "
+                                 "data stream.")
+
+            if not isinstance(input_train, DataStream):
+                input_train = DataStream(input_train)
+
+            needs_multiple_passes = (epochs > 1 or epsilon is not None)
+
+            if needs_multiple_passes and not input_train.reiterable:
+                raise ValueError("Iterator can be consumed only once. Use "
+                                 "function that returns new iterator in "
+                                 "order to train network over multiple "
+                                 "epochs.")
+
+            if self.shuffle_data:
+                logs.warning("Data stream can't be shuffled. Shuffle "
+                             "chunks before passing them to the network.")
+
         if summary_type == 'table':
             logging_info_about_the_data(self, input_train, input_test)
             logging_info_about_training(self, epochs, epsilon)
@@ -388,57 +728,183 @@ class BaseNetwork(BaseSkeleton):
         # iterations.
         training_errors = self.errors
         validation_errors = self.validation_errors
-        shuffle_data = self.shuffle_data
+        shuffle_data = self.shuffle_data and not is_stream
 
         train_epoch = self.train_epoch
+        prediction_error = self.prediction_error
+        shuffle_samples = shuffle
+        show_last = summary.show_last
         epoch_end_signal = self.epoch_end_signal
         train_end_signal = self.train_end_signal
         on_epoch_start_update = self.on_epoch_start_update
 
-        is_first_iteration = True
-        can_compute_validation_error = (input_test is not None)
-        last_epoch_shown = 0
+        if profile_phases:
+            # Functions are wrapped only when profiling is enabled,
+            # so there is no overhead when it's disabled
+            profile = training.profile = TrainingProfile()
 
-        with logs.disable_user_input():
-            for epoch in iterepochs:
-                validation_error = np.nan
-                epoch_start_time = time.time()
-                on_epoch_start_update(epoch)
+            train_epoch = profile.timed('train call', train_epoch)
+            prediction_error = profile.timed('validation', prediction_error)
+            shuffle_samples = profile.timed('shuffle', shuffle_samples)
+            show_last = profile.timed('summary', show_last)
+
+            if epoch_end_signal is not None:
+                epoch_end_signal = profile.timed('signals', epoch_end_signal)
+
+            if train_end_signal is not None:
+                train_end_signal = profile.timed('signals', train_end_signal)
+
+            if is_stream:
+                input_train = copy.copy(input_train)
 
-                if shuffle_data:
-                    input_train, target_train = shuffle(input_train,
-                                                        target_train)
-                try:
-                    train_error = train_epoch(input_train, target_train)
+                for attr in ('format_input', 'format_target'):
+                    format_function = getattr(input_train, attr)
 
-                    if can_compute_validation_error:
-                        validation_error = self.prediction_error(input_test,
-                                                                 target_test)
+                    if format_function is not None:
+                        setattr(input_train, attr,
+                                profile.timed('formatting', format_function))
 
-                    training_errors.append(train_error)
-                    validation_errors.append(validation_error)
+        is_first_iteration = True
+        can_compute_validation_error = (input_test is not None)
+        last_epoch_shown = 0
 
-                    epoch_finish_time = time.time()
-                    training.epoch_time = epoch_finish_time - epoch_start_time
+        validate_async = async_validation and can_compute_validation_error
+        validate_sync = can_compute_validation_error and not validate_async
+
+        validation_schedule = ValidationSchedule(validate_every,
+                                                 validation_time_interval)
+        n_validation_errors = (validation_errors.n_discarded +
+                               len(validation_errors))
+        is_last_validation_complete = True
+        input_valid, target_valid = input_test, target_test
+
+        if can_compute_validation_error and validation_subsample is not None:
+            input_valid, target_valid = subsample_validation_data(
+                input_test, target_test, validation_subsample)
+
+        if patience is not None:
+            if validate_async:
+                raise ValueError("Early stopping can't be used with "
+                                 "asynchronous validation.")
+
+            if restore_best_parameters and not self.parameter_variables():
+                raise ValueError("Network `{}` doesn't support parameter "
+                                 "restoration.".format(self.class_name()))
+
+            monitored_errors = (validation_errors
+                                if can_compute_validation_error
+                                else training_errors)
+            early_stopping = training.early_stopping = EarlyStopping(
+                patience=patience,
+                parameters=(self.parameter_variables()
+                            if restore_best_parameters else ()),
+            )
 
-                    if epoch % training.show_epoch == 0 or is_first_iteration:
-                        summary.show_last()
-                        last_epoch_shown = epoch
+        elif restore_best_parameters:
+            raise ValueError("Parameters can be restored only in case "
+                             "if `patience` is specified.")
 
-                    if epoch_end_signal is not None:
-                        epoch_end_signal(self)
+        if validate_async:
+            async_validator = AsyncValidation(validation_errors)
 
-                    is_first_iteration = False
+        with logs.disable_user_input():
+            try:
+                for epoch in iterepochs:
+                    validation_error = np.nan
+                    epoch_start_time = time.time()
+                    on_epoch_start_update(epoch)
+
+                    if shuffle_data:
+                        input_train, target_train = shuffle_samples(
+                            input_train, target_train)
+                    try:
+                        if is_stream:
+                            train_error = train_epoch_on_stream(train_epoch,
+                                                                input_train)
+                        else:
+                            train_error = train_epoch(input_train,
+                                                      target_train)
+
+                        validate = (
+                            can_compute_validation_error and
+                            validation_schedule.is_validation_epoch(epoch)
+                        )
+
+                        if validate and validate_sync:
+                            validation_error = prediction_error(input_valid,
+                                                                target_valid)
+
+                        training_errors.append(train_error)
+                        validation_errors.append(validation_error)
+
+                        if validate and validate_async:
+                            async_validator.submit(
+                                prediction_error=(
+                                    self.snapshot_prediction_error()),
+                                input_test=input_valid,
+                                target_test=target_valid,
+                            )
+
+                        if validate:
+                            validation_schedule.mark_validated()
+
+                        is_last_validation_complete = (
+                            validate and input_valid is input_test)
+
+                        epoch_finish_time = time.time()
+                        training.epoch_time = (epoch_finish_time -
+                                               epoch_start_time)
+
+                        if (epoch % training.show_epoch == 0 or
+                                is_first_iteration):
+                            show_last()
+                            last_epoch_shown = epoch
+
+                        if epoch_end_signal is not None:
+                            epoch_end_signal(self)
+
+                        is_first_iteration = False
+
+                        if profile_phases:
+                            profile.n_epochs += 1
+
+                        if patience is not None:
+                            if early_stopping.update(epoch,
+                                                     monitored_errors.last()):
+                                raise StopNetworkTraining(
+                                    "No improvements over the last {} epochs"
+                                    "".format(patience))
+
+                    except StopNetworkTraining as err:
+                        # TODO: This notification breaks table view in
+                        # terminal. I need to show it in a different way.
+                        logs.message("TRAIN", "Epoch #{} stopped. {}"
+                                              "".format(epoch, str(err)))
+                        break
+            finally:
+                # Worker thread stops even in case if training has
+                # been interrupted with an exception
+                if validate_async:
+                    async_validator.finish()
+
+            has_new_errors = (
+                validation_errors.n_discarded + len(validation_errors) >
+                n_validation_errors
+            )
 
-                except StopNetworkTraining as err:
-                    # TODO: This notification breaks table view in terminal.
-                    # I need to show it in a different way.
-                    logs.message("TRAIN", "Epoch #{} stopped. {}"
-                                          "".format(epoch, str(err)))
-                    break
+            if (can_compute_validation_error and has_new_errors and
+                    not is_last_validation_complete):
+                # Skipped or subsampled validation is just an estimate,
+                # final error should be computed over all samples
+                validation_errors[-1] = prediction_error(input_test,
+                                                         target_test)
 
             if epoch != last_epoch_shown:
-                summary.show_last()
+                show_last()
+
+            if restore_best_parameters and early_stopping.restore():
+                logs.message("TRAIN", "Restored parameters from the epoch "
+                                      "#{}".format(early_stopping.best_epoch))
 
             if train_end_signal is not None:
                 train_end_signal(self)
@@ -0,0 +1,389 @@
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+
+import six
+import theano
+from theano.gof import graph, DestroyHandler
+from theano.compile import SharedVariable
+
+from neupy.utils import AttributeKeyDict
+
+
+__all__ = ('FunctionCache', 'LazyMethods', 'SHARED_FUNCTIONS',
+           'clear_shared_functions', 'copy_function')
+
+
+# Compiled functions that networks share between each other
+# within one process.
+SHARED_FUNCTIONS = {}
+
+
+def clear_shared_functions():
+    """ Removes all compiled functions that networks share between
+    each other. Networks that have already loaded functions keep
+    their own copies, but the next network with the same
+    architecture would compile its functions again.
+    """
+    SHARED_FUNCTIONS.clear()
+
+
+def find_shared_variables(variables):
+    """ Finds all shared variables that specified variables
+    depend on.
+
+    Parameters
+    ----------
+    variables : list
+        List of Theano variables.
+
+    Returns
+    -------
+    list
+    """
+    return [variable for variable in graph.inputs(variables)
+            if isinstance(variable, SharedVariable)]
+
+
+def copy_function(function, swap):
+    """ Copies compiled function and replaces its shared variables.
+
+    Parameters
+    ----------
+    function : Theano function
+    swap : dict
+        Maps shared variables from the function to the shared
+        variables that copied function should use instead.
+
+    Returns
+    -------
+    Theano function
+    """
+    copied_function = function.copy(swap=swap)
+    maker = copied_function.maker
+
+    # Copied graph doesn't know that some of its operations modify
+    # their inputs inplace. Without this information linker can
+    # run operation that destroys variable before other operations
+    # read it, which breaks parameter updates.
+    has_inplace_operations = any(getattr(node.op, 'destroy_map', None)
+                                 for node in maker.fgraph.apply_nodes)
+
+    if has_inplace_operations:
+        maker.fgraph.attach_feature(DestroyHandler())
+        copied_function = maker.create([inp.value for inp in maker.inputs])
+
+    # Copy doesn't preserve the way function returns outputs
+    copied_function.unpack_single = function.unpack_single
+    copied_function.return_none = function.return_none
+
+    return copied_function
+
+
+def graph_variables(outputs, updates=None, givens=None):
+    """ Collects all variables that define compiled function.
+
+    Parameters
+    ----------
+    outputs : Theano variable or list
+    updates : list or None
+    givens : dict, list or None
+
+    Returns
+    -------
+    list
+    """
+    if not isinstance(outputs, (list, tuple)):
+        outputs = [outputs]
+
+    variables = list(outputs)
+
+    for pairs in (updates, givens):
+        if isinstance(pairs, dict):
+            pairs = list(pairs.items())
+
+        for variable, expression in pairs or []:
+            variables.extend([variable, expression])
+
+    return variables
+
+
+def mode_description(mode):
+    """ Describes Theano mode in the way that doesn't depend on
+    the specific instance of the mode.
+
+    Parameters
+    ----------
+    mode : str, Theano Mode instance or None
+
+    Returns
+    -------
+    list of str
+    """
+    if mode is None:
+        return [theano.config.mode, theano.config.optimizer,
+                theano.config.linker]
+
+    mode = theano.compile.get_mode(mode)
+    linker = mode.provided_linker
+    optimizer = mode.provided_optimizer
+
+    if not isinstance(linker, six.string_types):
+        linker = '{}(c_thunks={})'.format(
+            linker.__class__.__name__, getattr(linker, 'c_thunks', None))
+
+    return [mode.__class__.__name__, str(optimizer), linker]
+
+
+def function_cache_key(name, inputs, outputs, updates=None, givens=None,
+                       mode=None):
+    """ Generates key that identifies compiled function. Key depends on
+    the symbolic graph, which means that it changes with any change in
+    the network's architecture or in the options that modify graph.
+
+    Parameters
+    ----------
+    name : str
+        Function name.
+    inputs : list
+    outputs : Theano variable or list
+    updates : list or None
+    givens : dict, list or None
+    mode : str, Theano Mode instance or None
+
+    Returns
+    -------
+    str
+    """
+    graph_description = theano.printing.debugprint(
+        graph_variables(outputs, updates, givens), file='str')
+
+    key_parts = [name, theano.__version__, theano.config.floatX]
+    key_parts.extend(mode_description(mode))
+    key_parts.extend([
+        ','.join(str(variable.type) for variable in inputs),
+        graph_description,
+    ])
+    key = '\n'.join(key_parts).encode('utf-8')
+    return hashlib.sha1(key).hexdigest()
+
+
+class FunctionCache(object):
+    """ Cache for the compiled Theano functions. Functions are stored
+    in memory and, optionally, on disk. Loaded function gets bound to
+    the shared variables from the specified graph, which means that
+    networks don't share parameters between each other.
+
+    Parameters
+    ----------
+    directory : str or None
+        Directory that stores compiled functions. Files are loaded
+        with ``pickle``, so directory must not contain files from
+        untrusted sources. ``None`` means that functions are stored
+        only in memory.
+        Defaults to ``None``.
+    functions : dict or None
+        Compiled functions stored in memory. Different caches can
+        share the same dictionary. Defaults to ``None``.
+
+    Attributes
+    ----------
+    hits : list
+        Time in seconds that took to load each function from cache.
+    misses : list
+        Time in seconds that took to compile each function that
+        hasn't been found in cache.
+    """
+    def __init__(self, directory=None, functions=None):
+        self.directory = directory
+        self.functions = {} if functions is None else functions
+        self.hits = []
+        self.misses = []
+
+    def filepath(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def load(self, key, shared_variables):
+        """ Loads function and binds it to the specified
+        shared variables.
+
+        Returns
+        -------
+        Theano function or None
+            ``None`` in case if function can't be loaded.
+        """
+        variables_by_name = {}
+        for variable in shared_variables:
+            if variable.name in variables_by_name:
+                # It's impossible to match variables by names
+                return
+            variables_by_name[variable.name] = variable
+
+        function = self.functions.get(key)
+
+        try:
+            if function is None:
+                function = self.load_from_file(key)
+
+            if function is None:
+                return
+
+            swap = {}
+            for function_input in function.maker.inputs:
+                variable = function_input.variable
+
+                if isinstance(variable, SharedVariable):
+                    swap[variable] = variables_by_name[variable.name]
+
+            copied_function = copy_function(function, swap)
+
+        except Exception:
+            # Broken or incompatible file will be overwritten
+            return
+
+        self.functions[key] = function
+        return copied_function
+
+    def load_from_file(self, key):
+        if self.directory is None:
+            return
+
+        filepath = self.filepath(key)
+
+        if not os.path.exists(filepath):
+            return
+
+        with open(filepath, 'rb') as cache_file:
+            return pickle.load(cache_file)
+
+    def save(self, key, function):
+        """ Saves compiled function. Each file gets written atomically,
+        so processes can't read partially saved function.
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        file_descriptor, temp_filepath = tempfile.mkstemp(
+            dir=self.directory, suffix='.tmp')
+
+        try:
+            with os.fdopen(file_descriptor, 'wb') as temp_file:
+                pickle.dump(function, temp_file, pickle.HIGHEST_PROTOCOL)
+
+            os.rename(temp_filepath, self.filepath(key))
+
+        except Exception:
+            # Cache is just an optimization, function can
+            # be compiled again next time.
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+
+    def function(self, name, inputs, outputs, updates=None, givens=None,
+                 mode=None):
+        """ Loads compiled function from cache or compiles a new
+        one. Function accepts the same arguments as
+        ``theano.function``, except ``name``.
+
+        Parameters
+        ----------
+        name : str
+            Function name.
+        inputs : list
+        outputs : Theano variable or list
+        updates : list or None
+        givens : dict, list or None
+        mode : str, Theano Mode instance or None
+
+        Returns
+        -------
+        Theano function
+        """
+        start_time = time.time()
+        key = function_cache_key(name, inputs, outputs, updates, givens,
+                                 mode)
+
+        shared_variables = find_shared_variables(
+            graph_variables(outputs, updates, givens))
+        function = self.load(key, shared_variables)
+
+        if function is not None:
+            self.hits.append(time.time() - start_time)
+            return function
+
+        function = theano.function(inputs=inputs, outputs=outputs,
+                                   updates=updates, givens=givens,
+                                   mode=mode)
+        self.functions[key] = function
+
+        if self.directory is not None:
+            self.save(key, function)
+        self.misses.append(time.time() - start_time)
+
+        return function
+
+    def summary(self):
+        """ Short description of the cache usage.
+
+        Returns
+        -------
+        str
+        """
+        return ("Function cache: {} hits ({:.2f} seconds), {} misses "
+                "({:.2f} seconds)".format(len(self.hits), sum(self.hits),
+                                          len(self.misses),
+                                          sum(self.misses)))
+
+
+class LazyMethods(AttributeKeyDict):
+    """ Dictionary that compiles functions only at the first access.
+    Functions that have never been used don't have to be compiled.
+
+    Examples
+    --------
+    >>> methods = LazyMethods()
+    >>> methods.add('predict', lambda: theano.function([x], y))
+    >>> 'predict' in methods
+    False
+    >>> methods.predict  # compiles function
+    <theano.compile.function_module.Function object at 0x...>
+    >>> 'predict' in methods
+    True
+
+    Attributes
+    ----------
+    builders : dict
+        Functions that compile methods which haven't been used yet.
+    """
+    def __init__(self, *args, **kwargs):
+        super(LazyMethods, self).__init__(*args, **kwargs)
+        # All attributes in the AttributeKeyDict class are
+        # stored as dictionary keys.
+        object.__setattr__(self, 'builders', {})
+
+    def add(self, name, builder):
+        """ Registers method that would be compiled at the first access.
+
+        Parameters
+        ----------
+        name : str
+            Method name.
+        builder : function
+            Function without arguments that returns compiled method.
+        """
+        self.pop(name, None)
+        self.builders[name] = builder
+
+    def compile(self):
+        """ Compiles all methods that haven't been used yet.
+        """
+        for name in list(self.builders):
+            self[name]
+
+    def __missing__(self, name):
+        if name not in self.builders:
+            raise KeyError(name)
+
+        function = self[name] = self.builders.pop(name)()
+        return function
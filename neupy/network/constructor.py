@@ -1,19 +1,32 @@
+from __future__ import print_function
+
+import re
 import time
 import types
+from functools import partial
+from collections import deque, defaultdict
 
+import six
 import theano
 import theano.sparse
 import theano.tensor as T
+import numpy as np
+from theano.compile import Mode, get_mode
+from theano.compile.profiling import ProfileStats
 
 from neupy.utils import (AttributeKeyDict, asfloat, is_list_of_integers,
                          format_data, does_layer_accept_1d_feature)
 from neupy.layers import BaseLayer, Output, Dropout
 from neupy.layers.utils import generate_layers
-from neupy.core.properties import ChoiceProperty
+from neupy.core.properties import ChoiceProperty, Property
+from neupy.helpers import table
 from neupy.layers.connections import LayerConnection, NetworkConnectionError
 from neupy.network import errors
 from .learning import SupervisedLearning
 from .base import BaseNetwork
+from .utils import DataStream, is_data_stream
+from .compilation import FunctionCache, LazyMethods, SHARED_FUNCTIONS
+from .export import export_inference_network
 
 
 __all__ = ('ConstructableNetwork',)
@@ -126,6 +139,95 @@ def find_input_layer(layers):
             return layer
 
 
+def restore_flat_parameters(layer):
+    """ Replaces layer's parameters that are views into the parameter
+    vector of the network with flat parameters by the separate
+    shared variables with the same values. Layers keep these views
+    after pickling or in case if they've been passed to other
+    network.
+
+    Parameters
+    ----------
+    layer : BaseLayer instance
+    """
+    for attrname in ('weight', 'bias'):
+        view = getattr(layer, attrname, None)
+        flat_position = getattr(getattr(view, 'tag', None),
+                                'flat_position', None)
+
+        if flat_position is None:
+            continue
+
+        parameter_vector, start_position, end_position, shape = flat_position
+        value = parameter_vector.get_value()[start_position:end_position]
+        parameter = theano.shared(name=view.name, value=value.reshape(shape),
+                                  broadcastable=view.broadcastable)
+        setattr(layer, attrname, parameter)
+
+
+PARAMETER_NAME_PATTERN = re.compile(r'(weight|bias)_(\d+)')
+
+
+def find_parameter_name(node):
+    """ Finds the closest layer parameter that the Theano
+    operation depends on.
+
+    Parameters
+    ----------
+    node : Theano Apply node
+
+    Returns
+    -------
+    tuple or None
+        Parameter name and related layer identifier. ``None``
+        in case if operation doesn't depend on any parameter.
+    """
+    variables = deque(node.inputs)
+    visited = set()
+
+    while variables:
+        variable = variables.popleft()
+
+        if variable in visited:
+            continue
+
+        visited.add(variable)
+        # Parameters have names like ``weight_1`` and variables
+        # that store parameter related states usually include
+        # parameter name, for instance ``weight_1/prev_delta``.
+        match = PARAMETER_NAME_PATTERN.search(variable.name or '')
+
+        if match is not None:
+            return match.group(0), int(match.group(2))
+
+        if variable.owner is not None:
+            variables.extend(variable.owner.inputs)
+
+
+def parameter_time_usage(profile_stats):
+    """ Groups execution time of the Theano operations by
+    the layer parameters.
+
+    Parameters
+    ----------
+    profile_stats : ProfileStats instance
+
+    Returns
+    -------
+    dict
+        Total execution time per ``(parameter_name, layer_id)`` key.
+        Operations that don't depend on parameters have
+        ``(None, None)`` key.
+    """
+    time_usage = defaultdict(float)
+
+    for node, node_time in profile_stats.apply_time.items():
+        key = find_parameter_name(node) or (None, None)
+        time_usage[key] += node_time
+
+    return dict(time_usage)
+
+
 class ErrorFunctionProperty(ChoiceProperty):
     """ Property that helps select error function from
     available or define a new one.
@@ -188,11 +290,61 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         * Custom function that accept two mandatory arguments.
         The first one is expected value and the second one is
         predicted value. Example: ``custom_func(expected, predicted)``
+    profile : bool
+        Compiles network's functions with Theano profiling. Time
+        spent in each operation is available in the ``profiles``
+        attribute and method ``show_profile`` shows cost of each
+        layer's parameter. Defaults to ``False``.
+    function_cache_dir : str or None
+        Directory where network stores compiled Theano functions.
+        Network with the same architecture and options loads them
+        instead of compiling new functions. Functions are stored with
+        ``pickle``, which can execute arbitrary code during loading,
+        so directory should be writable only by trusted users.
+        Cache isn't used in case if value equal to ``None``.
+        Defaults to ``None``.
+    share_functions : bool
+        Networks with the same architecture and options share
+        compiled Theano functions within one process. Function gets
+        compiled only by the first network and others bind a copy to
+        their own parameters. Compiled functions stay in memory until
+        the end of the process or until the
+        ``neupy.network.clear_shared_functions`` call.
+        Defaults to ``False``.
+    compile_mode : str, Theano Mode instance or None
+        Theano mode that network uses to compile its functions,
+        for instance ``FAST_RUN`` or ``FAST_COMPILE``. Mode affects
+        only this network, unlike the global ``theano.config.mode``
+        option. ``None`` means that network uses the default Theano
+        mode. Defaults to ``None``.
+    optimizer : str or None
+        Name of the Theano graph optimizer that replaces the optimizer
+        from the ``compile_mode``, for instance ``fast_run``,
+        ``fast_compile`` or ``None``. Value equal to ``None`` means
+        that network uses optimizer from the ``compile_mode``.
+        Defaults to ``None``.
+    function_modes : dict or None
+        Theano modes for the specific functions. Dictionary maps
+        function name to the mode, which will be used instead of the
+        ``compile_mode`` and ``optimizer`` options. For instance,
+        ``{{'prediction_error': 'FAST_COMPILE'}}`` makes compilation
+        of the validation function faster than compilation of the
+        training function. Defaults to ``None``.
+    flat_parameters : bool
+        Stores parameters of all layers in one contiguous shared
+        vector. Layers' weights and biases become views into this
+        vector and they don't have ``get_value`` and ``set_value``
+        methods. Algorithms that work with all parameters as one
+        vector, like :network:`ConjugateGradient` or
+        :network:`QuasiNewton`, update vector without concatenating
+        parameters. Other algorithms update vector's slices that
+        belong to each parameter. Defaults to ``False``.
     {BaseNetwork.step}
     {BaseNetwork.show_epoch}
     {BaseNetwork.shuffle_data}
     {BaseNetwork.epoch_end_signal}
     {BaseNetwork.train_end_signal}
+    {BaseNetwork.error_history_size}
     {Verbose.verbose}
 
     Attributes
@@ -201,6 +353,9 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
     {BaseNetwork.train_errors}
     {BaseNetwork.validation_errors}
     {BaseNetwork.last_epoch}
+    profiles : dict
+        Theano ``ProfileStats`` instance per each compiled
+        function. Empty in case if ``profile`` equal to ``False``.
     """
     error = ErrorFunctionProperty(default='mse', choices={
         'mae': errors.mae,
@@ -211,6 +366,13 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         'binary_crossentropy': errors.binary_crossentropy,
         'categorical_crossentropy': errors.categorical_crossentropy,
     })
+    profile = Property(default=False, expected_type=bool)
+    function_cache_dir = Property(expected_type=six.string_types)
+    share_functions = Property(default=False, expected_type=bool)
+    compile_mode = Property(expected_type=six.string_types + (Mode,))
+    optimizer = Property(expected_type=six.string_types)
+    function_modes = Property(expected_type=dict)
+    flat_parameters = Property(default=False, expected_type=bool)
 
     def __init__(self, connection, *args, **kwargs):
         self.connection = clean_layers(connection)
@@ -225,10 +387,6 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         self.init_layers()
         super(ConstructableNetwork, self).__init__(*args, **kwargs)
 
-        self.logs.message("THEANO", "Initializing Theano variables and "
-                                    "functions.")
-        start_init_time = time.time()
-
         self.variables = AttributeKeyDict(
             network_input=create_input_variable(
                 self.input_layer, variable_name='x'
@@ -237,15 +395,35 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
                 self.error, variable_name='y'
             ),
         )
-        self.methods = AttributeKeyDict()
+        self.methods = LazyMethods()
+        self.profiles = AttributeKeyDict()
+        self.function_cache = None
+
+        if self.share_functions or self.function_cache_dir is not None:
+            self.function_cache = FunctionCache(
+                self.function_cache_dir,
+                functions=SHARED_FUNCTIONS if self.share_functions else None,
+            )
 
         self.init_variables()
         self.init_methods()
 
-        finish_init_time = time.time()
-        self.logs.message("THEANO", "Initialization finished sucessfully. "
+    def compile(self):
+        """ Compiles all Theano functions. By default each function
+        gets compiled only before its first usage, which means that
+        network that only makes predictions never compiles the
+        training functions. Method helps compile everything in
+        advance, before the training or prediction starts.
+        """
+        self.logs.message("THEANO", "Compiling Theano functions.")
+        start_compile_time = time.time()
+
+        self.methods.compile()
+
+        finish_compile_time = time.time()
+        self.logs.message("THEANO", "Compilation finished sucessfully. "
                           "It took {:.2f} seconds"
-                          "".format(finish_init_time - start_init_time))
+                          "".format(finish_compile_time - start_compile_time))
 
     def init_variables(self):
         """ Initialize Theano variables.
@@ -253,11 +431,14 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         network_input = self.variables.network_input
         network_output = self.variables.network_output
 
+        if self.flat_parameters:
+            self.init_flat_parameters()
+
         train_prediction = prediction = network_input
         for layer in self.layers:
             if not isinstance(layer, Dropout):
-                prediction = layer.output(prediction)
-            train_prediction = layer.output(train_prediction)
+                prediction = self.layer_output(layer, prediction)
+            train_prediction = self.layer_output(layer, train_prediction)
 
         self.variables.update(
             step=theano.shared(name='step', value=asfloat(self.step)),
@@ -266,38 +447,257 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
             prediction_func=prediction,
             train_prediction_func=train_prediction,
 
-            error_func=self.error(network_output, train_prediction),
-            validation_error_func=self.error(network_output, prediction),
+            error_func=self.error_output(network_output, train_prediction),
+            validation_error_func=self.error_output(network_output,
+                                                    prediction),
         )
 
+    def layer_output(self, layer, input_value):
+        """ Builds symbolic output for the layer.
+
+        Parameters
+        ----------
+        layer : BaseLayer instance
+        input_value : Theano variable
+
+        Returns
+        -------
+        Theano variable
+        """
+        return layer.output(input_value)
+
+    def error_output(self, expected, predicted):
+        """ Builds symbolic prediction error.
+
+        Parameters
+        ----------
+        expected : Theano variable
+        predicted : Theano variable
+
+        Returns
+        -------
+        Theano variable
+        """
+        return self.error(expected, predicted)
+
     def init_methods(self):
         """ Initialize all methods that needed for prediction and
-        training procedures.
+        training procedures. Methods get compiled at the first usage.
         """
         network_input = self.variables.network_input
         network_output = self.variables.network_output
 
-        self.methods.predict_raw = theano.function(
-            inputs=[self.variables.network_input],
-            outputs=self.variables.prediction_func
-        )
-        self.methods.train_epoch = theano.function(
-            inputs=[network_input, network_output],
-            outputs=self.variables.error_func,
-            updates=self.init_train_updates(),
-        )
-        self.methods.prediction_error = theano.function(
+        def compile_train_epoch():
+            return self.compile_function(
+                'train_epoch',
+                inputs=[network_input, network_output],
+                outputs=self.variables.error_func,
+                updates=self.init_train_updates(),
+            )
+
+        self.methods.add('predict_raw', partial(
+            self.compile_function, 'predict_raw',
+            inputs=[network_input],
+            outputs=self.variables.prediction_func,
+        ))
+        self.methods.add('train_epoch', compile_train_epoch)
+        self.methods.add('prediction_error', partial(
+            self.compile_function, 'prediction_error',
             inputs=[network_input, network_output],
-            outputs=self.variables.validation_error_func
+            outputs=self.variables.validation_error_func,
+        ))
+
+    def compile_function(self, name, inputs, outputs, updates=None,
+                         givens=None):
+        """ Compiles Theano function. Function gets loaded from the
+        cache in case if network has been initialized with
+        ``function_cache_dir`` or ``share_functions`` options.
+
+        Parameters
+        ----------
+        name : str
+            Function name.
+        inputs : list
+        outputs : Theano variable or list
+        updates : list or None
+        givens : dict, list or None
+
+        Returns
+        -------
+        Theano function
+        """
+        profile = self.function_profile(name)
+        mode = self.function_mode(name)
+        start_compile_time = time.time()
+
+        # Profiler can't be stored in cache
+        if self.function_cache is None or profile is not None:
+            function = theano.function(inputs=inputs, outputs=outputs,
+                                       updates=updates, givens=givens,
+                                       mode=mode, profile=profile)
+        else:
+            function = self.function_cache.function(
+                self.class_name() + '.' + name,
+                inputs=inputs, outputs=outputs,
+                updates=updates, givens=givens,
+                mode=mode,
+            )
+
+        finish_compile_time = time.time()
+        self.logs.message("THEANO", "Function {!r} compiled. It took {:.2f} "
+                          "seconds".format(name, finish_compile_time -
+                                           start_compile_time))
+
+        if self.function_cache is not None:
+            self.logs.message("THEANO", self.function_cache.summary())
+
+        return function
+
+    def function_mode(self, name):
+        """ Finds Theano mode for the compiled function.
+
+        Parameters
+        ----------
+        name : str
+            Function name.
+
+        Returns
+        -------
+        str, Theano Mode instance or None
+            ``None`` means that function should be compiled
+            with the default Theano mode.
+        """
+        if self.function_modes and name in self.function_modes:
+            return self.function_modes[name]
+
+        if self.optimizer is None:
+            return self.compile_mode
+
+        mode = get_mode(self.compile_mode)
+        return mode.clone(optimizer=self.optimizer)
+
+    def function_profile(self, name):
+        """ Creates profiler for the compiled function in case if
+        profiling is enabled.
+
+        Parameters
+        ----------
+        name : str
+            Function name.
+
+        Returns
+        -------
+        ProfileStats instance or None
+        """
+        if not self.profile:
+            return None
+
+        profile_stats = ProfileStats(atexit_print=False,
+                                     message=self.class_name() + '.' + name)
+        self.profiles[name] = profile_stats
+        return profile_stats
+
+    def show_profile(self, stdout=print):
+        """ Shows time that each compiled function spent on operations
+        related to each layer's parameter. Operation belongs to the
+        closest parameter that it depends on. For the training
+        functions it includes parameter's update rule.
+
+        Parameters
+        ----------
+        stdout : function
+            Function that prints each line. Defaults to ``print``.
+        """
+        if not self.profiles:
+            raise ValueError("Network has been initialized without "
+                             "profiling. Set up `profile=True` option.")
+
+        table_builder = table.TableBuilder(
+            table.Column(name="Function", width=24),
+            table.Column(name="Layer"),
+            table.Column(name="Parameter", width=12),
+            table.TimeColumn(name="Time", width=10),
+            table.NumberColumn(name="Share, %", places=1),
+            stdout=stdout,
         )
+        table_builder.start()
+
+        for name, profile_stats in sorted(self.profiles.items()):
+            time_usage = parameter_time_usage(profile_stats)
+            total_time = sum(time_usage.values()) or 1.
+
+            # Operations without parameters go to the end
+            keys = sorted(time_usage, key=lambda key: (
+                key[1] is None, key[1] or 0, key[0] or ''))
+
+            for key in keys:
+                parameter_name, layer_id = key
+                seconds = time_usage[key]
+
+                table_builder.row([
+                    name,
+                    '-' if layer_id is None else layer_id,
+                    parameter_name or '-',
+                    seconds,
+                    100 * seconds / total_time,
+                ])
+
+        table_builder.finish()
 
     def init_layers(self):
         """ Initialize layers in the same order as they were list in
         network initialization step.
         """
         for layer in self.layers:
+            restore_flat_parameters(layer)
             layer.initialize()
 
+    def init_flat_parameters(self):
+        """ Copies parameters of all layers into one shared vector
+        and replaces each layer's parameter with its view.
+        """
+        parameters = self.parameter_variables()
+
+        if not parameters:
+            return
+
+        parameter_vector = theano.shared(
+            name='parameter_vector',
+            value=asfloat(np.concatenate([
+                param.get_value(borrow=True).ravel()
+                for param in parameters
+            ])),
+        )
+
+        start_position = 0
+        for layer in self.layers:
+            views = []
+
+            for parameter in layer.parameters:
+                shape = parameter.get_value(borrow=True).shape
+                end_position = start_position + int(np.prod(shape))
+
+                view = parameter_vector[start_position:end_position]
+                view = view.reshape(shape)
+                # Reshaped view doesn't know about broadcastable
+                # dimensions of the original parameter
+                view = T.patternbroadcast(view, parameter.broadcastable)
+                view.name = parameter.name
+                view.tag.flat_position = (parameter_vector, start_position,
+                                          end_position, shape)
+                views.append(view)
+
+                start_position = end_position
+
+            for parameter, view in zip(layer.parameters, views):
+                for attrname in ('weight', 'bias'):
+                    if getattr(layer, attrname, None) is parameter:
+                        setattr(layer, attrname, view)
+
+            layer.parameters = views
+
+        self.variables.parameter_vector = parameter_vector
+
     def init_train_updates(self):
         """ Initialize train function update in Theano format that
         would be trigger after each training epoch.
@@ -305,7 +705,50 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         updates = []
         for layer in self.layers:
             updates.extend(self.init_layer_updates(layer))
-        return updates
+        return self.merge_parameter_updates(updates)
+
+    def merge_parameter_updates(self, updates):
+        """ Combines updates for the layers' parameters into one update
+        for the parameter vector in case if network has been
+        initialized with ``flat_parameters=True`` option. Otherwise
+        returns the same updates.
+
+        Parameters
+        ----------
+        updates : list
+
+        Returns
+        -------
+        list
+        """
+        if not self.flat_parameters:
+            return updates
+
+        parameter_vector = self.variables.parameter_vector
+        parameter_ids = set(id(param) for layer in self.layers
+                            for param in layer.parameters)
+
+        other_updates = []
+        new_parameter_vector = parameter_vector
+
+        for variable, new_value in updates:
+            if id(variable) not in parameter_ids:
+                other_updates.append((variable, new_value))
+                continue
+
+            # Each update modifies only its own slice, which
+            # allows Theano to update vector inplace instead of
+            # building a new vector from all parameters.
+            _, start_position, end_position, _ = variable.tag.flat_position
+            new_parameter_vector = T.set_subtensor(
+                new_parameter_vector[start_position:end_position],
+                new_value.flatten(),
+            )
+
+        if new_parameter_vector is not parameter_vector:
+            other_updates.append((parameter_vector, new_parameter_vector))
+
+        return other_updates
 
     def init_layer_updates(self, layer):
         """ Initialize train function update in Theano format that
@@ -397,6 +840,58 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
             self.format_target_data(target_data)
         )
 
+    def parameter_variables(self):
+        """ Returns all layers' parameters.
+
+        Returns
+        -------
+        list
+            List of Theano shared variables. Network with flat
+            parameters returns only parameter vector.
+        """
+        if self.flat_parameters and 'parameter_vector' in self.variables:
+            return [self.variables.parameter_vector]
+
+        return [param for layer in self.layers
+                for param in layer.parameters]
+
+    def snapshot_prediction_error(self):
+        """ Makes a copy of the network's parameters and returns function
+        that computes prediction error using them. Function can be
+        used in the other thread while network continues training.
+
+        Returns
+        -------
+        function
+        """
+        parameters = self.parameter_variables()
+
+        if 'snapshot_prediction_error' not in self.methods:
+            network_input = self.variables.network_input
+            network_output = self.variables.network_output
+            parameter_inputs = [param.type(param.name)
+                                for param in parameters]
+
+            self.methods.snapshot_prediction_error = self.compile_function(
+                'snapshot_prediction_error',
+                inputs=[network_input, network_output] + parameter_inputs,
+                outputs=self.variables.validation_error_func,
+                givens=list(zip(parameters, parameter_inputs)),
+            )
+
+        snapshot_prediction_error = self.methods.snapshot_prediction_error
+        parameter_values = [param.get_value(borrow=False)
+                            for param in parameters]
+
+        def prediction_error(input_data, target_data):
+            return snapshot_prediction_error(
+                self.format_input_data(input_data),
+                self.format_target_data(target_data),
+                *parameter_values
+            )
+
+        return prediction_error
+
     def predict_raw(self, input_data):
         """ Make raw prediction without final layer postprocessing step.
 
@@ -427,6 +922,35 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         raw_prediction = self.predict_raw(input_data)
         return self.output_layer.output(raw_prediction)
 
+    def export_inference(self, dtype='float32', max_batch_size=128,
+                         input_shape=None):
+        """ Creates network that makes the same predictions using
+        only NumPy. Exported network has a copy of the current
+        parameters and it doesn't need Theano at import or
+        prediction time, which makes it suitable for processes
+        that don't train network.
+
+        Parameters
+        ----------
+        dtype : str or dtype
+            Data type for parameters and computations.
+            Defaults to ``float32``.
+        max_batch_size : int
+            Exported network preallocates outputs for each layer
+            for the specified number of samples. Bigger inputs get
+            processed in batches. Defaults to ``128``.
+        input_shape : tuple or None
+            Shape of the one input sample. Outputs get allocated
+            during the first prediction in case if value equal to
+            ``None``. Defaults to ``None``.
+
+        Returns
+        -------
+        InferenceNetwork instance
+        """
+        return export_inference_network(self, dtype, max_batch_size,
+                                        input_shape)
+
     def on_epoch_start_update(self, epoch):
         """ Function would be trigger before run all training procedure
         related to the current epoch.
@@ -439,12 +963,21 @@ class ConstructableNetwork(SupervisedLearning, BaseNetwork):
         super(ConstructableNetwork, self).on_epoch_start_update(epoch)
         self.variables.epoch.set_value(epoch)
 
-    def train(self, input_train, target_train, input_test=None,
+    def train(self, input_train, target_train=None, input_test=None,
               target_test=None, *args, **kwargs):
         """ Trains neural network.
         """
+        if is_data_stream(input_train):
+            input_train = DataStream(
+                input_train,
+                format_input=self.format_input_data,
+                format_target=self.format_target_data,
+            )
+        else:
+            input_train = self.format_input_data(input_train)
+
         return super(ConstructableNetwork, self).train(
-            self.format_input_data(input_train),
+            input_train,
             self.format_target_data(target_train),
             self.format_input_data(input_test),
             self.format_target_data(target_test),
@@ -0,0 +1,153 @@
+import numpy as np
+from theano.compile import SharedVariable
+
+from neupy import layers, inference
+
+
+__all__ = ('export_inference_network',)
+
+
+ACTIVATION_NAMES = (
+    (layers.Linear, 'linear'),
+    (layers.Sigmoid, 'sigmoid'),
+    (layers.HardSigmoid, 'hard_sigmoid'),
+    (layers.Step, 'step'),
+    (layers.Tanh, 'tanh'),
+    (layers.Relu, 'relu'),
+    (layers.Softplus, 'softplus'),
+    (layers.Softmax, 'softmax'),
+)
+
+
+def find_activation_name(layer):
+    for layer_class, activation_name in ACTIVATION_NAMES:
+        if isinstance(layer, layer_class):
+            return activation_name
+
+    raise TypeError("Layer {!r} has activation function that can't be "
+                    "exported".format(layer))
+
+
+def parameter_value(parameter, dtype):
+    if isinstance(parameter, SharedVariable):
+        return np.array(parameter.get_value(), dtype=dtype)
+    # View into the network's parameter vector
+    return np.array(parameter.eval(), dtype=dtype)
+
+
+def layer_operation(layer, dtype):
+    """ Converts layer to the operation that makes the same
+    computations using NumPy.
+
+    Parameters
+    ----------
+    layer : BaseLayer instance
+    dtype : dtype
+
+    Returns
+    -------
+    Operation instance or None
+        ``None`` in case if layer doesn't modify input
+        during the prediction.
+    """
+    if isinstance(layer, layers.Dropout):
+        return None
+
+    if isinstance(layer, layers.ActivationLayer):
+        activation = find_activation_name(layer)
+
+        if layer.size is None:
+            return inference.Activation(activation)
+
+        return inference.Dense(weight=parameter_value(layer.weight, dtype),
+                               bias=parameter_value(layer.bias, dtype),
+                               activation=activation)
+
+    if isinstance(layer, layers.Convolution):
+        return inference.Convolution(
+            weight=parameter_value(layer.weight, dtype),
+            bias=parameter_value(layer.bias, dtype),
+            border_mode=layer.border_mode,
+            stride=layer.stride_size,
+        )
+
+    if isinstance(layer, layers.MaxPooling):
+        return inference.Pooling(size=layer.size, stride=layer.stride_size,
+                                 padding=layer.padding, mode='max')
+
+    if isinstance(layer, layers.AveragePooling):
+        return inference.Pooling(size=layer.size, stride=layer.stride_size,
+                                 padding=layer.padding, mode=layer.mode)
+
+    if isinstance(layer, layers.Reshape):
+        return inference.Reshape(layer.shape)
+
+    raise TypeError("Layer {!r} can't be exported".format(layer))
+
+
+def output_operation(layer):
+    """ Converts output layer to the final postprocessing step.
+
+    Parameters
+    ----------
+    layer : Output instance
+
+    Returns
+    -------
+    Output instance from the ``neupy.inference`` module.
+    """
+    if isinstance(layer, layers.CompetitiveOutput):
+        return inference.CompetitiveOutput()
+
+    if isinstance(layer, layers.StepOutput):
+        return inference.StepOutput(output_bounds=layer.output_bounds,
+                                    critical_point=layer.critical_point)
+
+    if isinstance(layer, layers.RoundedOutput):
+        return inference.RoundedOutput(decimals=layer.decimals)
+
+    if isinstance(layer, layers.ArgmaxOutput):
+        return inference.ArgmaxOutput()
+
+    if type(layer) is layers.Output:
+        return inference.Output()
+
+    raise TypeError("Output layer {!r} can't be exported".format(layer))
+
+
+def export_inference_network(network, dtype='float32', max_batch_size=128,
+                             input_shape=None):
+    """ Copies network's parameters and creates network that makes
+    predictions using only NumPy.
+
+    Parameters
+    ----------
+    network : ConstructableNetwork instance
+    dtype : str or dtype
+        Defaults to ``float32``.
+    max_batch_size : int
+        Defaults to ``128``.
+    input_shape : tuple or None
+        Defaults to ``None``.
+
+    Returns
+    -------
+    InferenceNetwork instance
+    """
+    dtype = np.dtype(dtype)
+    operations = []
+
+    for layer in network.layers:
+        operation = layer_operation(layer, dtype)
+
+        if operation is not None:
+            operations.append(operation)
+
+    return inference.InferenceNetwork(
+        operations,
+        output=output_operation(network.output_layer),
+        dtype=dtype,
+        max_batch_size=max_batch_size,
+        is_feature1d=(network.input_layer.size == 1),
+        input_shape=input_shape,
+    )
@@ -1,4 +1,5 @@
 from neupy.utils import format_data
+from .utils import DataStream, is_data_stream
 
 
 __all__ = ('SupervisedLearning', 'UnsupervisedLearning', 'LazyLearning')
@@ -10,15 +11,22 @@ class SupervisedLearning(object):
     Methods
     -------
     train(input_train, target_train, input_test=None, target_test=None,\
-    epochs=100, epsilon=None)
+    epochs=100, epsilon=None, summary_type='table', **validation_options)
         Trains network. You can control network training procedure
         iterations with the number of epochs or converge value epsilon.
         Also you can specify ``input_test`` and ``target_test`` and control
-        your validation data error on each iteration.
+        your validation data error on each iteration. Training data
+        can be streamed in chunks. In this case ``input_train`` should
+        be an iterator or function that returns iterator over
+        ``(input_batch, target_batch)`` tuples and ``target_train``
+        should be equal to ``None``. Options ``async_validation``,
+        ``validate_every``, ``validation_time_interval`` and
+        ``validation_subsample`` control how and when network
+        computes validation error.
     """
-    def train(self, input_train, target_train, input_test=None,
+    def train(self, input_train, target_train=None, input_test=None,
               target_test=None, epochs=100, epsilon=None,
-              summary_type='table'):
+              summary_type='table', **validation_options):
 
         is_test_data_partialy_missed = (
             (input_test is None and target_test is not None) or
@@ -29,8 +37,19 @@ class SupervisedLearning(object):
             raise ValueError("Input and target test samples missed. "
                              "They must be defined both or none of them.")
 
-        input_train = format_data(input_train)
-        target_train = format_data(target_train)
+        if is_data_stream(input_train):
+            if not isinstance(input_train, DataStream):
+                input_train = DataStream(input_train,
+                                         format_input=format_data,
+                                         format_target=format_data)
+
+        elif target_train is None:
+            raise ValueError("Target data is missed. It must be defined "
+                             "for the supervised learning algorithms.")
+
+        else:
+            input_train = format_data(input_train)
+            target_train = format_data(target_train)
 
         if input_test is not None:
             input_test = format_data(input_test)
@@ -42,7 +61,8 @@ class SupervisedLearning(object):
             input_train=input_train, target_train=target_train,
             input_test=input_test, target_test=target_test,
             epochs=epochs, epsilon=epsilon,
-            summary_type=summary_type
+            summary_type=summary_type,
+            **validation_options
         )
 
 
@@ -59,7 +79,13 @@ class UnsupervisedLearning(object):
     def train(self, input_train, epochs=100, epsilon=None,
               summary_type='table'):
 
-        input_train = format_data(input_train, is_feature1d=True)
+        if is_data_stream(input_train):
+            if not isinstance(input_train, DataStream):
+                input_train = DataStream(input_train,
+                                         format_input=format_data)
+        else:
+            input_train = format_data(input_train, is_feature1d=True)
+
         return super(UnsupervisedLearning, self).train(
             input_train=input_train, target_train=None,
             input_test=None, target_test=None,
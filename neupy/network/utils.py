@@ -1,8 +1,21 @@
+from __future__ import print_function
+
+import sys
+import numbers
+import time
+import threading
+
+import six
+from six.moves import queue
 import numpy as np
 
+from neupy.helpers import table
+
 
 __all__ = ('iter_until_converge', 'shuffle', 'normalize_error', 'step',
-           'StopNetworkTraining')
+           'StopNetworkTraining', 'DataStream', 'is_data_stream',
+           'AsyncValidation', 'ValidationSchedule',
+           'subsample_validation_data', 'EarlyStopping', 'TrainingProfile')
 
 
 class StopNetworkTraining(Exception):
@@ -81,6 +94,456 @@ def shuffle(*arrays):
     return arrays
 
 
+def is_data_stream(data):
+    """ Checks whether data is a stream of batches instead of
+    an array-like object.
+
+    Parameters
+    ----------
+    data : object
+
+    Returns
+    -------
+    bool
+        ``True`` for the ``DataStream`` instances, iterators,
+        generators and functions that produce new iterable
+        object after each call.
+    """
+    if isinstance(data, DataStream) or callable(data):
+        return True
+
+    # Iterator protocol requires ``iter`` method to return the
+    # same object. Arrays, lists and data frames return new
+    # iterator instead.
+    return hasattr(data, '__iter__') and iter(data) is data
+
+
+class DataStream(object):
+    """ Iterable object that returns training data in chunks. Data
+    doesn't need to fit in memory, because only one chunk is loaded
+    at a time.
+
+    Parameters
+    ----------
+    source : iterable or function
+        Iterator or generator that yields ``(input_batch, target_batch)``
+        tuples. For unsupervised algorithms it can yield input batches
+        only. Plain iterator can be consumed only once. Function
+        without arguments that returns new iterator after each call
+        makes it possible to stream data over multiple epochs.
+    format_input : function or None
+        Function applies to each input batch. Defaults to ``None``.
+    format_target : function or None
+        Function applies to each target batch. Defaults to ``None``.
+    """
+    def __init__(self, source, format_input=None, format_target=None):
+        if isinstance(source, DataStream):
+            source = source.source
+
+        if not is_data_stream(source):
+            raise TypeError("Data stream expects iterator or function, "
+                            "got `{}`".format(source.__class__.__name__))
+
+        self.source = source
+        self.format_input = format_input
+        self.format_target = format_target
+        self.is_consumed = False
+
+    @property
+    def reiterable(self):
+        """ ``True`` if stream can be iterated over multiple times.
+        """
+        return callable(self.source)
+
+    def __iter__(self):
+        if self.reiterable:
+            chunks = self.source()
+
+        elif self.is_consumed:
+            raise ValueError("Data stream has been already consumed. Use "
+                             "function that returns new iterator in order "
+                             "to iterate over data multiple times.")
+        else:
+            chunks = self.source
+            self.is_consumed = True
+
+        format_input = self.format_input
+        format_target = self.format_target
+
+        for chunk in chunks:
+            if isinstance(chunk, tuple) and len(chunk) == 2:
+                input_batch, target_batch = chunk
+            else:
+                input_batch, target_batch = chunk, None
+
+            if format_input is not None:
+                input_batch = format_input(input_batch)
+
+            if format_target is not None and target_batch is not None:
+                target_batch = format_target(target_batch)
+
+            yield input_batch, target_batch
+
+
+class AsyncValidation(object):
+    """ Computes validation errors in the background thread, while
+    network continues training.
+
+    Parameters
+    ----------
+    validation_errors : ErrorHistoryList
+        List that stores validation errors. Each computed error
+        replaces placeholder at the specified position in this list.
+    max_pending : int
+        Maximum number of validation tasks that can wait in the queue.
+        Each task holds the copy of network's parameters. Task
+        submission blocks in case if queue is full. Defaults to ``1``.
+    """
+    def __init__(self, validation_errors, max_pending=1):
+        self.validation_errors = validation_errors
+        self.tasks = queue.Queue(maxsize=max_pending)
+        self.results = queue.Queue()
+        self.exc_info = None
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        while True:
+            task = self.tasks.get()
+
+            if task is None:
+                return
+
+            position, prediction_error, input_test, target_test = task
+
+            try:
+                if self.exc_info is None:
+                    error = prediction_error(input_test, target_test)
+                    self.results.put((position, error))
+
+            except Exception:
+                self.exc_info = sys.exc_info()
+
+    def check_errors(self):
+        """ Re-raises exception that has been triggered in the
+        background thread.
+        """
+        if self.exc_info is not None:
+            six.reraise(*self.exc_info)
+
+    def store_results(self):
+        """ Replaces placeholders with computed errors. List can be
+        modified only from the training thread, because each new error
+        might discard the oldest one and shift other errors.
+        """
+        validation_errors = self.validation_errors
+
+        while not self.results.empty():
+            position, error = self.results.get()
+            index = position - validation_errors.n_discarded
+
+            if index >= 0:
+                validation_errors[index] = error
+
+    def submit(self, prediction_error, input_test, target_test):
+        """ Adds validation task for the last epoch to the queue.
+
+        Parameters
+        ----------
+        prediction_error : function
+            Function that computes prediction error.
+        input_test : array-like
+        target_test : array-like
+        """
+        self.check_errors()
+        self.store_results()
+
+        validation_errors = self.validation_errors
+        position = validation_errors.n_discarded + len(validation_errors) - 1
+
+        self.tasks.put((position, prediction_error, input_test, target_test))
+
+    def finish(self):
+        """ Waits until all submitted tasks will be finished.
+        """
+        self.tasks.put(None)
+        self.thread.join()
+        self.check_errors()
+        self.store_results()
+
+
+class ValidationSchedule(object):
+    """ Decides after which epochs network should compute
+    validation error.
+
+    Parameters
+    ----------
+    every : int
+        Network computes validation error only after each
+        ``every``-th epoch. Defaults to ``1``.
+    time_interval : float or None
+        Minimum number of seconds between two validations.
+        ``None`` means that there is no time limit.
+        Defaults to ``None``.
+    """
+    def __init__(self, every=1, time_interval=None):
+        if not isinstance(every, numbers.Integral) or every < 1:
+            raise ValueError("Validation frequency should be an integer "
+                             "greater than zero, got {!r}".format(every))
+
+        if time_interval is not None and time_interval <= 0:
+            raise ValueError("Time interval between validations should "
+                             "be a positive number, got {!r}"
+                             "".format(time_interval))
+
+        self.every = every
+        self.time_interval = time_interval
+        self.last_validation_time = time.time()
+
+    def is_validation_epoch(self, epoch):
+        """ Checks whether validation error should be computed
+        after specified epoch.
+
+        Parameters
+        ----------
+        epoch : int
+
+        Returns
+        -------
+        bool
+        """
+        if epoch % self.every != 0:
+            return False
+
+        if self.time_interval is None:
+            return True
+
+        time_passed = time.time() - self.last_validation_time
+        return time_passed >= self.time_interval
+
+    def mark_validated(self):
+        """ Resets timer after validation.
+        """
+        self.last_validation_time = time.time()
+
+
+def subsample_validation_data(input_test, target_test, subsample):
+    """ Selects random subset of the validation samples.
+
+    Parameters
+    ----------
+    input_test : array-like
+    target_test : array-like
+    subsample : int or float
+        Number of samples in case of integer and fraction of all
+        samples in case of float.
+
+    Returns
+    -------
+    tuple
+        Input and target samples from the subset. Samples keep
+        the same order as in the original data.
+    """
+    n_samples = input_test.shape[0]
+
+    if isinstance(subsample, float):
+        if not 0 < subsample <= 1:
+            raise ValueError("Fraction of the validation samples should "
+                             "be in range (0, 1], got {}".format(subsample))
+        subsample = max(1, int(round(subsample * n_samples)))
+
+    if not 1 <= subsample <= n_samples:
+        raise ValueError("Number of validation samples should be between "
+                         "1 and {}, got {}".format(n_samples, subsample))
+
+    # Sorted indices allow to read memory-mapped data sequentially
+    indices = np.sort(np.random.choice(n_samples, subsample, replace=False))
+    return input_test[indices], target_test[indices]
+
+
+class EarlyStopping(object):
+    """ Tracks the best error and signals when network stops
+    improving.
+
+    Parameters
+    ----------
+    patience : int
+        Number of epochs with known error and without improvement
+        after which training should stop.
+    parameters : list or tuple
+        Theano shared variables which values should be saved each
+        time when error improves. Parameters won't be saved in case
+        if it's empty. Defaults to ``()``.
+
+    Attributes
+    ----------
+    best_error : float
+        The lowest error observed so far.
+    best_epoch : int or None
+        Epoch that has the lowest error.
+    """
+    def __init__(self, patience, parameters=()):
+        if not isinstance(patience, int) or patience < 1:
+            raise ValueError("Patience should be an integer greater than "
+                             "zero, got {!r}".format(patience))
+
+        self.patience = patience
+        self.parameters = parameters
+        # Buffers allocated once, which means that each improvement
+        # copies values without any additional memory allocation.
+        self.buffers = [np.empty_like(param.get_value(borrow=True))
+                        for param in parameters]
+
+        self.best_error = np.inf
+        self.best_epoch = None
+        self.n_epochs_without_improvement = 0
+
+    def update(self, epoch, error):
+        """ Registers error from the specified epoch.
+
+        Parameters
+        ----------
+        epoch : int
+        error : float or None
+            Error after the epoch. ``None`` means that error is
+            unknown, for instance validation has been skipped, and
+            epoch isn't counted.
+
+        Returns
+        -------
+        bool
+            ``True`` if training should stop.
+        """
+        if error is None:
+            return False
+
+        if error < self.best_error:
+            self.best_error = error
+            self.best_epoch = epoch
+            self.n_epochs_without_improvement = 0
+
+            for param, buffer in zip(self.parameters, self.buffers):
+                # Values are copied immediately, so there is no need
+                # to make an additional copy with ``borrow=False``
+                np.copyto(buffer, param.get_value(borrow=True))
+
+            return False
+
+        self.n_epochs_without_improvement += 1
+        return self.n_epochs_without_improvement >= self.patience
+
+    def restore(self):
+        """ Sets up parameters from the epoch with the lowest error.
+
+        Returns
+        -------
+        bool
+            ``False`` if there is no saved parameters.
+        """
+        if self.best_epoch is None or not self.parameters:
+            return False
+
+        for param, buffer in zip(self.parameters, self.buffers):
+            param.set_value(buffer)
+
+        return True
+
+
+class TrainingProfile(object):
+    """ Accumulates time that network spends in each phase
+    of the training.
+
+    Phases can be nested. Time of the nested phase is excluded
+    from the time of the outer phase, which means that the sum
+    over all phases doesn't count the same time twice.
+
+    Attributes
+    ----------
+    phase_time : dict
+        Total time in seconds spent in each phase.
+    n_epochs : int
+        Number of profiled epochs.
+    """
+    phases = ('shuffle', 'formatting', 'batch slicing', 'train call',
+              'validation', 'summary', 'signals')
+
+    def __init__(self):
+        self.phase_time = dict.fromkeys(self.phases, 0.)
+        self.n_epochs = 0
+        # Each element accumulates time spent in the nested phases
+        self.nested_time = []
+
+    def timed(self, phase, function):
+        """ Wraps function in order to measure its execution time.
+
+        Parameters
+        ----------
+        phase : str
+            Name of the phase from the ``phases`` attribute.
+        function : function
+
+        Returns
+        -------
+        function
+        """
+        if phase not in self.phase_time:
+            raise ValueError("Unknown phase `{}`".format(phase))
+
+        phase_time = self.phase_time
+        nested_time = self.nested_time
+
+        def wrapper(*args, **kwargs):
+            nested_time.append(0.)
+            start_time = time.time()
+
+            try:
+                return function(*args, **kwargs)
+
+            finally:
+                duration = time.time() - start_time
+                phase_time[phase] += duration - nested_time.pop()
+
+                if nested_time:
+                    nested_time[-1] += duration
+
+        return wrapper
+
+    @property
+    def total_time(self):
+        """ Total time in seconds spent in all phases.
+        """
+        return sum(self.phase_time.values())
+
+    def show(self, stdout=print):
+        """ Shows time spent in each phase as a table.
+
+        Parameters
+        ----------
+        stdout : function
+            Function that prints each line. Defaults to ``print``.
+        """
+        n_epochs = max(self.n_epochs, 1)
+        total_time = self.total_time or 1.
+
+        table_builder = table.TableBuilder(
+            table.Column(name="Phase", width=13),
+            table.TimeColumn(name="Total", width=10),
+            table.TimeColumn(name="Per epoch", width=10),
+            table.NumberColumn(name="Share, %", places=1),
+            stdout=stdout,
+        )
+        table_builder.start()
+
+        for phase in self.phases:
+            seconds = self.phase_time[phase]
+            table_builder.row([phase, seconds, seconds / n_epochs,
+                               100 * seconds / total_time])
+
+        table_builder.finish()
+
+
 def normalize_error(output):
     """ Normalize error output when result is non-scalar.
 
@@ -106,7 +106,7 @@ def line_search(f, f_deriv, maxiter=20, c1=1e-4, c2=0.9):
             y_current > (y0 + c1 * x_current * y_deriv_0),
             T.and_(
                 y_current >= y_previous,
-                T.bitwise_not(is_first_iteration)
+                T.eq(is_first_iteration, 0)
             )
         )
         condition2 = T.abs_(y_deriv_current) <= -c2 * y_deriv_0
@@ -51,7 +51,7 @@ def error_plot(network, logx=False, ax=None, show=True):
 
     line_error_in, = plot_function(errors_range, train_errors)
 
-    if validation_errors:
+    if len(validation_errors) > 0:
         line_error_out, = plot_function(errors_range, validation_errors)
         ax.legend(
             [line_error_in, line_error_out],
@@ -1,3 +1,4 @@
+import copy
 import inspect
 
 import theano
@@ -10,7 +11,8 @@ from scipy.sparse import issparse
 
 __all__ = ('format_data', 'does_layer_accept_1d_feature', 'asfloat',
            'AttributeKeyDict', 'is_list_of_integers', 'preformat_value',
-           'as_array2d', 'NotTrainedException', 'smallest_positive_number')
+           'as_array2d', 'NotTrainedException', 'smallest_positive_number',
+           'IndexedArray')
 
 
 class NotTrainedException(Exception):
@@ -44,7 +46,7 @@ def format_data(data, is_feature1d=True, copy=False):
         The same input data but transformed to a standardized format
         for further use.
     """
-    if data is None or issparse(data):
+    if data is None or issparse(data) or isinstance(data, IndexedArray):
         return data
 
     data = asfloat(data)
@@ -62,6 +64,62 @@ def format_data(data, is_feature1d=True, copy=False):
     return data
 
 
+class IndexedArray(object):
+    """ Array-like object that reads rows from the array only on
+    demand. It's useful for the arrays that don't fit in memory,
+    like ``numpy.memmap``.
+
+    Slicing returns rows converted to the float type configured
+    by theano floatX variable. Indexing with an integer array
+    doesn't read any data, instead it returns new ``IndexedArray``
+    instance that reads rows in the specified order. It makes
+    possible to shuffle data without making its copy.
+
+    Parameters
+    ----------
+    array : array-like
+        Data array. Rows should be stored along the first dimension.
+    indices : array-like or None
+        Order in which rows should be read from the array. ``None``
+        means that rows will be read in the original order.
+        Defaults to ``None``.
+    """
+    def __init__(self, array, indices=None):
+        self.array = array
+        self.indices = indices
+
+    @property
+    def shape(self):
+        return (len(self),) + self.array.shape[1:]
+
+    @property
+    def ndim(self):
+        return self.array.ndim
+
+    def __len__(self):
+        if self.indices is None:
+            return self.array.shape[0]
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if self.indices is None:
+                rows = self.array[index]
+            else:
+                rows = self.array[self.indices[index]]
+
+            return np.ascontiguousarray(asfloat(rows))
+
+        indices = np.asarray(index)
+        if self.indices is not None:
+            indices = self.indices[indices]
+
+        indexed_array = copy.copy(self)
+        indexed_array.indices = indices
+
+        return indexed_array
+
+
 def does_layer_accept_1d_feature(layer):
     """ Check if 1D feature values are valid for the layer.
 
@@ -58,3 +58,33 @@ class BackPropAlgsTestCase(BaseTestCase):
         x_train, _, y_train, _ = simple_classification()
         gdnet = algorithms.GradientDescent((10, 10, 1), error=custom_mse)
         gdnet.train(x_train, y_train)
+
+    def test_parameter_states(self):
+        optimizers = [
+            algorithms.Momentum,
+            algorithms.Quickprop,
+            algorithms.RPROP,
+            algorithms.Adadelta,
+            algorithms.Adagrad,
+            algorithms.RMSProp,
+            algorithms.Adam,
+            algorithms.Adamax,
+        ]
+
+        for optimizer_class in optimizers:
+            network = optimizer_class((3, 5, 2), step=0.1, verbose=False)
+            self.assertGreater(len(network.parameter_states), 0)
+
+            for parameter in network.parameter_variables():
+                parameter_shape = parameter.get_value().shape
+
+                for state_name in network.parameter_states:
+                    state = getattr(parameter, state_name)
+                    self.assertEqual(state.get_value().shape,
+                                     parameter_shape)
+                    self.assertIn(parameter.name, state.name)
+
+        network = algorithms.RPROP((3, 5, 2), verbose=False)
+        weight = network.input_layer.weight
+        np.testing.assert_array_equal(weight.prev_delta.get_value(), 0)
+        np.testing.assert_array_almost_equal(weight.steps.get_value(), 0.1)
@@ -1,10 +1,15 @@
+import os
+import shutil
+import tempfile
 from itertools import product
 
 import numpy as np
 
 from neupy import algorithms
+from neupy.utils import IndexedArray, asfloat
+from neupy.helpers.logs import TerminalLogger
 from neupy.algorithms.gd.base import (BatchSizeProperty, iter_batches,
-                                      average_batch_errors,
+                                      average_batch_errors, apply_batches,
                                       cannot_divide_into_batches)
 
 from data import simple_classification
@@ -77,3 +82,148 @@ class MinibatchGDTestCase(BaseTestCase):
         self.assertFalse(cannot_divide_into_batches(x, batch_size=2))
         self.assertFalse(cannot_divide_into_batches(x, batch_size=3))
         self.assertFalse(cannot_divide_into_batches(x, batch_size=9))
+
+    def test_minibatch_training_from_data_stream(self):
+        x_train, _, y_train, _ = simple_classification()
+        batch_size = 15
+
+        def iter_chunks():
+            for batch in iter_batches(len(x_train), batch_size):
+                yield x_train[batch], y_train[batch]
+
+        self.setUp()
+        array_net = algorithms.MinibatchGradientDescent(
+            (10, 20, 1), batch_size=batch_size
+        )
+        array_net.train(x_train, y_train, epochs=5)
+
+        self.setUp()
+        stream_net = algorithms.MinibatchGradientDescent(
+            (10, 20, 1), batch_size=batch_size
+        )
+        stream_net.train(iter_chunks, epochs=5)
+
+        np.testing.assert_array_almost_equal(array_net.errors,
+                                             stream_net.errors)
+        np.testing.assert_array_almost_equal(array_net.predict(x_train),
+                                             stream_net.predict(x_train))
+
+    def test_minibatch_training_with_memmap(self):
+        x_train, _, y_train, _ = simple_classification()
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        x_path = os.path.join(temp_dir, 'x_train.npy')
+        y_path = os.path.join(temp_dir, 'y_train.npy')
+
+        np.save(x_path, x_train)
+        np.save(y_path, y_train)
+
+        self.setUp()
+        array_net = algorithms.MinibatchGradientDescent(
+            (10, 20, 1), batch_size=15, shuffle_data=True,
+        )
+        array_net.train(x_train, y_train, x_train, y_train, epochs=5)
+
+        self.setUp()
+        memmap_net = algorithms.MinibatchGradientDescent(
+            (10, 20, 1), batch_size=15, shuffle_data=True,
+        )
+        memmap_net.train(np.load(x_path, mmap_mode='r'), y_path,
+                         x_path, y_path, epochs=5)
+
+        np.testing.assert_array_almost_equal(array_net.errors,
+                                             memmap_net.errors)
+        np.testing.assert_array_almost_equal(array_net.validation_errors,
+                                             memmap_net.validation_errors)
+        np.testing.assert_array_almost_equal(array_net.predict(x_train),
+                                             memmap_net.predict(x_path))
+
+    def test_indexed_array(self):
+        data = np.arange(20).reshape((10, 2))
+        indexed_data = IndexedArray(data)
+
+        self.assertEqual(indexed_data.shape, (10, 2))
+        np.testing.assert_array_equal(indexed_data[2:4], data[2:4])
+
+        indices = np.array([3, 1, 2])
+        shuffled_data = indexed_data[indices]
+
+        self.assertIsInstance(shuffled_data, IndexedArray)
+        self.assertEqual(len(shuffled_data), 3)
+        np.testing.assert_array_equal(shuffled_data[:2], data[[3, 1]])
+        np.testing.assert_array_equal(shuffled_data[[2, 0]][:],
+                                      data[[2, 3]])
+
+    def test_apply_batches_with_prefetch(self):
+        x = asfloat(np.random.random((50, 3)))
+        y = asfloat(np.random.random((50, 1)))
+        logger = TerminalLogger()
+        logger.enable = False
+
+        def function(x_batch, y_batch):
+            self.assertTrue(x_batch.flags['C_CONTIGUOUS'])
+            return x_batch.sum() + y_batch.sum()
+
+        expected_outputs = apply_batches(function, (x, y), batch_size=7,
+                                         logger=logger)
+
+        for prefetch in (1, 2, 10):
+            outputs = apply_batches(function, (x, y), batch_size=7,
+                                    logger=logger, prefetch=prefetch)
+            np.testing.assert_array_almost_equal(expected_outputs, outputs)
+
+    def test_apply_batches_prefetch_errors(self):
+        logger = TerminalLogger()
+        logger.enable = False
+
+        # Indices refer to the rows that don't exist
+        invalid_data = IndexedArray(np.ones((2, 2)), np.arange(10))
+
+        with self.assertRaises(IndexError):
+            apply_batches(lambda *args: 0, (invalid_data,),
+                          batch_size=3, logger=logger, prefetch=2)
+
+        def function(x_batch):
+            raise ZeroDivisionError()
+
+        with self.assertRaises(ZeroDivisionError):
+            apply_batches(function, (np.ones((10, 2)),), batch_size=3,
+                          logger=logger, prefetch=2)
+
+    def test_minibatch_training_with_prefetch(self):
+        x_train, x_test, y_train, y_test = simple_classification()
+        errors = []
+
+        for prefetch in (0, 3):
+            self.setUp()
+            net = algorithms.MinibatchGradientDescent(
+                (10, 20, 1), batch_size=15, prefetch=prefetch,
+            )
+            net.train(x_train, y_train, x_test, y_test, epochs=5)
+            errors.append((net.errors, net.validation_errors))
+
+        np.testing.assert_array_almost_equal(errors[0], errors[1])
+
+    def test_minibatch_training_with_shared_data(self):
+        x_train, x_test, y_train, y_test = simple_classification()
+
+        for shuffle_data, batch_size in product([False, True], [15, None]):
+            errors = []
+
+            for shared_data in (False, True):
+                self.setUp()
+                net = algorithms.MinibatchGradientDescent(
+                    (10, 20, 1),
+                    batch_size=batch_size,
+                    shuffle_data=shuffle_data,
+                    shared_data=shared_data,
+                )
+                net.train(x_train, y_train, x_test, y_test, epochs=5)
+                errors.append((net.errors, net.validation_errors))
+
+            np.testing.assert_array_almost_equal(errors[0], errors[1])
+
+        # Data stored in shared variables only during the training
+        input_train_data = net.variables.input_train_data.get_value()
+        self.assertEqual(input_train_data.size, 0)
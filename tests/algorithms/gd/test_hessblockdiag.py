@@ -0,0 +1,59 @@
+import numpy as np
+
+from neupy import algorithms, environment
+
+from data import simple_classification
+from base import BaseTestCase
+
+
+class HessianBlockDiagonalTestCase(BaseTestCase):
+    def test_hessian_block_diagonal_exceptions(self):
+        with self.assertRaises(ValueError):
+            # Network has only two layers with parameters
+            algorithms.HessianBlockDiagonal(
+                (2, 3, 1), layer_penalty_consts=[1, 1, 1], verbose=False)
+
+        with self.assertRaises(ValueError):
+            algorithms.HessianBlockDiagonal(
+                (2, 3, 1), layer_penalty_consts=[1, -1], verbose=False)
+
+    def test_one_block_equal_to_hessian(self):
+        x_train, _, y_train, _ = simple_classification()
+
+        networks = []
+        for algorithm in (algorithms.Hessian, algorithms.HessianBlockDiagonal):
+            environment.reproducible()
+            network = algorithm((10, 1), penalty_const=0.5, verbose=False)
+            network.train(x_train, y_train, epochs=3)
+            networks.append(network)
+
+        hessian, hessian_block_diagonal = networks
+        np.testing.assert_array_almost_equal(
+            hessian.errors.normalized(),
+            hessian_block_diagonal.errors.normalized())
+
+    def test_hessian_refresh(self):
+        x_train, x_test, y_train, y_test = simple_classification()
+        network = algorithms.HessianBlockDiagonal(
+            (10, 15, 1),
+            layer_penalty_consts=[1, 0.1],
+            refresh_every=2,
+            verbose=False,
+        )
+        inv_hessian = network.variables.inv_hessian_blocks[0]
+        self.assertEqual(inv_hessian.get_value().shape, (165, 165))
+
+        inv_hessians = []
+        for _ in range(3):
+            network.train(x_train, y_train, epochs=1)
+            inv_hessians.append(inv_hessian.get_value())
+
+        # Hessian was updated during the first
+        # and the third epochs
+        np.testing.assert_array_equal(inv_hessians[0], inv_hessians[1])
+        self.assertFalse(np.allclose(inv_hessians[1], inv_hessians[2]))
+
+        network.train(x_train, y_train, x_test, y_test, epochs=7)
+        errors = network.errors.normalized()
+        self.assertLess(errors[-1], errors[0])
+        self.assertLess(network.validation_errors.last(), 0.2)
@@ -0,0 +1,78 @@
+import theano
+import theano.tensor as T
+import numpy as np
+
+from neupy import algorithms
+from neupy.algorithms.gd.hessian import find_hessian_and_gradient
+from neupy.algorithms.gd.hessian_free import (hessian_vector_product,
+                                              conjugate_gradient)
+
+from data import simple_classification
+from base import BaseTestCase
+
+
+class HessianFreeTestCase(BaseTestCase):
+    def test_hessian_free_exceptions(self):
+        with self.assertRaises(ValueError):
+            algorithms.HessianFree((2, 3, 1), curvature='fisher',
+                                   verbose=False)
+
+        with self.assertRaises(ValueError):
+            algorithms.HessianFree((2, 3, 1), max_cg_iterations=0,
+                                   verbose=False)
+
+    def test_hessian_vector_product(self):
+        x = T.scalar('x')
+        y = T.scalar('y')
+        vector = T.vector('vector')
+
+        f = x ** 2 + y ** 3 + 7 * x * y
+        hessian, _ = find_hessian_and_gradient(f, [x, y])
+        product = hessian_vector_product(f, [x, y], vector)
+
+        func = theano.function([x, y, vector], [hessian.dot(vector), product])
+        expected_product, actual_product = func(1, 2, [3, -1])
+
+        np.testing.assert_array_almost_equal(expected_product, [-1, 9])
+        np.testing.assert_array_almost_equal(expected_product, actual_product)
+
+    def test_conjugate_gradient(self):
+        matrix = np.array([[4, 1, 0], [1, 3, 1], [0, 1, 2]])
+        vector = T.vector('vector')
+
+        solution = conjugate_gradient(lambda v: T.dot(matrix, v), vector,
+                                      n_iterations=10, tolerance=1e-10)
+        solve = theano.function([vector], solution)
+
+        np.testing.assert_array_almost_equal(
+            solve([1, 2, 3]), np.linalg.solve(matrix, [1, 2, 3]))
+
+        # One iteration makes step in the direction of the vector
+        solution = conjugate_gradient(lambda v: T.dot(matrix, v), vector,
+                                      n_iterations=1, tolerance=0)
+        solve = theano.function([vector], solution)
+        solution = solve([1, 0, 0])
+        np.testing.assert_array_almost_equal(solution, [0.25, 0, 0])
+
+        # Matrix isn't positive definite
+        solution = conjugate_gradient(lambda v: T.dot(-matrix, v), vector,
+                                      n_iterations=10, tolerance=0)
+        solve = theano.function([vector], solution)
+        np.testing.assert_array_almost_equal(solve([1, 2, 3]), [1, 2, 3])
+
+    def test_hessian_free_training(self):
+        x_train, x_test, y_train, y_test = simple_classification()
+
+        for curvature in ('gauss-newton', 'hessian'):
+            hfnet = algorithms.HessianFree(
+                (10, 15, 1),
+                curvature=curvature,
+                max_cg_iterations=10,
+                penalty_const=0.1,
+                verbose=False,
+            )
+            hfnet.train(x_train, y_train, x_test, y_test, epochs=10)
+
+            errors = hfnet.errors.normalized()
+            self.assertLess(errors[-1], errors[0])
+            self.assertLess(hfnet.validation_errors.last(), 0.2)
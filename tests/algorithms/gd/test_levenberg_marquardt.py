@@ -4,10 +4,14 @@ import theano.tensor as T
 from sklearn import datasets, preprocessing
 from sklearn.cross_validation import train_test_split
 
-from neupy import algorithms, layers, estimators
+from neupy import algorithms, layers, estimators, environment
 from neupy.utils import asfloat
-from neupy.algorithms.gd.lev_marq import compute_jaccobian
+from neupy.algorithms.gd.lev_marq import (compute_jaccobian,
+                                          compute_batch_jaccobian,
+                                          propagate_dense_layers,
+                                          solve_positive_definite)
 
+from data import simple_classification
 from base import BaseTestCase
 
 
@@ -43,6 +47,117 @@ class LevenbergMarquardtTestCase(BaseTestCase):
             jaccobian_actual.eval({x: x_train, y: y_train})
         )
 
+    def test_batch_jaccobian(self):
+        network = algorithms.LevenbergMarquardt([
+            layers.Tanh(3),
+            layers.Softmax(4),
+            layers.Sigmoid(2),
+            layers.Output(2),
+        ])
+        x = network.variables.network_input
+        y = network.variables.network_output
+        parameters = network.parameter_variables()
+
+        output, layer_inputs = propagate_dense_layers(network.layers, x)
+        errors = T.mean((y - output) ** 2, axis=1)
+
+        x_train = asfloat(np.random.random((10, 3)))
+        y_train = asfloat(np.random.random((10, 2)))
+        np.testing.assert_array_almost_equal(
+            compute_jaccobian(errors, parameters).eval({x: x_train,
+                                                        y: y_train}),
+            compute_batch_jaccobian(errors, layer_inputs).eval(
+                {x: x_train, y: y_train}),
+        )
+
+    def test_solve_positive_definite(self):
+        matrix = T.matrix('matrix')
+        vector = T.vector('vector')
+        solve = theano.function([matrix, vector],
+                                solve_positive_definite(matrix, vector))
+
+        positive_definite = asfloat(np.array([[4, 1], [1, 3]]))
+        indefinite = asfloat(np.array([[1, 2], [2, 1]]))
+        target = asfloat(np.array([1, 2]))
+
+        for matrix_value in (positive_definite, indefinite):
+            np.testing.assert_array_almost_equal(
+                np.linalg.solve(matrix_value, target),
+                solve(matrix_value, target),
+            )
+
+    def test_jacobian_methods(self):
+        x_train, _, y_train, _ = simple_classification()
+        errors = []
+
+        for jacobian in ('scan', 'backprop'):
+            environment.reproducible()
+            lmnet = algorithms.LevenbergMarquardt(
+                (10, 5, 1), jacobian=jacobian, verbose=False)
+            lmnet.train(x_train, y_train, epochs=4)
+            errors.append(lmnet.errors.normalized())
+
+        np.testing.assert_array_almost_equal(*errors)
+
+    def test_jacobian_batches(self):
+        x_train, _, y_train, _ = simple_classification()
+        options = [{}, {'jacobian_batch_size': 7},
+                   {'subsample': 0.5},
+                   {'subsample': 0.5, 'jacobian_batch_size': 10}]
+        errors = []
+
+        for network_options in options:
+            environment.reproducible()
+            lmnet = algorithms.LevenbergMarquardt(
+                (10, 5, 1), verbose=False, **network_options)
+            lmnet.train(x_train, y_train, epochs=4)
+            errors.append(lmnet.errors.normalized())
+
+        np.testing.assert_array_almost_equal(errors[0], errors[1])
+        np.testing.assert_array_almost_equal(errors[2], errors[3])
+        self.assertFalse(np.allclose(errors[0], errors[2]))
+
+    def test_mu_retries(self):
+        x_train, _, y_train, _ = simple_classification()
+        lmnet = algorithms.LevenbergMarquardt(
+            (10, 5, 1), mu_retries=10, mu_update_factor=2,
+            jacobian_batch_size=13, verbose=False)
+
+        lmnet.train(x_train, y_train, epochs=10)
+        errors = lmnet.errors.normalized()
+
+        # Network accepts only steps that reduce the error
+        self.assertTrue(np.all(np.diff(errors) <= 0))
+        self.assertLess(errors[-1], errors[0])
+
+    def test_mu_retries_with_dropout(self):
+        x_train, _, y_train, _ = simple_classification()
+        lmnet = algorithms.LevenbergMarquardt(
+            [
+                layers.Sigmoid(10),
+                layers.Dropout(0.5),
+                layers.Sigmoid(5),
+                layers.Output(1),
+            ],
+            mu_retries=2,
+            verbose=False,
+        )
+
+        # Error that accepts or rejects the step ignores dropout
+        x_train, y_train = asfloat(x_train), asfloat(y_train.reshape(-1, 1))
+        first_error = lmnet.methods.error_sum(x_train, y_train)
+        second_error = lmnet.methods.error_sum(x_train, y_train)
+        np.testing.assert_array_equal(first_error, second_error)
+
+        errors = [first_error]
+        for _ in range(10):
+            lmnet.train(x_train, y_train, epochs=1)
+            errors.append(lmnet.methods.error_sum(x_train, y_train))
+
+        # Network accepts only steps that reduce the error
+        self.assertTrue(np.all(np.diff(errors) <= 0))
+        self.assertLess(errors[-1], errors[0])
+
     def test_exceptions(self):
         with self.assertRaises(ValueError):
             algorithms.LevenbergMarquardt((2, 3, 1),
@@ -192,3 +192,47 @@ class QuasiNewtonTestCase(BaseTestCase):
 
         roc_curve_score = metrics.roc_auc_score(result, y_test)
         self.assertAlmostEqual(0.92, roc_curve_score, places=2)
+
+    def test_lbfgs_two_loop_recursion(self):
+        weight_deltas = np.array([[0.1, 0.2, 0.3], [0.3, -0.1, 0.2]])
+        gradient_deltas = np.array([[0.3, 0.1, 0.5], [0.4, -0.3, 0.3]])
+        gradient = np.array([1., -2., 0.5])
+
+        # Second pair is the latest one
+        direction = qn.lbfgs(
+            theano.shared(weight_deltas), theano.shared(gradient_deltas),
+            theano.shared(gradient), last_index=1, memory_size=2,
+        ).eval()
+
+        last_weight_delta = weight_deltas[1]
+        last_gradient_delta = gradient_deltas[1]
+        scale = (last_weight_delta.dot(last_gradient_delta) /
+                 last_gradient_delta.dot(last_gradient_delta))
+
+        inv_hessian = theano.shared(scale * np.eye(3))
+        for weight_delta, gradient_delta in zip(weight_deltas,
+                                                gradient_deltas):
+            inv_hessian = qn.bfgs(inv_hessian, theano.shared(weight_delta),
+                                  theano.shared(gradient_delta))
+
+        np.testing.assert_array_almost_equal(
+            inv_hessian.eval().dot(gradient), direction)
+
+    def test_quasi_newton_lbfgs(self):
+        x_train, x_test, y_train, y_test = simple_classification()
+
+        qnnet = algorithms.QuasiNewton(
+            (10, 30, 1),
+            update_function='lbfgs',
+            memory_size=3,
+            verbose=False,
+        )
+        self.assertNotIn('inv_hessian', qnnet.variables)
+        self.assertEqual(qnnet.variables.weight_deltas.get_value().shape,
+                         (3, 361))
+
+        qnnet.train(x_train, y_train, x_test, y_test, epochs=10)
+
+        errors = qnnet.errors.normalized()
+        self.assertLess(errors[-1], errors[0])
+        self.assertLess(qnnet.validation_errors.last(), 0.2)
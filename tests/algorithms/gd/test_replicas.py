@@ -0,0 +1,111 @@
+import pickle
+
+import numpy as np
+
+from neupy import algorithms, layers
+
+from data import simple_classification
+from base import BaseTestCase
+
+
+class ReplicatedGradientDescentTestCase(BaseTestCase):
+    def test_replica_errors(self):
+        x_train, x_test, y_train, y_test = simple_classification()
+        network = algorithms.ReplicatedGradientDescent(
+            (10, 20, 1),
+            n_replicas=3,
+            replica_steps=[0.01, 0.1, 1.],
+            batch_size=7,
+            verbose=False,
+        )
+        network.train(x_train, y_train, x_test, y_test, epochs=10)
+
+        train_errors = network.errors.replicas()
+        validation_errors = network.validation_errors.replicas()
+
+        self.assertEqual(train_errors.shape, (10, 3))
+        self.assertEqual(validation_errors.shape, (10, 3))
+        np.testing.assert_array_almost_equal(
+            train_errors.mean(axis=1), network.errors.normalized())
+
+        # The bigger step the faster network converges
+        final_errors = train_errors[-1]
+        self.assertTrue(np.all(np.diff(final_errors) < 0))
+
+        prediction = network.predict(x_test)
+        self.assertEqual(prediction.shape, (3, len(x_test), 1))
+
+    def test_replicas_match_separate_networks(self):
+        x_train, _, y_train, _ = simple_classification()
+        network = algorithms.ReplicatedGradientDescent(
+            [
+                layers.Tanh(10),
+                layers.Softmax(5),
+                layers.Output(2),
+            ],
+            n_replicas=2,
+            step=0.1,
+            batch_size='full',
+            error='categorical_crossentropy',
+            verbose=False,
+        )
+        parameters = [[param.get_value()[i]
+                       for param in network.parameter_variables()]
+                      for i in range(2)]
+
+        y_train = np.eye(2)[y_train.ravel().astype(int)]
+        network.train(x_train, y_train, epochs=5)
+        replica_errors = network.errors.replicas()
+
+        for i, (weight_1, bias_1, weight_2, bias_2) in enumerate(parameters):
+            gdnet = algorithms.GradientDescent(
+                [
+                    layers.Tanh(10, weight=weight_1, bias=bias_1),
+                    layers.Softmax(5, weight=weight_2, bias=bias_2),
+                    layers.Output(2),
+                ],
+                step=0.1,
+                error='categorical_crossentropy',
+                verbose=False,
+            )
+            gdnet.train(x_train, y_train, epochs=5)
+
+            np.testing.assert_array_almost_equal(
+                gdnet.errors.normalized(), replica_errors[:, i])
+            np.testing.assert_array_almost_equal(
+                gdnet.predict_raw(x_train), network.predict_raw(x_train)[i])
+
+    def test_replicas_pickle(self):
+        x_train, x_test, y_train, _ = simple_classification()
+        network = algorithms.ReplicatedGradientDescent(
+            (10, 20, 1), n_replicas=3, batch_size=7, verbose=False)
+        network.train(x_train, y_train, epochs=2)
+
+        restored_network = pickle.loads(pickle.dumps(network))
+        np.testing.assert_array_almost_equal(
+            network.predict(x_test), restored_network.predict(x_test))
+
+        for parameter, restored_parameter in zip(
+                network.parameter_variables(),
+                restored_network.parameter_variables()):
+            self.assertEqual(parameter.get_value().shape,
+                             restored_parameter.get_value().shape)
+
+        restored_network.train(x_train, y_train, epochs=2)
+        self.assertEqual(restored_network.errors.replicas().shape, (2, 3))
+
+        # Number of replicas can't change
+        with self.assertRaises(ValueError):
+            algorithms.ReplicatedGradientDescent(
+                network.connection, n_replicas=2, verbose=False)
+
+    def test_replicas_exceptions(self):
+        with self.assertRaises(ValueError):
+            algorithms.ReplicatedGradientDescent(
+                (2, 3, 1), n_replicas=2, replica_steps=[0.1],
+                verbose=False)
+
+        with self.assertRaises(ValueError):
+            algorithms.ReplicatedGradientDescent(
+                (2, 3, 1), n_replicas=2, addons=[algorithms.WeightDecay],
+                verbose=False)
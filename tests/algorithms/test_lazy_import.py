@@ -0,0 +1,46 @@
+import sys
+import subprocess
+
+from neupy import algorithms
+
+from base import BaseTestCase
+
+
+class LazyImportTestCase(BaseTestCase):
+    def test_lazy_import(self):
+        code = (
+            "import sys; import neupy.algorithms; "
+            "print(any(name.startswith('neupy.algorithms.') "
+            "for name in sys.modules))"
+        )
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.decode('utf-8').strip(), 'False')
+
+    def test_algorithm_attributes(self):
+        from neupy.algorithms import PNN
+        from neupy.algorithms.rbfn.pnn import PNN as ExpectedPNN
+
+        self.assertIs(PNN, ExpectedPNN)
+        self.assertIs(algorithms.PNN, ExpectedPNN)
+        self.assertIn('Momentum', dir(algorithms))
+        self.assertIn('GradientDescent', algorithms.__all__)
+
+        with self.assertRaises(AttributeError):
+            algorithms.UnknownAlgorithm
+
+    def test_subpackage_attributes(self):
+        code = (
+            "import neupy.algorithms as algorithms; "
+            "from neupy.algorithms.gd import lev_marq; "
+            "print(algorithms.gd.lev_marq is lev_marq, "
+            "algorithms.steps.__name__, algorithms.utils.__name__)"
+        )
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(
+            output.decode('utf-8').split(),
+            ['True', 'neupy.algorithms.steps', 'neupy.algorithms.utils'])
+
+        self.assertIn('gd', dir(algorithms))
+
+        with self.assertRaises(AttributeError):
+            algorithms.unknown_module
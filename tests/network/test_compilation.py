@@ -0,0 +1,339 @@
+import os
+import shutil
+import pickle
+import tempfile
+
+import numpy as np
+from sklearn import datasets
+from theano.compile import Mode, get_mode
+from neupy import algorithms, environment
+from neupy.network import clear_shared_functions
+from neupy.network.compilation import SHARED_FUNCTIONS
+
+from base import BaseTestCase
+from utils import catch_stdout
+
+
+# Optimizer replaces operations with their inplace versions and
+# linker has to run these operations in the right order.
+INPLACE_MODE = Mode(linker='py', optimizer='fast_run')
+
+
+def copy_parameters(source_network, target_network):
+    for source_parameter, target_parameter in zip(
+            source_network.parameter_variables(),
+            target_network.parameter_variables()):
+        target_parameter.set_value(source_parameter.get_value())
+
+
+class FunctionCacheTestCase(BaseTestCase):
+    def setUp(self):
+        super(FunctionCacheTestCase, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_function_cache(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        original_network = algorithms.Momentum(
+            (10, 3, 1), batch_size=10, shared_data=True,
+            function_cache_dir=self.cache_dir)
+        original_network.compile()
+
+        cache = original_network.function_cache
+        self.assertEqual(len(cache.hits), 0)
+        self.assertEqual(len(cache.misses), 5)
+
+        cached_network = algorithms.Momentum(
+            (10, 3, 1), batch_size=10, shared_data=True,
+            function_cache_dir=self.cache_dir)
+        cached_network.compile()
+
+        cache = cached_network.function_cache
+        self.assertEqual(len(cache.hits), 5)
+        self.assertEqual(len(cache.misses), 0)
+
+        for original_parameter, parameter in zip(
+                original_network.parameter_variables(),
+                cached_network.parameter_variables()):
+            parameter.set_value(original_parameter.get_value())
+
+        original_network.train(data, target, epochs=5)
+
+        # Network trains its own parameters
+        weight = original_network.layers[1].weight.get_value()
+        cached_network.train(data, target, epochs=5)
+
+        np.testing.assert_array_equal(
+            weight, original_network.layers[1].weight.get_value())
+        np.testing.assert_array_almost_equal(original_network.errors,
+                                             cached_network.errors)
+        np.testing.assert_array_almost_equal(
+            original_network.predict(data), cached_network.predict(data))
+
+    def test_function_cache_training(self):
+        data = np.random.random((20, 3))
+        target = np.random.random((20, 1))
+
+        networks = [
+            algorithms.Momentum(
+                (3, 4, 1), batch_size=5, shuffle_data=False,
+                compile_mode=INPLACE_MODE, verbose=False, **options)
+            for options in ({}, {'function_cache_dir': self.cache_dir},
+                            {'function_cache_dir': self.cache_dir})
+        ]
+        uncached_network, original_network, cached_network = networks
+
+        copy_parameters(uncached_network, original_network)
+        copy_parameters(uncached_network, cached_network)
+
+        for network in networks:
+            network.train(data, target, epochs=3)
+
+        # Last network loads training function from the file
+        self.assertEqual(len(cached_network.function_cache.hits), 1)
+        self.assertEqual(len(cached_network.function_cache.misses), 0)
+
+        np.testing.assert_array_almost_equal(uncached_network.errors,
+                                             original_network.errors)
+        np.testing.assert_array_almost_equal(uncached_network.errors,
+                                             cached_network.errors)
+
+    def test_function_cache_key(self):
+        momentum = algorithms.Momentum((10, 3, 1), momentum=0.9,
+                                       function_cache_dir=self.cache_dir)
+        momentum.compile()
+        self.assertEqual(len(momentum.function_cache.misses), 3)
+
+        # Different options modify the graph
+        momentum = algorithms.Momentum((10, 3, 1), momentum=0.8,
+                                       function_cache_dir=self.cache_dir)
+        momentum.compile()
+        cache = momentum.function_cache
+        self.assertEqual(len(cache.hits), 2)
+        self.assertEqual(len(cache.misses), 1)
+
+        network = algorithms.GradientDescent(
+            (10, 4, 1), function_cache_dir=self.cache_dir)
+        network.compile()
+        self.assertEqual(len(network.function_cache.misses), 3)
+
+
+class LazyCompilationTestCase(BaseTestCase):
+    def test_lazy_compilation(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.Momentum((10, 3, 1), batch_size=10,
+                                      shared_data=True, verbose=False)
+        self.assertEqual(len(network.methods), 0)
+
+        network.predict(data)
+        self.assertEqual(list(network.methods), ['predict_raw'])
+
+        network.train(data, target, epochs=2)
+        self.assertEqual(sorted(network.methods),
+                         ['predict_raw', 'train_batch'])
+
+        network.compile()
+        self.assertEqual(sorted(network.methods), [
+            'predict_raw', 'prediction_error', 'prediction_error_batch',
+            'train_batch', 'train_epoch',
+        ])
+
+    def test_lazy_compilation_logs(self):
+        data, _ = datasets.make_classification(30, n_features=10,
+                                               n_classes=2)
+
+        with catch_stdout() as out:
+            network = algorithms.GradientDescent(
+                (10, 3, 1), share_functions=True, verbose=True)
+            out.truncate(0)
+            out.seek(0)
+
+            network.predict(data)
+            terminal_output = out.getvalue()
+
+            self.assertIn("Function 'predict_raw' compiled", terminal_output)
+            self.assertIn("Function cache", terminal_output)
+
+            # Function compiles only once
+            network.predict(data)
+            self.assertEqual(out.getvalue(), terminal_output)
+
+    def test_lazy_compilation_after_pickle(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.GradientDescent((10, 3, 1), verbose=False)
+        network.train(data, target, epochs=2)
+
+        restored_network = pickle.loads(pickle.dumps(network))
+        np.testing.assert_array_almost_equal(
+            network.predict(data), restored_network.predict(data))
+
+        # Network that only makes predictions never
+        # compiles training functions.
+        self.assertEqual(list(restored_network.methods), ['predict_raw'])
+
+
+class SharedFunctionsTestCase(BaseTestCase):
+    def setUp(self):
+        super(SharedFunctionsTestCase, self).setUp()
+        clear_shared_functions()
+
+    def test_shared_functions(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        networks = [
+            algorithms.Momentum((10, 5, 1), share_functions=True,
+                                verbose=False)
+            for _ in range(3)
+        ]
+
+        for network in networks:
+            network.train(data, target, epochs=2)
+
+        cache = networks[0].function_cache
+        self.assertEqual(len(cache.hits), 0)
+        self.assertEqual(len(cache.misses), 1)
+
+        for network in networks[1:]:
+            self.assertEqual(len(network.function_cache.hits), 1)
+            self.assertEqual(len(network.function_cache.misses), 0)
+
+        # Each network has its own parameters
+        first_network, second_network = networks[:2]
+        self.assertFalse(np.allclose(first_network.predict(data),
+                                     second_network.predict(data)))
+
+        for first_parameter, second_parameter in zip(
+                first_network.parameter_variables(),
+                second_network.parameter_variables()):
+            second_parameter.set_value(first_parameter.get_value())
+
+        np.testing.assert_array_almost_equal(first_network.predict(data),
+                                             second_network.predict(data))
+
+    def test_shared_functions_training(self):
+        data = np.random.random((20, 3))
+        target = np.random.random((20, 1))
+
+        for algorithm_class in (algorithms.Momentum,
+                                algorithms.GradientDescent,
+                                algorithms.RPROP):
+            clear_shared_functions()
+            networks = [
+                algorithm_class((3, 4, 1), shuffle_data=False,
+                                compile_mode=INPLACE_MODE, verbose=False,
+                                share_functions=share_functions)
+                for share_functions in (False, True, True)
+            ]
+            non_shared_network = networks[0]
+
+            for network in networks[1:]:
+                copy_parameters(non_shared_network, network)
+
+            for network in networks:
+                network.train(data, target, epochs=3)
+
+            self.assertEqual(len(networks[2].function_cache.hits), 1)
+
+            for network in networks[1:]:
+                np.testing.assert_array_almost_equal(
+                    non_shared_network.errors, network.errors)
+
+    def test_shared_snapshot_prediction_error(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        networks = [
+            algorithms.GradientDescent((10, 5, 1), share_functions=True,
+                                       verbose=False)
+            for _ in range(2)
+        ]
+        copy_parameters(networks[0], networks[1])
+
+        for network in networks:
+            network.train(data, target, data, target, epochs=2,
+                          async_validation=True)
+
+        # Function for the asynchronous validation
+        # gets loaded from cache as well
+        cache = networks[1].function_cache
+        self.assertEqual(len(cache.hits), 2)
+        self.assertEqual(len(cache.misses), 0)
+
+        np.testing.assert_array_almost_equal(networks[0].validation_errors,
+                                             networks[1].validation_errors)
+
+    def test_clear_shared_functions(self):
+        data, _ = datasets.make_classification(30, n_features=10,
+                                               n_classes=2)
+        network = algorithms.Momentum((10, 5, 1), share_functions=True,
+                                      verbose=False)
+        network.predict(data)
+        self.assertEqual(len(SHARED_FUNCTIONS), 1)
+
+        clear_shared_functions()
+        self.assertEqual(len(SHARED_FUNCTIONS), 0)
+
+        # Network keeps its own copy of the function
+        network.predict(data)
+
+        network = algorithms.Momentum((10, 5, 1), share_functions=True,
+                                      verbose=False)
+        network.predict(data)
+
+        cache = network.function_cache
+        self.assertEqual(len(cache.hits), 0)
+        self.assertEqual(len(cache.misses), 1)
+
+
+class CompileModeTestCase(BaseTestCase):
+    def test_network_compile_mode(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        environment.reproducible()
+        debug_network = algorithms.GradientDescent(
+            (10, 3, 1), compile_mode='FAST_COMPILE', verbose=False)
+
+        environment.reproducible()
+        network = algorithms.GradientDescent(
+            (10, 3, 1), compile_mode='FAST_RUN', optimizer='fast_compile',
+            function_modes={'prediction_error': 'FAST_COMPILE'},
+            verbose=False)
+        network.compile()
+
+        fast_compile = get_mode('FAST_COMPILE')
+        self.assertIs(network.methods.prediction_error.maker.mode,
+                      fast_compile)
+
+        train_mode = network.methods.train_epoch.maker.mode
+        self.assertIsNot(train_mode, fast_compile)
+        self.assertIn('fast_compile', train_mode.provided_optimizer.include)
+
+        debug_network.train(data, target, data, target, epochs=2)
+        network.train(data, target, data, target, epochs=2)
+
+        self.assertIs(debug_network.methods.train_epoch.maker.mode,
+                      fast_compile)
+        np.testing.assert_array_almost_equal(debug_network.errors,
+                                             network.errors)
+        np.testing.assert_array_almost_equal(
+            debug_network.validation_errors, network.validation_errors)
+
+    def test_compile_mode_cache_key(self):
+        cache_dir = tempfile.mkdtemp()
+
+        try:
+            for compile_mode in ('FAST_COMPILE', 'FAST_RUN', 'FAST_RUN'):
+                network = algorithms.GradientDescent(
+                    (10, 3, 1), compile_mode=compile_mode,
+                    function_cache_dir=cache_dir)
+                network.compile()
+
+            cache = network.function_cache
+            self.assertEqual(len(cache.hits), 3)
+            self.assertEqual(len(os.listdir(cache_dir)), 6)
+        finally:
+            shutil.rmtree(cache_dir)
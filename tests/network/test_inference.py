@@ -0,0 +1,182 @@
+import sys
+import pickle
+import subprocess
+
+import theano.tensor as T
+import numpy as np
+from scipy.signal import convolve2d
+from sklearn import datasets
+from neupy import algorithms, layers, inference
+
+from base import BaseTestCase
+
+
+class InferenceNetworkTestCase(BaseTestCase):
+    def test_export_activations(self):
+        data, _ = datasets.make_classification(30, n_features=10,
+                                               n_classes=2)
+        activation_layers = [layers.Linear, layers.Sigmoid,
+                             layers.HardSigmoid, layers.Step, layers.Tanh,
+                             layers.Relu, layers.Softplus, layers.Softmax]
+
+        for layer_class in activation_layers:
+            network = algorithms.GradientDescent([
+                layers.Tanh(10),
+                layers.Dropout(0.5),
+                layer_class(5),
+                layers.Output(3),
+            ])
+            inference_network = network.export_inference(dtype='float64')
+
+            np.testing.assert_array_almost_equal(
+                network.predict(data), inference_network.predict(data),
+                err_msg=layer_class.__name__)
+
+    def test_activation_operation(self):
+        input_data = np.random.randn(10, 3)
+        original_input_data = input_data.copy()
+        output = np.empty((10, 3))
+
+        operation = inference.Activation('tanh')
+        operation.output(input_data, output)
+
+        np.testing.assert_array_almost_equal(np.tanh(input_data), output)
+        np.testing.assert_array_equal(original_input_data, input_data)
+
+    def test_export_output_layers(self):
+        data, _ = datasets.make_classification(30, n_features=10,
+                                               n_classes=2)
+        output_layers = [
+            layers.CompetitiveOutput(3),
+            layers.StepOutput(3, output_bounds=(-1, 1),
+                              critical_point=0.5),
+            layers.RoundedOutput(3, decimals=1),
+            layers.ArgmaxOutput(3),
+        ]
+
+        for output_layer in output_layers:
+            network = algorithms.GradientDescent([
+                layers.Sigmoid(10),
+                layers.Sigmoid(4),
+                output_layer,
+            ])
+            inference_network = network.export_inference(dtype='float64')
+
+            np.testing.assert_array_almost_equal(
+                network.predict(data), inference_network.predict(data),
+                err_msg=repr(output_layer))
+
+    def test_float32_batches(self):
+        data, target = datasets.make_regression(30, n_features=10)
+        network = algorithms.GradientDescent((10, 4, 1), verbose=False)
+        network.train(data, target / 100., epochs=2)
+
+        inference_network = network.export_inference(max_batch_size=7,
+                                                     input_shape=(10,))
+        buffers = inference_network.buffers
+        self.assertEqual(buffers[0].shape, (7, 4))
+        self.assertEqual(buffers[0].dtype, np.float32)
+
+        prediction = inference_network.predict(data)
+        self.assertEqual(prediction.dtype, np.float32)
+        self.assertIs(buffers, inference_network.buffers)
+        np.testing.assert_array_almost_equal(
+            network.predict(data), prediction, decimal=5)
+
+        # Exported network doesn't depend on the network's parameters
+        network.train(data, target / 100., epochs=2)
+        np.testing.assert_array_equal(
+            prediction, inference_network.predict(data))
+
+        restored_network = pickle.loads(pickle.dumps(inference_network))
+        self.assertIsNone(restored_network.buffers)
+        np.testing.assert_array_equal(
+            prediction, restored_network.predict(data))
+
+    def test_convolution_operation(self):
+        input_data = np.random.random((3, 2, 6, 5))
+        weight = np.random.random((4, 2, 3, 2))
+        bias = np.random.random(4)
+
+        def convolution(border_mode):
+            return np.array([[
+                sum(convolve2d(sample[i], weight[j, i], mode=border_mode)
+                    for i in range(2)) + bias[j]
+                for j in range(4)] for sample in input_data])
+
+        for border_mode in ('valid', 'full'):
+            operation = inference.Convolution(weight, bias, border_mode)
+            output_shape = operation.output_shape(input_data.shape[1:])
+
+            output = np.empty((3,) + output_shape)
+            operation.output(input_data, output)
+            np.testing.assert_array_almost_equal(
+                convolution(border_mode), output, err_msg=border_mode)
+
+        operation = inference.Convolution(weight, bias, stride=(2, 3))
+        output = np.empty((3, 4, 2, 2))
+        operation.output(input_data, output)
+        np.testing.assert_array_almost_equal(
+            convolution('valid')[:, :, ::2, ::3], output)
+
+    def test_pooling_operation(self):
+        input_data = np.array([
+            [1, 2, 3, -1],
+            [4, -6, 3, 1],
+            [0, 0, 1, 0],
+            [0, -1, 0, 0],
+        ], dtype=float).reshape((1, 1, 4, 4))
+
+        # Expected outputs are from the Theano's pool_2d function
+        options = [
+            ((2, 2), None, (0, 0), 'max', [
+                [4, 3],
+                [0, 1],
+            ]),
+            ((3, 2), (1, 2), (1, 1), 'max', [
+                [4, 3, 1],
+                [4, 3, 1],
+                [4, 3, 1],
+                [0, 1, 0],
+            ]),
+            ((2, 2), None, (1, 1), 'average_inc_pad', [
+                [0.25, 1.25, -0.25],
+                [1, -0.5, 0.25],
+                [0, -0.25, 0],
+            ]),
+            ((3, 3), (2, 1), (1, 1), 'average_exc_pad', [
+                [1 / 4., 7 / 6., 2 / 6., 6 / 4.],
+                [-3 / 6., 1 / 9., -2 / 9., 5 / 6.],
+            ]),
+        ]
+
+        for size, stride, padding, mode, expected_output in options:
+            operation = inference.Pooling(size, stride, padding, mode)
+            output_shape = operation.output_shape(input_data.shape[1:])
+
+            output = np.empty((1,) + output_shape)
+            operation.output(input_data, output)
+            np.testing.assert_array_almost_equal(
+                expected_output, output[0, 0], err_msg=mode)
+
+    def test_theano_independence(self):
+        code = ("import sys; import neupy.inference; "
+                "print('theano' in sys.modules)")
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.decode('utf-8').strip(), 'False')
+
+    def test_export_exceptions(self):
+        class Exponent(layers.ActivationLayer):
+            activation_function = T.exp
+
+        network = algorithms.GradientDescent([
+            layers.Sigmoid(10),
+            Exponent(4),
+            layers.Output(1),
+        ])
+
+        with self.assertRaises(TypeError):
+            network.export_inference()
+
+        with self.assertRaises(ValueError):
+            inference.InferenceNetwork([], max_batch_size=0)
@@ -1,6 +1,12 @@
+import pickle
+import threading
+from functools import partial
+
+import numpy as np
 from sklearn import datasets
-from neupy import algorithms
-from neupy.network.base import StopNetworkTraining
+from neupy import algorithms, environment
+from neupy.network.base import StopNetworkTraining, ErrorHistoryList
+from neupy.network.constructor import parameter_time_usage
 
 from base import BaseTestCase
 
@@ -48,3 +54,395 @@ class NetworkMainTestCase(BaseTestCase):
         network.train(data, target, epochs=10)
 
         self.assertEqual(network.last_epoch, 5)
+
+    def test_training_from_data_stream(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+
+        def iter_chunks():
+            yield data[:20], target[:20]
+            yield data[20:], target[20:]
+
+        network = algorithms.GradientDescent((10, 3, 1))
+
+        # One-time iterator can't be used more than once
+        network.train(iter_chunks(), epochs=1)
+        self.assertEqual(network.last_epoch, 1)
+
+        with self.assertRaises(ValueError):
+            network.train(iter_chunks(), epochs=2)
+
+        with self.assertRaises(ValueError):
+            network.train(iter_chunks, target, epochs=2)
+
+        network.train(iter_chunks, input_test=data, target_test=target,
+                      epochs=4)
+        self.assertEqual(network.last_epoch, 5)
+        self.assertEqual(len(network.errors), 5)
+        self.assertEqual(len(network.validation_errors), 5)
+
+    def test_training_from_empty_data_stream(self):
+        network = algorithms.GradientDescent((10, 3, 1))
+
+        with self.assertRaises(ValueError):
+            network.train(lambda: iter([]), epochs=2)
+
+    def test_async_validation(self):
+        data, target = datasets.make_classification(60, n_features=10,
+                                                    n_classes=2)
+        x_train, x_test = data[:40], data[40:]
+        y_train, y_test = target[:40], target[40:]
+
+        network_classes = [
+            partial(algorithms.GradientDescent, (10, 3, 1)),
+            partial(algorithms.MinibatchGradientDescent, (10, 3, 1),
+                    batch_size=7),
+        ]
+
+        for network_class in network_classes:
+            validation_errors = []
+
+            for async_validation in (False, True):
+                self.setUp()
+                network = network_class()
+                network.train(x_train, y_train, x_test, y_test, epochs=10,
+                              async_validation=async_validation)
+
+                self.assertEqual(len(network.validation_errors), 10)
+                validation_errors.append(network.validation_errors)
+
+            np.testing.assert_array_almost_equal(*validation_errors)
+
+    def test_async_validation_exception(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.GradientDescent((10, 3, 1))
+
+        with self.assertRaises(ValueError):
+            # Number of input and target samples are different
+            network.train(data, target, data, target[:10], epochs=2,
+                          async_validation=True)
+
+        def interrupt_training(network):
+            raise KeyboardInterrupt
+
+        n_threads = threading.active_count()
+        network = algorithms.GradientDescent(
+            (10, 3, 1), epoch_end_signal=interrupt_training)
+
+        with self.assertRaises(KeyboardInterrupt):
+            network.train(data, target, data, target, epochs=2,
+                          async_validation=True)
+
+        # Worker thread has been stopped
+        self.assertEqual(threading.active_count(), n_threads)
+
+    def test_validation_schedule(self):
+        data, target = datasets.make_classification(60, n_features=10,
+                                                    n_classes=2)
+        x_train, x_test = data[:40], data[40:]
+        y_train, y_test = target[:40], target[40:]
+
+        network = algorithms.GradientDescent((10, 3, 1))
+        network.train(x_train, y_train, x_test, y_test, epochs=6,
+                      validate_every=np.int64(4))
+
+        validation_errors = np.array(network.validation_errors)
+        # Final epoch always has validation error
+        np.testing.assert_array_equal(
+            np.isnan(validation_errors),
+            [True, True, True, False, True, False],
+        )
+        self.assertAlmostEqual(validation_errors[-1],
+                               network.prediction_error(x_test, y_test))
+
+        network = algorithms.GradientDescent((10, 3, 1))
+        network.train(x_train, y_train, x_test, y_test, epochs=3,
+                      validation_time_interval=1000, async_validation=True)
+        np.testing.assert_array_equal(
+            np.isnan(network.validation_errors), [True, True, False])
+
+        with self.assertRaises(ValueError):
+            network.train(x_train, y_train, x_test, y_test,
+                          validate_every=0)
+
+    def test_validation_subsample(self):
+        data, target = datasets.make_classification(60, n_features=10,
+                                                    n_classes=2)
+        x_train, x_test = data[:40], data[40:]
+        y_train, y_test = target[:40], target[40:]
+
+        network_classes = [
+            partial(algorithms.GradientDescent, (10, 3, 1)),
+            partial(algorithms.MinibatchGradientDescent, (10, 3, 1),
+                    batch_size=7, shared_data=True),
+        ]
+
+        for network_class in network_classes:
+            network = network_class()
+            network.train(x_train, y_train, x_test, y_test, epochs=4,
+                          validation_subsample=0.25)
+
+            self.assertEqual(len(network.validation_errors), 4)
+            self.assertFalse(np.any(np.isnan(network.validation_errors)))
+            self.assertAlmostEqual(network.validation_errors[-1],
+                                   network.prediction_error(x_test, y_test))
+
+        with self.assertRaises(ValueError):
+            network.train(x_train, y_train, x_test, y_test,
+                          validation_subsample=100)
+
+    def test_early_stopping(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        # Network doesn't update parameters and error stays the same
+        network = algorithms.GradientDescent((10, 3, 1), step=0)
+        network.train(data, target, epochs=100, patience=2)
+
+        self.assertEqual(network.last_epoch, 3)
+        self.assertEqual(network.training.early_stopping.best_epoch, 1)
+
+        with self.assertRaises(ValueError):
+            network.train(data, target, epochs=10, patience=0)
+
+        with self.assertRaises(ValueError):
+            network.train(data, target, epochs=10,
+                          restore_best_parameters=True)
+
+        with self.assertRaises(ValueError):
+            network.train(data, target, data, target, epochs=10,
+                          patience=2, async_validation=True)
+
+    def test_early_stopping_with_validate_every(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.GradientDescent((10, 3, 1), step=0)
+        network.train(data, target, data, target, epochs=20,
+                      validate_every=4, patience=2)
+
+        # Epochs without validation don't count
+        self.assertEqual(network.last_epoch, 12)
+        self.assertEqual(network.training.early_stopping.best_epoch, 4)
+
+        validated = ~np.isnan(network.validation_errors)
+        np.testing.assert_array_equal(np.flatnonzero(validated), [3, 7, 11])
+
+    def test_early_stopping_restore_parameters(self):
+        data, target = datasets.make_classification(60, n_features=10,
+                                                    n_classes=2)
+        x_train, x_test = data[:40], data[40:]
+        y_train, y_test = target[:40], target[40:]
+
+        network = algorithms.GradientDescent((10, 20, 1), step=2.)
+        network.train(x_train, y_train, x_test, y_test, epochs=30,
+                      patience=3, restore_best_parameters=True)
+
+        early_stopping = network.training.early_stopping
+        self.assertAlmostEqual(early_stopping.best_error,
+                               np.min(network.validation_errors))
+        self.assertAlmostEqual(early_stopping.best_error,
+                               network.prediction_error(x_test, y_test))
+
+    def test_error_history_list(self):
+        errors = ErrorHistoryList()
+        self.assertEqual(len(errors), 0)
+        self.assertIsNone(errors.last())
+        self.assertIsNone(errors.previous())
+
+        for i in range(40):
+            errors.append(i)
+
+        errors.append(np.array([-1, 2]))
+        errors.append(None)
+
+        self.assertEqual(len(errors), 42)
+        self.assertEqual(errors[-2], 3)
+        self.assertIsNone(errors.last())
+        self.assertEqual(errors.previous(), 3)
+
+        errors[-1] = 5
+        self.assertEqual(errors.last(), 5)
+        np.testing.assert_array_equal(errors[:3], [0, 1, 2])
+        np.testing.assert_array_equal(errors.normalized(),
+                                      list(range(40)) + [3, 5])
+
+    def test_error_history_list_sequence_methods(self):
+        errors = ErrorHistoryList([1, 2, 3])
+        errors.extend([4, 5])
+
+        self.assertEqual(errors, [1, 2, 3, 4, 5])
+        self.assertNotEqual(errors, [1, 2])
+        self.assertEqual(errors[1:3], [2, 3])
+        self.assertEqual(errors + [6], [1, 2, 3, 4, 5, 6])
+
+        self.assertEqual(errors.pop(), 5)
+        del errors[0]
+        errors.insert(1, 7)
+        self.assertEqual(errors, (2, 7, 3, 4))
+
+        errors[:2] = [0]
+        self.assertEqual(errors, [0, 3, 4])
+        self.assertEqual(errors.last(), 4)
+
+        errors = ErrorHistoryList(range(4), max_size=3)
+        errors.insert(1, 10)
+
+        self.assertEqual(errors, [10, 2, 3])
+        self.assertEqual(errors.n_discarded, 2)
+
+    def test_error_history_list_max_size(self):
+        errors = ErrorHistoryList(range(5), max_size=3)
+
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(errors.n_discarded, 2)
+        self.assertEqual(errors.last(), 4)
+        self.assertEqual(errors.previous(), 3)
+        np.testing.assert_array_equal(errors, [2, 3, 4])
+
+        with self.assertRaises(IndexError):
+            errors[3]
+
+        with self.assertRaises(ValueError):
+            ErrorHistoryList(max_size=1)
+
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.GradientDescent((10, 3, 1),
+                                             error_history_size=4)
+        network.train(data, target, data, target, epochs=10,
+                      async_validation=True)
+
+        self.assertEqual(network.last_epoch, 10)
+        self.assertEqual(len(network.errors), 4)
+        self.assertFalse(np.any(np.isnan(network.validation_errors)))
+
+    def test_training_profile(self):
+        data, target = datasets.make_classification(60, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.MinibatchGradientDescent(
+            (10, 3, 1),
+            batch_size=7,
+            shuffle_data=True,
+            epoch_end_signal=lambda network: None,
+        )
+
+        network.train(data, target, data, target, epochs=3)
+        self.assertNotIn('profile', network.training)
+
+        network.train(data, target, data, target, epochs=3,
+                      profile_phases=True)
+        profile = network.training.profile
+
+        self.assertEqual(profile.n_epochs, 3)
+        for phase in ('shuffle', 'batch slicing', 'train call',
+                      'validation', 'summary', 'signals'):
+            self.assertGreater(profile.phase_time[phase], 0, msg=phase)
+
+        lines = []
+        profile.show(stdout=lines.append)
+        # Header, separators and one row per phase
+        self.assertEqual(len(lines), 4 + len(profile.phases))
+
+    def test_theano_profiling(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.GradientDescent((10, 3, 1), verbose=False)
+        self.assertEqual(network.profiles, {})
+
+        with self.assertRaises(ValueError):
+            network.show_profile()
+
+        network = algorithms.Momentum((10, 3, 1), profile=True)
+        network.train(data, target, data, target, epochs=3)
+        network.predict(data)
+
+        self.assertEqual(sorted(network.profiles),
+                         ['predict_raw', 'prediction_error', 'train_epoch'])
+
+        time_usage = parameter_time_usage(network.profiles.train_epoch)
+        self.assertIn(('weight_1', 1), time_usage)
+        self.assertIn(('bias_2', 2), time_usage)
+
+        lines = []
+        network.show_profile(stdout=lines.append)
+        terminal_output = '\n'.join(lines)
+
+        self.assertIn('train_epoch', terminal_output)
+        self.assertIn('weight_2', terminal_output)
+
+    def test_flat_parameters(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.Momentum((10, 3, 1), flat_parameters=True,
+                                      verbose=False)
+
+        parameter_vector = network.variables.parameter_vector
+        self.assertEqual(network.parameter_variables(), [parameter_vector])
+        self.assertEqual(parameter_vector.get_value().shape, (37,))
+
+        hidden_layer = network.layers[0]
+        self.assertEqual(hidden_layer.weight.name, 'weight_1')
+        np.testing.assert_array_equal(
+            hidden_layer.weight.eval(),
+            parameter_vector.get_value()[:30].reshape((10, 3)))
+
+        network.train(data, target, data, target, epochs=10,
+                      patience=3, restore_best_parameters=True)
+        self.assertAlmostEqual(np.min(network.validation_errors),
+                               network.prediction_error(data, target))
+
+    def test_flat_parameters_training(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        algorithm_classes = [
+            algorithms.Adadelta,
+            algorithms.Momentum,
+            algorithms.ConjugateGradient,
+            algorithms.QuasiNewton,
+            algorithms.HessianBlockDiagonal,
+            algorithms.LevenbergMarquardt,
+            algorithms.Quickprop,
+        ]
+
+        for algorithm_class in algorithm_classes:
+            errors = []
+
+            for flat_parameters in (False, True):
+                environment.reproducible()
+                network = algorithm_class((10, 3, 1), verbose=False,
+                                          flat_parameters=flat_parameters)
+                network.train(data, target, epochs=3)
+                errors.append(network.errors.normalized())
+
+            np.testing.assert_array_almost_equal(*errors)
+
+        # Neither vector-based nor per-parameter algorithms
+        # concatenate parameters
+        for algorithm_class in (algorithms.ConjugateGradient,
+                                algorithms.Momentum):
+            network = algorithm_class((10, 3, 1), flat_parameters=True,
+                                      verbose=False)
+            train_epoch = network.methods.train_epoch
+            operations = [node.op.__class__.__name__
+                          for node in train_epoch.maker.fgraph.toposort()]
+            self.assertNotIn('Join', operations)
+
+    def test_flat_parameters_pickle(self):
+        data, target = datasets.make_classification(30, n_features=10,
+                                                    n_classes=2)
+        network = algorithms.Momentum((10, 3, 1), flat_parameters=True,
+                                      verbose=False)
+        network.train(data, target, epochs=3)
+
+        restored_network = pickle.loads(pickle.dumps(network))
+        self.assertTrue(restored_network.flat_parameters)
+        np.testing.assert_array_almost_equal(
+            network.predict(data), restored_network.predict(data))
+
+        restored_network.train(data, target, epochs=2)
+
+        # Layers can be used to build a new network
+        new_network = algorithms.GradientDescent(network.connection,
+                                                 verbose=False)
+        np.testing.assert_array_almost_equal(
+            network.predict(data), new_network.predict(data))